@@ -1,14 +1,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from collections import Counter
 
 from django.utils import timezone
 
 from apps.meetings.models import Meeting
 from apps.presentations.models import Presentation
 from apps.reporting.models import DataAnalysisRun, DocumentReportRun, Report
-from apps.reporting.ai_runtime import get_runtime_profile
+from apps.reporting.ai_runtime import MODEL_REGISTRY, get_runtime_profile
+from apps.reporting.embedding_batcher import embedding_batcher_stats
+from apps.reporting.embedding_cache import embedding_cache_stats
+from apps.reporting.term_stats import top_tenant_terms
 from apps.tasks.models import Task
 from apps.tenants.models import Tenant
 
@@ -96,12 +98,7 @@ def get_dashboard_insights(tenant: Tenant) -> dict:
     doc_labels = [run.created_at.strftime("%m-%d") for run in doc_runs]
     doc_slides = [int(run.summary.get("slides_generated", 0) or 0) for run in doc_runs]
 
-    keyword_counter = Counter()
-    for run in doc_runs:
-        keywords = run.summary.get("top_keywords", [])
-        if isinstance(keywords, list):
-            keyword_counter.update(str(word) for word in keywords if str(word).strip())
-    top_keywords = keyword_counter.most_common(8)
+    top_keywords = top_tenant_terms(tenant, 8)
 
     data_total = len(data_runs)
     doc_total = len(doc_runs)
@@ -137,5 +134,8 @@ def get_dashboard_insights(tenant: Tenant) -> dict:
             "device": profile.device,
             "gpu_name": profile.gpu_name or "",
             "embedding_model": profile.embedding_model,
+            "embedding_cache": embedding_cache_stats(),
+            "embedding_models": MODEL_REGISTRY.status(),
+            "embedding_batchers": embedding_batcher_stats(),
         },
     }
@@ -128,6 +128,7 @@ class DashboardTests(TestCase):
         self.assertIn("pipeline_health", payload)
         self.assertIn("runtime", payload)
         self.assertIn("worker_threads", payload["runtime"])
+        self.assertIn("hit_rate", payload["runtime"]["embedding_cache"])
 
     def test_dashboard_cross_tenant_access_denied(self):
         self.client.login(username="alice", password="pass1234")
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
-import re
-from collections import Counter
-from io import BytesIO
+from tempfile import SpooledTemporaryFile
 
-from docx import Document
 from pptx import Presentation as PptxPresentation
 
+from office_copilot.artifacts import artifact_buffer, finish_artifact
+from office_copilot.docx_stream import iter_docx_paragraphs
+from office_copilot.keywords import BoundedCounter, keyword_counts
+from office_copilot.text_cache import cached_extraction
+from apps.reporting.term_stats import tenant_keywords
+
+WORD_EXTRACTOR_VERSION = 2
+WORD_MAX_SECTIONS = 8
+WORD_SECTION_POINTS = 6
+WORD_OVERVIEW_POINTS = 8
+WORD_KEYWORD_CANDIDATES = 200
+
 
 def generate_presentation_from_text(text: str):
     sentences = [s.strip() for s in text.split(".") if s.strip()]
@@ -16,68 +25,55 @@ def generate_presentation_from_text(text: str):
     return slides
 
 
-def _extract_keywords(text: str, limit: int = 6) -> list[str]:
-    words = re.findall(r"[a-zA-Z]{4,}", text.lower())
-    stop_words = {
-        "this",
-        "that",
-        "with",
-        "from",
-        "have",
-        "into",
-        "your",
-        "their",
-        "about",
-        "there",
-        "which",
-        "were",
-        "been",
-        "will",
-        "would",
-        "could",
-        "should",
-    }
-    counts = Counter(word for word in words if word not in stop_words)
-    return [word for word, _ in counts.most_common(limit)]
-
-
-def parse_word_document(uploaded_file) -> tuple[list[dict], str]:
-    document = Document(uploaded_file)
+def _word_paragraphs(uploaded_file):
+    for style_name, text in iter_docx_paragraphs(uploaded_file):
+        text = text.strip()
+        if text:
+            yield [style_name.lower().startswith("heading"), text]
+
+
+def parse_word_document(
+    uploaded_file, tenant=None, term_counts: BoundedCounter | None = None
+) -> tuple[list[dict], str]:
+    paragraphs = cached_extraction(
+        uploaded_file, f"presentations.docx.v{WORD_EXTRACTOR_VERSION}", lambda: _word_paragraphs(uploaded_file)
+    )
+    term_counts = BoundedCounter() if term_counts is None else term_counts
     sections = []
+    first_paragraphs = []
     current_heading = "Overview"
     bucket = []
 
-    for paragraph in document.paragraphs:
-        text = paragraph.text.strip()
-        if not text:
-            continue
-        style_name = (paragraph.style.name or "").lower() if paragraph.style else ""
-        is_heading = style_name.startswith("heading")
+    for is_heading, text in paragraphs:
+        if len(first_paragraphs) < WORD_OVERVIEW_POINTS:
+            first_paragraphs.append(text)
         if is_heading and bucket:
-            sections.append({"heading": current_heading, "points": bucket[:6]})
+            if len(sections) < WORD_MAX_SECTIONS:
+                sections.append({"heading": current_heading, "points": bucket})
             bucket = []
         if is_heading:
             current_heading = text
         else:
-            bucket.append(text)
+            term_counts.update(keyword_counts(text))
+            if len(bucket) < WORD_SECTION_POINTS:
+                bucket.append(text)
 
-    if bucket:
-        sections.append({"heading": current_heading, "points": bucket[:6]})
+    if bucket and len(sections) < WORD_MAX_SECTIONS:
+        sections.append({"heading": current_heading, "points": bucket})
 
     if not sections:
-        flat_text = [p.text.strip() for p in document.paragraphs if p.text.strip()]
-        sections = [{"heading": "Overview", "points": flat_text[:8]}]
+        sections = [{"heading": "Overview", "points": first_paragraphs}]
 
     full_text = " ".join(point for section in sections for point in section["points"])
-    keywords = _extract_keywords(full_text)
+    keywords = tenant_keywords(tenant, dict(term_counts.most_common(WORD_KEYWORD_CANDIDATES)), 6)
 
     slides = [{"title": "Document Summary", "bullets": keywords or ["No significant keywords detected."]}]
-    for section in sections[:8]:
-        slides.append({"title": section["heading"][:80], "bullets": section["points"][:6]})
+    for section in sections:
+        slides.append({"title": section["heading"][:80], "bullets": section["points"]})
     return slides, full_text
 
 
-def build_powerpoint_file(title: str, slides: list[dict]) -> bytes:
+def build_powerpoint_file(title: str, slides: list[dict]) -> SpooledTemporaryFile:
     presentation = PptxPresentation()
     title_layout = presentation.slide_layouts[0]
     content_layout = presentation.slide_layouts[1]
@@ -99,7 +95,6 @@ def build_powerpoint_file(title: str, slides: list[dict]) -> bytes:
             paragraph.text = str(bullet)
             paragraph.level = 0
 
-    output = BytesIO()
+    output = artifact_buffer()
     presentation.save(output)
-    output.seek(0)
-    return output.getvalue()
+    return finish_artifact(output)
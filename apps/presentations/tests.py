@@ -1,17 +1,24 @@
 from io import BytesIO
+from unittest.mock import patch
 
 from docx import Document
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.test import Client
 from django.urls import reverse
 
+from apps.reporting.models import TermCorpus, TermStatistic
 from apps.tenants.models import Tenant
+from office_copilot.keywords import BoundedCounter
+from office_copilot.testing import IsolatedStorageTestCase
+from office_copilot.docx_stream import iter_docx_paragraphs
 from .models import Presentation
+from .services.ai_engine import build_powerpoint_file, parse_word_document
 
 
-class WordToPresentationTests(TestCase):
+class WordToPresentationTests(IsolatedStorageTestCase):
     def setUp(self):
+        super().setUp()
         self.tenant = Tenant.objects.create(name="Tenant A", domain="a.local")
         user_model = get_user_model()
         self.user = user_model.objects.create_user(
@@ -51,3 +58,71 @@ class WordToPresentationTests(TestCase):
         presentation = Presentation.objects.get(id=payload["presentation_id"])
         self.assertEqual(presentation.tenant, self.tenant)
         self.assertTrue(bool(presentation.file))
+        self.assertEqual(TermCorpus.objects.get(tenant=self.tenant).document_count, 1)
+        self.assertEqual(TermStatistic.objects.get(tenant=self.tenant, term="revenue").document_frequency, 1)
+
+    def test_failed_generation_closes_spooled_deck(self):
+        artifacts = []
+
+        def tracked_build(title, slides):
+            artifacts.append(build_powerpoint_file(title, slides))
+            return artifacts[-1]
+
+        self.client.login(username="writer", password="pass1234")
+        with patch("apps.presentations.views.build_powerpoint_file", side_effect=tracked_build), patch(
+            "apps.presentations.views.Presentation.objects.create", side_effect=RuntimeError("database unavailable")
+        ):
+            response = self.client.post(
+                reverse("word-to-presentation"),
+                data={"file": self._build_docx_upload()},
+                HTTP_X_TENANT="a.local",
+                HTTP_HOST="localhost",
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["detail"], "database unavailable")
+        self.assertTrue(artifacts[0].closed)
+
+    def test_docx_stream_yields_styles_and_table_cells_in_order(self):
+        document = Document()
+        document.add_heading("Contract Terms", level=1)
+        document.add_paragraph("Payment\tnet 30 days.")
+        table = document.add_table(rows=2, cols=2)
+        table.cell(0, 0).text = "Vendor"
+        table.cell(1, 1).text = "Renewal in March"
+        document.add_heading("Signatures", level=2)
+        document.add_paragraph("Signed by both parties.", style="List Bullet")
+        output = BytesIO()
+        document.save(output)
+
+        paragraphs = [(style, text) for style, text in iter_docx_paragraphs(BytesIO(output.getvalue())) if text]
+        self.assertEqual(
+            paragraphs,
+            [
+                ("heading 1", "Contract Terms"),
+                ("Normal", "Payment\tnet 30 days."),
+                ("Normal", "Vendor"),
+                ("Normal", "Renewal in March"),
+                ("heading 2", "Signatures"),
+                ("List Bullet", "Signed by both parties."),
+            ],
+        )
+        slides, full_text = parse_word_document(BytesIO(output.getvalue()))
+        self.assertEqual([slide["title"] for slide in slides[1:]], ["Contract Terms", "Signatures"])
+        self.assertIn("Renewal in March", full_text)
+
+    def test_long_documents_keep_bounded_sections_and_whole_document_keywords(self):
+        document = Document()
+        for section in range(20):
+            document.add_heading(f"Section {section}", level=1)
+            for index in range(10):
+                topic = "turbines" if section >= 15 else "budget"
+                document.add_paragraph(f"Paragraph {index} reviews {topic} item {section}.")
+        output = BytesIO()
+        document.save(output)
+        term_counts = BoundedCounter()
+        slides, full_text = parse_word_document(BytesIO(output.getvalue()), term_counts=term_counts)
+        self.assertEqual(len(slides), 9)
+        self.assertTrue(all(len(slide["bullets"]) <= 6 for slide in slides))
+        self.assertNotIn("turbines", full_text)
+        self.assertEqual(term_counts.counts["turbines"], 50)
+        self.assertIn("turbines", slides[0]["bullets"])
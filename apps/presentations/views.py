@@ -2,14 +2,16 @@ import json
 from datetime import datetime
 
 from django.contrib.auth.decorators import login_required
-from django.core.files.base import ContentFile
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
+from office_copilot.artifacts import save_artifact
 from office_copilot.authz import enforce_tenant_access
+from office_copilot.keywords import BoundedCounter
+from apps.reporting.term_stats import record_document_terms
 from apps.tasks.models import AIJob
 from .models import Presentation
 from .services.ai_engine import (
@@ -86,18 +88,20 @@ def word_to_presentation(request):
         status="processing",
     )
     try:
-        slides, source_text = parse_word_document(upload)
-        pptx_bytes = build_powerpoint_file(f"Document Deck - {upload.name}", slides)
-        presentation = Presentation.objects.create(
-            tenant=request.tenant,
-            title=f"Deck: {upload.name}",
-            source_text=source_text[:15000],
-            slide_payload=slides,
-            status=Presentation.Status.READY,
-            created_by=request.user,
-        )
-        filename = f"deck_{presentation.id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pptx"
-        presentation.file.save(filename, ContentFile(pptx_bytes), save=True)
+        term_counts = BoundedCounter()
+        slides, source_text = parse_word_document(upload, tenant=request.tenant, term_counts=term_counts)
+        with build_powerpoint_file(f"Document Deck - {upload.name}", slides) as pptx_artifact:
+            presentation = Presentation.objects.create(
+                tenant=request.tenant,
+                title=f"Deck: {upload.name}",
+                source_text=source_text[:15000],
+                slide_payload=slides,
+                status=Presentation.Status.READY,
+                created_by=request.user,
+            )
+            filename = f"deck_{presentation.id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pptx"
+            save_artifact(presentation.file, filename, pptx_artifact, save=True)
+        record_document_terms(request.tenant, dict(term_counts.most_common(term_counts.capacity)))
         job.output_data = {"presentation_id": presentation.id, "slides": slides}
         job.status = "completed"
         job.save(update_fields=["output_data", "status"])
@@ -137,13 +141,9 @@ def presentation_download(request, presentation_id):
     presentation = get_object_or_404(Presentation, id=presentation_id, tenant=request.tenant)
     if not presentation.file:
         return JsonResponse({"detail": "Presentation file not available"}, status=404)
-    presentation.file.open("rb")
-    payload = presentation.file.read()
-    presentation.file.close()
-    response = HttpResponse(
-        payload,
+    return FileResponse(
+        presentation.file.open("rb"),
+        as_attachment=True,
+        filename=presentation.file.name.split("/")[-1],
         content_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
     )
-    filename = presentation.file.name.split("/")[-1]
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    return response
@@ -3,13 +3,28 @@ from __future__ import annotations
 import os
 import re
 import subprocess
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import lru_cache
-from multiprocessing import cpu_count
+from itertools import chain
+from multiprocessing import cpu_count, get_all_start_methods, get_context
 
+import django
 import numpy as np
 from nltk.corpus import stopwords
-from nltk.tokenize import sent_tokenize, word_tokenize
+from nltk.tokenize import sent_tokenize
+
+from office_copilot.keywords import WORD_PATTERN
+from .embedding_cache import encode_sentences
+from .hashing_embedder import HashingEmbedder, is_hashing_model
+from .model_registry import ModelRegistry
+
+PROCESS_START_METHODS = ("forkserver", "spawn")
+TOKEN_PATTERN = WORD_PATTERN
+DEFAULT_LONG_DOCUMENT_SENTENCES = 2_000
+DEFAULT_KEY_POINT_WINDOW_SENTENCES = 400
 
 
 @dataclass(frozen=True)
@@ -79,71 +94,179 @@ def get_runtime_profile() -> RuntimeProfile:
     )
 
 
-_EMBEDDER = None
+def process_start_method() -> str:
+    configured = os.getenv("OFFICE_PROCESS_START_METHOD", PROCESS_START_METHODS[0])
+    available = get_all_start_methods()
+    if configured in PROCESS_START_METHODS and configured in available:
+        return configured
+    return next(method for method in PROCESS_START_METHODS if method in available)
 
 
-def get_embedder():
-    global _EMBEDDER
-    if _EMBEDDER is not None:
-        return _EMBEDDER
+def process_pool(max_workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=get_context(process_start_method()), initializer=django.setup
+    )
+
+
+FREQUENCY_MODEL_NAMES = {"nltk-frequency"}
+
+
+def _load_embedding_model(name: str):
+    if is_hashing_model(name):
+        return HashingEmbedder.from_name(name)
+    from sentence_transformers import SentenceTransformer
 
     profile = get_runtime_profile()
-    try:
-        from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(name, device="cuda" if profile.device == "cuda" else "cpu")
+
+
+MODEL_REGISTRY = ModelRegistry(_load_embedding_model)
+
 
-        _EMBEDDER = SentenceTransformer(
-            profile.embedding_model,
-            device="cuda" if profile.device == "cuda" else "cpu",
-        )
+def get_embedder():
+    model_name = get_runtime_profile().embedding_model
+    if model_name in FREQUENCY_MODEL_NAMES:
+        return None
+    return MODEL_REGISTRY.get(model_name)
+
+
+def preload_embedder() -> bool:
+    return get_embedder() is not None
+
+
+def split_sentences(text: str) -> list[str]:
+    try:
+        return [s.strip() for s in sent_tokenize(text) if s.strip()]
     except Exception:
-        _EMBEDDER = None
-    return _EMBEDDER
+        return [s.strip() for s in re.split(r"(?<=[.!?])\s+|\n+", text) if s.strip()]
 
 
 def semantic_key_points(text: str, max_points: int = 8) -> list[str]:
+    return rank_key_sentences(split_sentences(text), max_points)
+
+
+def _env_positive_int(name: str, default: int) -> int:
     try:
-        sentences = [s.strip() for s in sent_tokenize(text) if s.strip()]
-    except Exception:
-        sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+|\n+", text) if s.strip()]
+        value = int(os.getenv(name, str(default)))
+    except ValueError:
+        value = default
+    return max(1, value)
+
+
+def long_document_threshold() -> int:
+    return _env_positive_int("OFFICE_LONG_DOCUMENT_SENTENCES", DEFAULT_LONG_DOCUMENT_SENTENCES)
+
+
+def key_point_window_size() -> int:
+    return _env_positive_int("OFFICE_KEY_POINT_WINDOW_SENTENCES", DEFAULT_KEY_POINT_WINDOW_SENTENCES)
+
+
+def _sentence_windows(sentences: Iterable[str], size: int) -> Iterator[list[str]]:
+    window = []
+    for sentence in sentences:
+        window.append(sentence)
+        if len(window) >= size:
+            yield window
+            window = []
+    if window:
+        yield window
+
+
+def long_document_key_points(sentences: Iterable[str], max_points: int = 8) -> list[str]:
+    iterator = iter(sentences)
+    threshold = max(long_document_threshold(), max_points * 2)
+    head = []
+    for sentence in iterator:
+        head.append(sentence)
+        if len(head) > threshold:
+            break
+    else:
+        return rank_key_sentences(head, max_points)
+
+    window_size = min(max(key_point_window_size(), max_points * 2), threshold)
+    workers = get_runtime_profile().worker_threads
+    candidates = []
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for window in _sentence_windows(chain(head, iterator), window_size):
+            in_flight.append(executor.submit(rank_key_sentences, window, max_points))
+            while len(in_flight) > workers * 2:
+                candidates.extend(in_flight.popleft().result())
+        while in_flight:
+            candidates.extend(in_flight.popleft().result())
+    return long_document_key_points(candidates, max_points)
+
+
+def rank_key_sentences(sentences: list[str], max_points: int = 8) -> list[str]:
     if len(sentences) <= max_points:
         return sentences
+    if len(sentences) > max(long_document_threshold(), max_points * 2):
+        return long_document_key_points(sentences, max_points)
 
     model = get_embedder()
     if model is None:
         return _frequency_rank_sentences(sentences, max_points)
 
     try:
-        vectors = model.encode(sentences, normalize_embeddings=True)
-        centroid = np.mean(vectors, axis=0)
-        scores = np.dot(vectors, centroid)
-        ranked = sorted(enumerate(scores), key=lambda item: item[1], reverse=True)[: max_points * 2]
-        top_idx = sorted({idx for idx, _ in ranked})[:max_points]
-        return [sentences[idx] for idx in top_idx]
+        return embedding_rank_sentences(model, get_runtime_profile().embedding_model, sentences, max_points)
     except Exception:
         return _frequency_rank_sentences(sentences, max_points)
 
 
-def _frequency_rank_sentences(sentences: list[str], max_points: int) -> list[str]:
+def embedding_rank_sentences(model, model_name: str, sentences: list[str], max_points: int) -> list[str]:
+    if isinstance(model, HashingEmbedder):
+        vectors = model.encode(sentences)
+    else:
+        vectors = encode_sentences(model, model_name, sentences)
+    centroid = np.mean(vectors, axis=0)
+    return _select_top_sentences(sentences, np.dot(vectors, centroid), max_points)
+
+
+@lru_cache(maxsize=1)
+def _stop_words() -> frozenset[str]:
     try:
-        stop_words = set(stopwords.words("english"))
+        return frozenset(stopwords.words("english"))
     except Exception:
-        stop_words = set()
+        return frozenset()
+
 
-    frequency = {}
+def _select_top_sentences(sentences: list[str], scores: np.ndarray, max_points: int) -> list[str]:
+    ranked = np.argsort(-np.asarray(scores, dtype=np.float64), kind="stable")[: max_points * 2]
+    return [sentences[idx] for idx in np.sort(ranked)[:max_points]]
+
+
+def _term_sentence_matrix(sentences: list[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    stop_words = _stop_words()
+    vocabulary: dict[str, int] = {}
+    indptr = [0]
+    indices = []
     for sentence in sentences:
-        for token in word_tokenize(sentence.lower()):
-            if not token.isalpha() or token in stop_words:
-                continue
-            frequency[token] = frequency.get(token, 0) + 1
-
-    scored = []
-    for idx, sentence in enumerate(sentences):
-        score = 0
-        for token in word_tokenize(sentence.lower()):
-            if token in frequency:
-                score += frequency[token]
-        scored.append((idx, score))
-
-    top = sorted(scored, key=lambda item: item[1], reverse=True)[: max_points * 2]
-    selected_idx = sorted({idx for idx, _ in top})[:max_points]
-    return [sentences[idx] for idx in selected_idx]
+        for token in TOKEN_PATTERN.findall(sentence.lower()):
+            if token not in stop_words:
+                indices.append(vocabulary.setdefault(token, len(vocabulary)))
+        indptr.append(len(indices))
+
+    rows = np.repeat(np.arange(len(sentences), dtype=np.int64), np.diff(indptr))
+    cells, counts = np.unique(rows * max(len(vocabulary), 1) + np.asarray(indices, dtype=np.int64), return_counts=True)
+    row_ids = cells // max(len(vocabulary), 1)
+    csr_indptr = np.searchsorted(row_ids, np.arange(len(sentences) + 1)).astype(np.int64)
+    csr_indices = cells % max(len(vocabulary), 1)
+    return csr_indptr, csr_indices, counts.astype(np.float64), len(vocabulary)
+
+
+def _tfidf_scores(sentences: list[str]) -> np.ndarray:
+    indptr, indices, counts, vocab_size = _term_sentence_matrix(sentences)
+    if not vocab_size:
+        return np.zeros(len(sentences))
+    rows = np.repeat(np.arange(len(sentences)), np.diff(indptr))
+    document_frequency = np.bincount(indices, minlength=vocab_size)
+    idf = np.log((1.0 + len(sentences)) / (1.0 + document_frequency)) + 1.0
+    weights = counts * idf[indices]
+    norms = np.sqrt(np.bincount(rows, weights=weights**2, minlength=len(sentences)))
+    weights /= norms[rows]
+    centroid = np.bincount(indices, weights=weights, minlength=vocab_size) / len(sentences)
+    return np.bincount(rows, weights=weights * centroid[indices], minlength=len(sentences))
+
+
+def _frequency_rank_sentences(sentences: list[str], max_points: int) -> list[str]:
+    return _select_top_sentences(sentences, _tfidf_scores(sentences), max_points)
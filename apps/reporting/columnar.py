@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+COLUMNAR_FORMAT_VERSION = 3
+COLUMNAR_READABLE_VERSIONS = (2, COLUMNAR_FORMAT_VERSION)
+MANIFEST_NAME = "manifest.json"
+
+
+def _column_kind(series: pd.Series) -> str:
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_extension_array_dtype(series.dtype):
+        return "array"
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return "datetime"
+    return "codes"
+
+
+def _encode_categories(uniques) -> tuple[np.ndarray, np.ndarray]:
+    encoded = [str(value).encode("utf-8") for value in uniques]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _decode_codes(codes: np.ndarray, buffer: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    decoded = np.full(len(codes), np.nan, dtype=object)
+    present = codes >= 0
+    if not present.any():
+        return decoded
+    used = np.flatnonzero(np.bincount(codes[present]))
+    lookup = np.empty(len(used), dtype=object)
+    for slot, code in enumerate(used):
+        lookup[slot] = bytes(buffer[offsets[code] : offsets[code + 1]]).decode("utf-8")
+    decoded[present] = lookup[np.searchsorted(used, codes[present])]
+    return decoded
+
+
+def write_columnar(dataframe: pd.DataFrame, directory) -> Path:
+    target = Path(directory)
+    staging = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    staging.mkdir(parents=True)
+    columns = []
+    try:
+        for position, name in enumerate(dataframe.columns):
+            series = dataframe.iloc[:, position]
+            kind = _column_kind(series)
+            entry = {"name": str(name), "kind": kind, "file": f"{position}.npy"}
+            if kind == "array":
+                np.save(staging / entry["file"], series.to_numpy())
+            elif kind == "datetime":
+                tz = getattr(series.dt, "tz", None)
+                values = series.dt.tz_convert("UTC").dt.tz_localize(None) if tz is not None else series
+                entry["tz"] = str(tz) if tz is not None else None
+                np.save(staging / entry["file"], values.to_numpy(dtype="datetime64[ns]"))
+            else:
+                codes, uniques = pd.factorize(series, use_na_sentinel=True)
+                buffer, offsets = _encode_categories(uniques)
+                entry["categories_file"] = f"{position}.categories.npy"
+                entry["offsets_file"] = f"{position}.offsets.npy"
+                np.save(staging / entry["file"], codes.astype(np.int32, copy=False))
+                np.save(staging / entry["categories_file"], buffer, allow_pickle=False)
+                np.save(staging / entry["offsets_file"], offsets, allow_pickle=False)
+            columns.append(entry)
+
+        manifest = {"version": COLUMNAR_FORMAT_VERSION, "rows": int(len(dataframe)), "columns": columns}
+        (staging / MANIFEST_NAME).write_text(json.dumps(manifest), encoding="utf-8")
+        try:
+            os.replace(staging, target)
+        except OSError:
+            if not (target / MANIFEST_NAME).exists():
+                raise
+            shutil.rmtree(staging, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return target
+
+
+def has_columnar(directory) -> bool:
+    manifest_path = Path(directory) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return False
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    return manifest.get("version") in COLUMNAR_READABLE_VERSIONS
+
+
+def columnar_size(directory) -> int:
+    total = 0
+    for path in Path(directory).iterdir():
+        try:
+            total += path.stat().st_size
+        except OSError:
+            continue
+    return total
+
+
+def prune_columnar_root(root, max_bytes: int, max_age_seconds: float | None = None, keep=()) -> dict:
+    root = Path(root)
+    keep = {Path(path) for path in keep}
+    now = time.time()
+    entries = []
+    for path in root.iterdir() if root.is_dir() else []:
+        if not path.is_dir():
+            continue
+        try:
+            mtime = (path / MANIFEST_NAME).stat().st_mtime
+        except OSError:
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+        entries.append((mtime, columnar_size(path), path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    freed = 0
+    for mtime, size, path in sorted(entries):
+        if path in keep:
+            continue
+        expired = max_age_seconds is not None and now - mtime > max_age_seconds
+        if not expired and (total <= max_bytes or path.name.startswith(".")):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        freed += size
+        removed += 1
+    return {"entries": len(entries) - removed, "removed": removed, "freed_bytes": freed, "remaining_bytes": total}
+
+
+def columnar_columns(directory) -> list[str]:
+    manifest = json.loads((Path(directory) / MANIFEST_NAME).read_text(encoding="utf-8"))
+    return [entry["name"] for entry in manifest["columns"]]
+
+
+def read_columnar(directory, mmap_mode: str = "c", columns: list[str] | None = None) -> pd.DataFrame:
+    source = Path(directory)
+    manifest = json.loads((source / MANIFEST_NAME).read_text(encoding="utf-8"))
+    entries = manifest["columns"]
+    if columns is not None:
+        wanted = set(columns)
+        entries = [entry for entry in entries if entry["name"] in wanted]
+    arrays = {}
+    for position, entry in enumerate(entries):
+        values = np.load(source / entry["file"], mmap_mode=mmap_mode)
+        if entry["kind"] == "array":
+            arrays[position] = values
+        elif entry["kind"] == "datetime":
+            series = pd.Series(values, copy=False)
+            if entry.get("tz"):
+                series = series.dt.tz_localize("UTC").dt.tz_convert(entry["tz"])
+            arrays[position] = series
+        elif "offsets_file" not in entry:
+            categories = np.load(source / entry["categories_file"], allow_pickle=False).astype(object)
+            buffer, offsets = _encode_categories(categories)
+            arrays[position] = _decode_codes(values, buffer, offsets)
+        else:
+            arrays[position] = _decode_codes(
+                values,
+                np.load(source / entry["categories_file"], mmap_mode="r", allow_pickle=False),
+                np.load(source / entry["offsets_file"], mmap_mode="r", allow_pickle=False),
+            )
+
+    dataframe = pd.DataFrame(arrays, index=pd.RangeIndex(manifest["rows"]), copy=False)
+    dataframe.columns = [entry["name"] for entry in entries]
+    return dataframe
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import codecs
+import os
+from collections.abc import Iterator
+
+from pypdf import PdfReader
+
+from office_copilot.docx_stream import iter_docx_paragraphs
+from office_copilot.text_cache import cached_extraction, content_digest, load_cached_text, text_cache_enabled
+
+from .ai_runtime import get_runtime_profile, process_pool
+from .ingestion import source_path
+
+DOCUMENT_SUFFIXES = (".txt", ".md", ".docx", ".pdf")
+DOCUMENT_EXTRACTOR_VERSION = 1
+DOCX_EXTRACTOR_VERSION = 2
+DOCX_PARAGRAPHS_PER_PAGE = 200
+TEXT_PAGE_BYTES = 1024 * 1024
+DEFAULT_PDF_PAGES_PER_TASK = 16
+PDF_PARALLEL_MIN_PAGES = 32
+
+
+def _pdf_pages_per_task() -> int:
+    try:
+        value = int(os.getenv("OFFICE_PDF_PAGES_PER_TASK", str(DEFAULT_PDF_PAGES_PER_TASK)))
+    except ValueError:
+        value = DEFAULT_PDF_PAGES_PER_TASK
+    return max(1, value)
+
+
+def _pdf_worker_count(page_count: int) -> int:
+    try:
+        configured = int(os.getenv("OFFICE_PDF_WORKERS", "0"))
+    except ValueError:
+        configured = 0
+    workers = configured if configured > 0 else get_runtime_profile().worker_threads
+    return max(1, min(workers, page_count))
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> list[str]:
+    reader = PdfReader(path)
+    return [(reader.pages[index].extract_text() or "") for index in range(start, stop)]
+
+
+def iter_pdf_pages(uploaded_file) -> Iterator[str]:
+    path = source_path(uploaded_file)
+    reader = PdfReader(path if path is not None else uploaded_file)
+    page_count = len(reader.pages)
+    workers = _pdf_worker_count(page_count)
+    if path is None or workers == 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+        for page in reader.pages:
+            yield page.extract_text() or ""
+        return
+
+    del reader
+    step = _pdf_pages_per_task()
+    starts = list(range(0, page_count, step))
+    stops = [min(start + step, page_count) for start in starts]
+    with process_pool(workers) as executor:
+        for texts in executor.map(_extract_page_range, [path] * len(starts), starts, stops):
+            yield from texts
+
+
+def _iter_docx_pages(uploaded_file) -> Iterator[str]:
+    page = []
+    for _, text in iter_docx_paragraphs(uploaded_file):
+        text = text.strip()
+        if text:
+            page.append(text)
+        if len(page) >= DOCX_PARAGRAPHS_PER_PAGE:
+            yield "\n".join(page)
+            page = []
+    if page:
+        yield "\n".join(page)
+
+
+def iter_text_pages(uploaded_file, page_bytes: int = TEXT_PAGE_BYTES) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    carry = ""
+    while True:
+        chunk = uploaded_file.read(page_bytes)
+        text = carry + decoder.decode(chunk or b"", final=not chunk)
+        if not chunk:
+            if text:
+                yield text
+            return
+        cut = text.rfind("\n")
+        if cut < 0:
+            cut = max(text.rfind(" "), 0)
+        if cut <= 0 and len(text) < page_bytes * 4:
+            carry = text
+            continue
+        cut = cut or len(text)
+        carry = text[cut:]
+        yield text[:cut]
+
+
+def _page_extractor(name: str) -> str | None:
+    if name.endswith(".docx"):
+        return f"reporting.docx.v{DOCX_EXTRACTOR_VERSION}"
+    if name.endswith(".pdf"):
+        return f"reporting.pdf.v{DOCUMENT_EXTRACTOR_VERSION}"
+    return None
+
+
+def iter_document_pages(uploaded_file, filename: str) -> Iterator[str]:
+    name = filename.lower()
+    if name.endswith(".txt") or name.endswith(".md"):
+        yield from iter_text_pages(uploaded_file)
+    elif name.endswith(".docx"):
+        yield from cached_extraction(uploaded_file, _page_extractor(name), lambda: _iter_docx_pages(uploaded_file))
+    elif name.endswith(".pdf"):
+        yield from cached_extraction(uploaded_file, _page_extractor(name), lambda: iter_pdf_pages(uploaded_file))
+    else:
+        raise ValueError("Supported document formats: .txt, .md, .docx, .pdf")
+
+
+def cached_document_pages(uploaded_file, filename: str) -> Iterator[str] | None:
+    name = filename.lower()
+    if name.endswith(".txt") or name.endswith(".md"):
+        return iter_text_pages(uploaded_file)
+    extractor = _page_extractor(name)
+    if extractor is None or not text_cache_enabled():
+        return None
+    return load_cached_text(content_digest(uploaded_file), extractor)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+import numpy as np
+
+DEFAULT_EMBED_BATCH_SIZE = 64
+DEFAULT_EMBED_MAX_WAIT_MS = 5.0
+
+
+def embedding_batching_enabled() -> bool:
+    return os.getenv("OFFICE_EMBED_BATCHING", "True") == "True"
+
+
+def embed_batch_size() -> int:
+    try:
+        value = int(os.getenv("OFFICE_EMBED_BATCH_SIZE", str(DEFAULT_EMBED_BATCH_SIZE)))
+    except ValueError:
+        value = DEFAULT_EMBED_BATCH_SIZE
+    return max(1, value)
+
+
+def embed_max_wait_seconds() -> float:
+    try:
+        value = float(os.getenv("OFFICE_EMBED_MAX_WAIT_MS", str(DEFAULT_EMBED_MAX_WAIT_MS)))
+    except ValueError:
+        value = DEFAULT_EMBED_MAX_WAIT_MS
+    return max(0.0, value) / 1000.0
+
+
+@dataclass
+class _EncodeRequest:
+    sentences: list[str]
+    future: Future
+
+
+class EmbeddingBatcher:
+    def __init__(self, model, batch_size: int | None = None, max_wait_seconds: float | None = None):
+        self.model = model
+        self.batch_size = batch_size or embed_batch_size()
+        self.max_wait_seconds = embed_max_wait_seconds() if max_wait_seconds is None else max_wait_seconds
+        self._queue: queue.Queue[_EncodeRequest] = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.batches = 0
+        self.requests = 0
+        self.sentences = 0
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+            self._thread.start()
+
+    def submit(self, sentences: list[str]) -> Future:
+        future = Future()
+        if not sentences:
+            future.set_result(np.zeros((0, 0), dtype=np.float32))
+            return future
+        self._ensure_worker()
+        self._queue.put(_EncodeRequest(list(sentences), future))
+        return future
+
+    def encode(self, sentences: list[str]) -> np.ndarray:
+        return self.submit(sentences).result()
+
+    def _collect(self) -> list[_EncodeRequest]:
+        batch = [self._queue.get()]
+        pending = len(batch[0].sentences)
+        deadline = time.monotonic() + self.max_wait_seconds
+        while pending < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            pending += len(request.sentences)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = [request for request in self._collect() if request.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            flat = [sentence for request in batch for sentence in request.sentences]
+            try:
+                vectors = np.asarray(
+                    self.model.encode(flat, normalize_embeddings=True, batch_size=self.batch_size), dtype=np.float32
+                )
+            except Exception as exc:
+                for request in batch:
+                    request.future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.requests += len(batch)
+            self.sentences += len(flat)
+            offset = 0
+            for request in batch:
+                size = len(request.sentences)
+                request.future.set_result(vectors[offset : offset + size])
+                offset += size
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "sentences": self.sentences,
+            "requests_per_batch": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "batch_size": self.batch_size,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+        }
+
+
+_BATCHERS: dict[int, EmbeddingBatcher] = {}
+_BATCHERS_LOCK = threading.Lock()
+
+
+def get_embedding_batcher(model) -> EmbeddingBatcher:
+    with _BATCHERS_LOCK:
+        batcher = _BATCHERS.get(id(model))
+        if batcher is None or batcher.model is not model:
+            batcher = _BATCHERS[id(model)] = EmbeddingBatcher(model)
+        return batcher
+
+
+def embedding_batcher_stats() -> list[dict]:
+    with _BATCHERS_LOCK:
+        return [batcher.stats() for batcher in _BATCHERS.values()]
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from .embedding_batcher import embedding_batching_enabled, get_embedding_batcher
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_EMBED_CACHE_SIZE = 20_000
+DEFAULT_EMBED_DISK_CACHE_MAX_ROWS = 1_000_000
+EMBED_KEY_BYTES = 16
+EMBED_RECORD = np.dtype([("key", f"S{EMBED_KEY_BYTES}"), ("row", "<u4")])
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+    except ValueError:
+        value = default
+    return max(0, value)
+
+
+def embedding_cache_enabled() -> bool:
+    return os.getenv("OFFICE_EMBED_CACHE", "True") == "True"
+
+
+def _disk_cache_enabled() -> bool:
+    return os.getenv("OFFICE_EMBED_DISK_CACHE", "True") == "True"
+
+
+def embedding_cache_root() -> Path:
+    configured = os.getenv("OFFICE_EMBED_CACHE_DIR", "").strip()
+    return Path(configured) if configured else Path(settings.BASE_DIR) / "var" / "embedding_cache"
+
+
+def sentence_key(model_name: str, sentence: str) -> bytes:
+    normalized = WHITESPACE_PATTERN.sub(" ", sentence).strip().lower()
+    return hashlib.blake2b(f"{model_name}\0{normalized}".encode("utf-8"), digest_size=EMBED_KEY_BYTES).digest()
+
+
+class _DiskTier:
+    def __init__(self, directory: Path, max_rows: int):
+        self.directory = directory
+        self.max_rows = max_rows
+        self.dim = None
+        self.rows = {}
+        self._records_read = 0
+        self._vectors = None
+        self._vector_rows = 0
+        meta_path = directory / "meta.json"
+        if meta_path.exists():
+            try:
+                self.dim = int(json.loads(meta_path.read_text(encoding="utf-8"))["dim"])
+            except (OSError, ValueError, KeyError):
+                self.dim = None
+
+    @property
+    def _keys_path(self) -> Path:
+        return self.directory / "keys.bin"
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.directory / "vectors.f16"
+
+    def _refresh(self) -> None:
+        if self.dim is None or not self._keys_path.exists():
+            return
+        size = self._keys_path.stat().st_size // EMBED_RECORD.itemsize
+        if size > self._records_read:
+            records = np.fromfile(self._keys_path, dtype=EMBED_RECORD, offset=self._records_read * EMBED_RECORD.itemsize)
+            for record in records:
+                self.rows[bytes(record["key"]).ljust(EMBED_KEY_BYTES, b"\0")] = int(record["row"])
+            self._records_read = size
+        vector_rows = self._vectors_path.stat().st_size // (self.dim * 2) if self._vectors_path.exists() else 0
+        if vector_rows != self._vector_rows:
+            self._vectors = (
+                np.memmap(self._vectors_path, dtype=np.float16, mode="r", shape=(vector_rows, self.dim))
+                if vector_rows
+                else None
+            )
+            self._vector_rows = vector_rows
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, np.ndarray]:
+        self._refresh()
+        found = {}
+        for key in keys:
+            row = self.rows.get(key)
+            if row is not None and self._vectors is not None and row < self._vector_rows:
+                found[key] = np.asarray(self._vectors[row], dtype=np.float32)
+        return found
+
+    def put_many(self, keys: list[bytes], vectors: np.ndarray) -> None:
+        if not keys:
+            return
+        dim = int(vectors.shape[1])
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.dim is None:
+            self.dim = dim
+            (self.directory / "meta.json").write_text(json.dumps({"dim": dim, "dtype": "float16"}), encoding="utf-8")
+        if dim != self.dim or len(self.rows) + len(keys) > self.max_rows:
+            return
+        with open(self.directory / ".lock", "a+b") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                fresh = [(index, key) for index, key in enumerate(keys) if key not in self.rows]
+                if not fresh:
+                    return
+                start = self._vectors_path.stat().st_size // (dim * 2) if self._vectors_path.exists() else 0
+                block = vectors[[index for index, _ in fresh]].astype(np.float16)
+                with open(self._vectors_path, "ab") as handle:
+                    handle.write(block.tobytes())
+                records = np.array(
+                    [(key, start + offset) for offset, (_, key) in enumerate(fresh)], dtype=EMBED_RECORD
+                )
+                with open(self._keys_path, "ab") as handle:
+                    handle.write(records.tobytes())
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class EmbeddingCache:
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.capacity = _env_int("OFFICE_EMBED_CACHE_SIZE", DEFAULT_EMBED_CACHE_SIZE)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self._disk = (
+            _DiskTier(embedding_cache_root() / slug, _env_int("OFFICE_EMBED_DISK_CACHE_MAX_ROWS", DEFAULT_EMBED_DISK_CACHE_MAX_ROWS))
+            if _disk_cache_enabled()
+            else None
+        )
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: bytes, vector: np.ndarray) -> None:
+        if not self.capacity:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def encode(self, encoder, sentences: list[str]) -> np.ndarray:
+        keys = [sentence_key(self.model_name, sentence) for sentence in sentences]
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            self.memory_hits += sum(1 for key in keys if key in found)
+            pending = [key for key in dict.fromkeys(keys) if key not in found]
+            if pending and self._disk is not None:
+                from_disk = self._disk.get_many(pending)
+                for key, vector in from_disk.items():
+                    self._remember(key, vector)
+                found.update(from_disk)
+                self.disk_hits += sum(1 for key in keys if key in from_disk)
+
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            first_sentence = {}
+            for key, sentence in zip(keys, sentences):
+                first_sentence.setdefault(key, sentence)
+            encoded = np.asarray(encoder([first_sentence[key] for key in missing]), dtype=np.float32)
+            with self._lock:
+                self.misses += sum(1 for key in keys if key not in found)
+                for key, vector in zip(missing, encoded):
+                    found[key] = vector
+                    self._remember(key, vector)
+                if self._disk is not None:
+                    try:
+                        self._disk.put_many(missing, encoded)
+                    except OSError:
+                        pass
+        return np.vstack([found[key] for key in keys])
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "model": self.model_name,
+            "lookups": lookups,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "memory_hit_rate": round(self.memory_hits / lookups, 4) if lookups else 0.0,
+            "disk_hit_rate": round(self.disk_hits / lookups, 4) if lookups else 0.0,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+_CACHES: dict[str, EmbeddingCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_embedding_cache(model_name: str) -> EmbeddingCache:
+    with _CACHES_LOCK:
+        cache = _CACHES.get(model_name)
+        if cache is None:
+            cache = _CACHES[model_name] = EmbeddingCache(model_name)
+        return cache
+
+
+def reset_embedding_caches() -> None:
+    with _CACHES_LOCK:
+        _CACHES.clear()
+
+
+def encode_sentences(model, model_name: str, sentences: list[str]) -> np.ndarray:
+    def encoder(batch: list[str]) -> np.ndarray:
+        if embedding_batching_enabled():
+            return get_embedding_batcher(model).encode(batch)
+        return model.encode(batch, normalize_embeddings=True)
+
+    if not embedding_cache_enabled():
+        return np.asarray(encoder(sentences), dtype=np.float32)
+    return get_embedding_cache(model_name).encode(encoder, sentences)
+
+
+def embedding_cache_stats() -> dict:
+    with _CACHES_LOCK:
+        caches = list(_CACHES.values())
+    memory_hits = sum(cache.memory_hits for cache in caches)
+    disk_hits = sum(cache.disk_hits for cache in caches)
+    misses = sum(cache.misses for cache in caches)
+    lookups = memory_hits + disk_hits + misses
+    return {
+        "lookups": lookups,
+        "memory_hit_rate": round(memory_hits / lookups, 4) if lookups else 0.0,
+        "disk_hit_rate": round(disk_hits / lookups, 4) if lookups else 0.0,
+        "hit_rate": round((memory_hits + disk_hits) / lookups, 4) if lookups else 0.0,
+        "models": [cache.stats() for cache in caches],
+    }
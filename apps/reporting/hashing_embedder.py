@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+from office_copilot.keywords import WORD_PATTERN
+
+HASHING_MODEL_PREFIX = "hashing"
+DEFAULT_HASHING_FEATURES = 1024
+DEFAULT_HASHING_NGRAMS = 2
+
+
+@lru_cache(maxsize=200_000)
+def _feature(term: str) -> int:
+    return zlib.crc32(term.encode("utf-8"))
+
+
+def is_hashing_model(name: str) -> bool:
+    return name == HASHING_MODEL_PREFIX or name.startswith(f"{HASHING_MODEL_PREFIX}-")
+
+
+class HashingEmbedder:
+    def __init__(self, n_features: int = DEFAULT_HASHING_FEATURES, ngrams: int = DEFAULT_HASHING_NGRAMS):
+        self.n_features = max(8, n_features)
+        self.ngrams = max(1, ngrams)
+
+    @classmethod
+    def from_name(cls, name: str) -> HashingEmbedder:
+        parts = name.split("-")[1:]
+        try:
+            n_features = int(parts[0]) if parts else DEFAULT_HASHING_FEATURES
+            ngrams = int(parts[1]) if len(parts) > 1 else DEFAULT_HASHING_NGRAMS
+        except ValueError as exc:
+            raise ValueError(f"Hashing model names look like 'hashing-1024-2', got {name!r}.") from exc
+        return cls(n_features, ngrams)
+
+    def _terms(self, sentence: str) -> list[str]:
+        tokens = WORD_PATTERN.findall(sentence.lower())
+        terms = list(tokens)
+        for size in range(2, self.ngrams + 1):
+            terms.extend(" ".join(tokens[start : start + size]) for start in range(len(tokens) - size + 1))
+        return terms
+
+    def encode(self, sentences, normalize_embeddings: bool = True, **kwargs) -> np.ndarray:
+        if isinstance(sentences, str):
+            return self.encode([sentences], normalize_embeddings)[0]
+        rows = []
+        features = []
+        for row, sentence in enumerate(sentences):
+            hashed = [_feature(term) for term in self._terms(sentence)]
+            rows.extend([row] * len(hashed))
+            features.extend(hashed)
+
+        hashed = np.asarray(features, dtype=np.uint32)
+        columns = (hashed % self.n_features).astype(np.int64)
+        signs = np.where(hashed & 0x80000000, -1.0, 1.0)
+        cells = np.asarray(rows, dtype=np.int64) * self.n_features + columns
+        vectors = np.bincount(cells, weights=signs, minlength=len(sentences) * self.n_features)
+        vectors = vectors.reshape(len(sentences), self.n_features).astype(np.float32)
+        if normalize_embeddings:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import html
+import os
+from tempfile import SpooledTemporaryFile
+
+import numpy as np
+import pandas as pd
+
+from office_copilot.artifacts import artifact_buffer, finish_artifact
+
+DEFAULT_HTML_REPORT_POINTS = 2_000
+HTML_REPORT_MAX_SERIES = 6
+HTML_REPORT_MAX_TIME_AXES = 2
+HTML_REPORT_HISTOGRAM_BINS = 40
+
+
+def html_report_available() -> bool:
+    try:
+        import plotly  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def html_report_points() -> int:
+    try:
+        value = int(os.getenv("OFFICE_HTML_REPORT_POINTS", str(DEFAULT_HTML_REPORT_POINTS)))
+    except ValueError:
+        value = DEFAULT_HTML_REPORT_POINTS
+    return max(3, value)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    size = len(x)
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+
+    edges = np.append(np.linspace(1, size - 1, threshold - 1).astype(np.int64), size)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = size - 1
+    anchor = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        average_x = x[next_start:next_end].mean()
+        average_y = y[next_start:next_end].mean()
+        area = np.abs(
+            (x[anchor] - average_x) * (y[start:end] - y[anchor])
+            - (x[anchor] - x[start:end]) * (average_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(area))
+        selected[bucket + 1] = anchor
+    return selected
+
+
+def minmax_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    size = len(y)
+    if threshold >= size or threshold < 4:
+        return np.arange(size)
+    buckets = threshold // 2
+    edges = np.linspace(0, size, buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    lows = np.minimum.reduceat(y, starts)
+    highs = np.maximum.reduceat(y, starts)
+    indices = []
+    for start, end, low, high in zip(starts, edges[1:], lows, highs):
+        window = y[start:end]
+        indices.append(start + int(np.argmax(window == low)))
+        indices.append(start + int(np.argmax(window == high)))
+    return np.unique(np.asarray(indices, dtype=np.int64))
+
+
+def _downsampled_series(frame: pd.DataFrame, time_col: str, value_col: str, points: int) -> tuple[np.ndarray, np.ndarray]:
+    pair = frame[[time_col, value_col]].dropna().sort_values(time_col, kind="mergesort")
+    times = pair[time_col].to_numpy(dtype="datetime64[ns]")
+    values = pair[value_col].to_numpy(dtype=np.float64)
+    if len(values) > points * 50:
+        keep = minmax_indices(values, points * 4)
+        times, values = times[keep], values[keep]
+    keep = lttb_indices(times.view(np.int64).astype(np.float64), values, points)
+    return times[keep], values[keep]
+
+
+def _trend_figures(frame: pd.DataFrame, datetime_cols: list[str], numeric_cols: list[str], points: int) -> list:
+    import plotly.graph_objects as go
+
+    figures = []
+    for time_col in datetime_cols[:HTML_REPORT_MAX_TIME_AXES]:
+        figure = go.Figure()
+        for value_col in numeric_cols[:HTML_REPORT_MAX_SERIES]:
+            times, values = _downsampled_series(frame, time_col, value_col, points)
+            if len(values):
+                figure.add_trace(go.Scattergl(x=times, y=values, mode="lines", name=str(value_col)))
+        if figure.data:
+            figure.update_layout(title=f"Trends over {time_col}", height=420, template="plotly_white")
+            figures.append(figure)
+    return figures
+
+
+def _distribution_figures(frame: pd.DataFrame, numeric_cols: list[str]) -> list:
+    import plotly.graph_objects as go
+
+    figures = []
+    for value_col in numeric_cols[:HTML_REPORT_MAX_SERIES]:
+        values = frame[value_col].to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            continue
+        counts, edges = np.histogram(values, bins=HTML_REPORT_HISTOGRAM_BINS)
+        figure = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), name=str(value_col)))
+        figure.update_layout(title=f"Distribution of {value_col}", height=320, template="plotly_white", bargap=0)
+        figures.append(figure)
+    return figures
+
+
+def build_html_report(
+    frame: pd.DataFrame, summary: dict, datetime_cols: list[str], numeric_cols: list[str]
+) -> SpooledTemporaryFile | None:
+    if not html_report_available():
+        return None
+    import plotly.io as pio
+    from plotly.offline import get_plotlyjs
+
+    points = html_report_points()
+    figures = _trend_figures(frame, datetime_cols, numeric_cols, points) + _distribution_figures(frame, numeric_cols)
+    title = html.escape(f"Data Analysis Report - {summary.get('filename', '')}")
+
+    output = artifact_buffer()
+    output.write(f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{title}</title>".encode("utf-8"))
+    output.write(b"<script type=\"text/javascript\">")
+    output.write(get_plotlyjs().encode("utf-8"))
+    output.write(b"</script></head><body>")
+    output.write(f"<h1>{title}</h1>".encode("utf-8"))
+    overview = (
+        f"{summary.get('rows_after_cleaning', 0)} clean rows, "
+        f"{len(numeric_cols)} numeric columns, {len(datetime_cols)} datetime columns."
+    )
+    output.write(f"<p>{html.escape(overview)}</p>".encode("utf-8"))
+    if not figures:
+        output.write(b"<p>No numeric columns available to chart.</p>")
+    for figure in figures:
+        output.write(pio.to_html(figure, include_plotlyjs=False, full_html=False).encode("utf-8"))
+    output.write(b"</body></html>")
+    return finish_artifact(output)
@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import os
+import re
+import shutil
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+
+from office_copilot.uploads import compression_codec, open_decompressed
+
+from .columnar import MANIFEST_NAME, has_columnar, prune_columnar_root, read_columnar, write_columnar
+
+COLUMNAR_CACHE_DIRNAME = ".columnar"
+DEFAULT_COLUMNAR_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+DEFAULT_COLUMNAR_CACHE_MAX_AGE_DAYS = 7
+DATA_FILE_SUFFIXES = (".csv", ".xlsx", ".xls")
+CSV_SNIFF_BYTES = 64 * 1024
+CSV_DELIMITERS = ",;\t|"
+CSV_FALLBACK_ENCODINGS = ("cp1252", "latin-1")
+CSV_TYPE_HINT_RATIO = 0.95
+DECIMAL_COMMA_PATTERN = re.compile(r"^-?\d{1,3}(\.\d{3})*,\d+$|^-?\d+,\d+$")
+PYARROW_UNSUPPORTED_OPTIONS = ("memory_map", "thousands")
+SPOOL_CHUNK_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class CsvDialect:
+    encoding: str
+    delimiter: str
+    has_header: bool
+    decimal: str = "."
+    thousands: str | None = None
+    dtypes: dict[str, str] = field(default_factory=dict)
+    parse_dates: list[str] = field(default_factory=list)
+
+    def read_csv_kwargs(self, with_hints: bool = True) -> dict:
+        kwargs = {
+            "encoding": self.encoding,
+            "sep": self.delimiter,
+            "header": 0 if self.has_header else None,
+            "decimal": self.decimal,
+        }
+        if self.thousands:
+            kwargs["thousands"] = self.thousands
+        if with_hints and self.dtypes:
+            kwargs["dtype"] = dict(self.dtypes)
+        if with_hints and self.parse_dates:
+            kwargs["parse_dates"] = list(self.parse_dates)
+        return kwargs
+
+
+def source_path(uploaded_file) -> str | None:
+    if isinstance(uploaded_file, (str, os.PathLike)):
+        path = os.fspath(uploaded_file)
+    else:
+        try:
+            path = uploaded_file.path
+        except (AttributeError, NotImplementedError, ValueError):
+            return None
+    return path if path and os.path.isfile(path) else None
+
+
+@contextmanager
+def local_source_path(uploaded_file, filename: str) -> Iterator[str]:
+    path = source_path(uploaded_file)
+    if path is not None:
+        yield path
+        return
+    handle = tempfile.NamedTemporaryFile(suffix=Path(filename).suffix, delete=False)
+    try:
+        with handle:
+            shutil.copyfileobj(uploaded_file, handle, SPOOL_CHUNK_BYTES)
+        yield handle.name
+    finally:
+        os.unlink(handle.name)
+
+
+def columnar_cache_enabled() -> bool:
+    return os.getenv("OFFICE_COLUMNAR_CACHE", "True") == "True"
+
+
+def columnar_cache_root(path) -> Path:
+    configured_root = os.getenv("OFFICE_COLUMNAR_CACHE_DIR", "").strip()
+    return Path(configured_root) if configured_root else Path(path).parent / COLUMNAR_CACHE_DIRNAME
+
+
+def columnar_cache_dir(path) -> Path:
+    source = Path(path)
+    stat = source.stat()
+    return columnar_cache_root(source) / f"{source.name}-{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def columnar_cache_max_bytes() -> int:
+    try:
+        value = int(os.getenv("OFFICE_COLUMNAR_CACHE_MAX_BYTES", str(DEFAULT_COLUMNAR_CACHE_MAX_BYTES)))
+    except ValueError:
+        value = DEFAULT_COLUMNAR_CACHE_MAX_BYTES
+    return max(0, value)
+
+
+def columnar_cache_max_age_seconds() -> float:
+    try:
+        value = float(os.getenv("OFFICE_COLUMNAR_CACHE_MAX_AGE_DAYS", str(DEFAULT_COLUMNAR_CACHE_MAX_AGE_DAYS)))
+    except ValueError:
+        value = DEFAULT_COLUMNAR_CACHE_MAX_AGE_DAYS
+    return max(0.0, value) * 86400
+
+
+def prune_columnar_cache(root, max_bytes: int | None = None, max_age_seconds: float | None = None, keep=()) -> dict:
+    return prune_columnar_root(
+        root,
+        columnar_cache_max_bytes() if max_bytes is None else max(0, max_bytes),
+        columnar_cache_max_age_seconds() if max_age_seconds is None else max_age_seconds,
+        keep=keep,
+    )
+
+
+def _detect_encoding(prefix: bytes) -> str:
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        from charset_normalizer import from_bytes
+
+        best = from_bytes(prefix).best()
+        if best is not None and best.encoding:
+            return best.encoding
+    except ImportError:
+        pass
+    for encoding in CSV_FALLBACK_ENCODINGS:
+        try:
+            prefix.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"
+
+
+def _detect_delimiter(sample: str) -> str:
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        pass
+    lines = [line for line in sample.splitlines()[:50] if line.strip()]
+    if not lines:
+        return ","
+    best, best_score = ",", 0
+    for delimiter in CSV_DELIMITERS:
+        counts = [line.count(delimiter) for line in lines]
+        if not counts[0]:
+            continue
+        score = sum(1 for count in counts if count == counts[0])
+        if score > best_score:
+            best, best_score = delimiter, score
+    return best
+
+
+def _looks_numeric(value: str) -> bool:
+    text = value.strip()
+    if not text:
+        return False
+    try:
+        float(text.replace(",", "."))
+        return True
+    except ValueError:
+        return bool(DECIMAL_COMMA_PATTERN.match(text))
+
+
+def _column_type_hints(frame: pd.DataFrame) -> tuple[dict[str, str], list[str]]:
+    dtypes = {}
+    parse_dates = []
+    for column in frame.columns:
+        series = frame[column]
+        if pd.api.types.is_float_dtype(series.dtype):
+            dtypes[column] = "float64"
+            continue
+        if series.dtype != object:
+            continue
+        values = series.dropna().astype(str)
+        if values.empty or values.str.fullmatch(r"-?\d+(\.\d+)?").mean() >= CSV_TYPE_HINT_RATIO:
+            continue
+        parsed = pd.to_datetime(values, errors="coerce", format="mixed")
+        if float(parsed.notna().mean()) >= CSV_TYPE_HINT_RATIO:
+            parse_dates.append(column)
+    return dtypes, parse_dates
+
+
+def sniff_csv(prefix: bytes) -> CsvDialect:
+    encoding = _detect_encoding(prefix)
+    text = prefix.decode(encoding, errors="ignore")
+    if len(prefix) >= CSV_SNIFF_BYTES and "\n" in text:
+        text = text[: text.rindex("\n")]
+    delimiter = _detect_delimiter(text)
+
+    rows = list(csv.reader(StringIO(text), delimiter=delimiter))
+    first_row = rows[0] if rows else []
+    has_header = not all(_looks_numeric(cell) for cell in first_row if cell.strip())
+    if not has_header:
+        try:
+            has_header = csv.Sniffer().has_header(text)
+        except csv.Error:
+            has_header = False
+
+    body = rows[1:] if has_header else rows
+    cells = [cell.strip() for row in body for cell in row if cell.strip()]
+    decimal_comma = [cell for cell in cells if DECIMAL_COMMA_PATTERN.match(cell)]
+    decimal, thousands = ".", None
+    if delimiter != "," and decimal_comma and len(decimal_comma) >= 0.5 * sum(1 for cell in cells if _looks_numeric(cell)):
+        decimal = ","
+        if any("." in cell for cell in decimal_comma):
+            thousands = "."
+
+    dialect = CsvDialect(encoding=encoding, delimiter=delimiter, has_header=has_header, decimal=decimal, thousands=thousands)
+    try:
+        sample_frame = pd.read_csv(StringIO(text), **dialect.read_csv_kwargs(with_hints=False))
+    except (ValueError, pd.errors.ParserError):
+        return dialect
+    dtypes, parse_dates = _column_type_hints(sample_frame)
+    return CsvDialect(
+        encoding=encoding,
+        delimiter=delimiter,
+        has_header=has_header,
+        decimal=decimal,
+        thousands=thousands,
+        dtypes={str(key): value for key, value in dtypes.items()} if has_header else {},
+        parse_dates=[str(column) for column in parse_dates] if has_header else [],
+    )
+
+
+def csv_engine() -> str:
+    configured = os.getenv("OFFICE_CSV_ENGINE", "auto").strip().lower()
+    if configured in {"c", "python", "pyarrow"}:
+        return configured
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "c"
+    return "pyarrow"
+
+
+def _read_prefix(source) -> bytes:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as handle:
+            return handle.read(CSV_SNIFF_BYTES)
+    position = source.tell()
+    prefix = source.read(CSV_SNIFF_BYTES)
+    source.seek(position)
+    return prefix if isinstance(prefix, bytes) else prefix.encode("utf-8")
+
+
+class _ReplayReader(io.RawIOBase):
+    def __init__(self, prefix: bytes, stream):
+        self._prefix = memoryview(prefix)
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._prefix:
+            size = min(len(buffer), len(self._prefix))
+            buffer[:size] = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return size
+        data = self._stream.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _read_csv_stream(stream) -> pd.DataFrame:
+    prefix = stream.read(CSV_SNIFF_BYTES)
+    dialect = replace(sniff_csv(prefix), dtypes={})
+    try:
+        return pd.read_csv(io.BufferedReader(_ReplayReader(prefix, stream)), engine="c", **dialect.read_csv_kwargs())
+    except (ValueError, TypeError, pd.errors.ParserError) as exc:
+        raise ValueError(f"Could not parse CSV file: {exc}") from exc
+
+
+def read_csv_source(source, memory_map: bool = False) -> pd.DataFrame:
+    if not isinstance(source, (str, os.PathLike)) and hasattr(source, "seekable") and not source.seekable():
+        return _read_csv_stream(source)
+    dialect = sniff_csv(_read_prefix(source))
+    engine = csv_engine()
+    start = None if isinstance(source, (str, os.PathLike)) else source.tell()
+    attempts = [(engine, True), (engine, False)]
+    if engine != "c":
+        attempts.extend([("c", True), ("c", False)])
+    last_error = None
+    for attempt_engine, with_hints in attempts:
+        kwargs = dialect.read_csv_kwargs(with_hints=with_hints)
+        if memory_map:
+            kwargs["memory_map"] = True
+        if attempt_engine == "pyarrow":
+            for option in PYARROW_UNSUPPORTED_OPTIONS:
+                kwargs.pop(option, None)
+            if dialect.thousands:
+                continue
+        if start is not None:
+            source.seek(start)
+        try:
+            return pd.read_csv(source, engine=attempt_engine, **kwargs)
+        except (ValueError, TypeError, pd.errors.ParserError) as exc:
+            last_error = exc
+    raise ValueError(f"Could not parse CSV file: {last_error}")
+
+
+def parse_data_source(source, lower_name: str) -> pd.DataFrame:
+    if compression_codec(lower_name):
+        with open_decompressed(source, lower_name, DATA_FILE_SUFFIXES) as (stream, inner_name):
+            if inner_name.endswith(".csv"):
+                return read_csv_source(stream)
+            return pd.read_excel(io.BytesIO(stream.read()))
+    if lower_name.endswith(".csv"):
+        return read_csv_source(source, memory_map=isinstance(source, (str, os.PathLike)))
+    return pd.read_excel(source)
+
+
+def load_mapped_dataframe(path: str, filename: str) -> pd.DataFrame:
+    lower_name = filename.lower()
+    cache_dir = columnar_cache_dir(path) if columnar_cache_enabled() else None
+    if cache_dir is not None and has_columnar(cache_dir):
+        try:
+            os.utime(cache_dir / MANIFEST_NAME)
+        except OSError:
+            pass
+        return read_columnar(cache_dir)
+
+    dataframe = parse_data_source(path, lower_name)
+    if cache_dir is None:
+        return dataframe
+    try:
+        write_columnar(dataframe, cache_dir)
+    except OSError:
+        return dataframe
+    del dataframe
+    prune_columnar_cache(cache_dir.parent, keep=[cache_dir])
+    return read_columnar(cache_dir)
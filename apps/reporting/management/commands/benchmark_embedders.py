@@ -0,0 +1,86 @@
+import random
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.reporting.ai_runtime import (
+    FREQUENCY_MODEL_NAMES,
+    MODEL_REGISTRY,
+    _frequency_rank_sentences,
+    embedding_rank_sentences,
+    get_runtime_profile,
+    split_sentences,
+)
+
+BENCHMARK_VOCABULARY = (
+    "revenue growth margin cost supplier risk hiring plan cloud budget forecast customer churn quarter "
+    "pipeline renewal contract audit compliance inventory logistics pricing discount region launch"
+).split()
+
+
+def _synthetic_sentences(count: int, seed: int) -> list[str]:
+    generator = random.Random(seed)
+    return [
+        " ".join(generator.choice(BENCHMARK_VOCABULARY) for _ in range(generator.randint(8, 24))).capitalize() + "."
+        for _ in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Time key-point ranking for each embedding backend on the same sentences."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--models",
+            nargs="+",
+            default=None,
+            help="Backends to compare (default: nltk-frequency, hashing and the configured OFFICE_EMBED_MODEL).",
+        )
+        parser.add_argument("--file", default=None, help="Text file to rank instead of synthetic sentences.")
+        parser.add_argument("--sentences", type=int, default=5000, help="Synthetic sentence count.")
+        parser.add_argument("--max-points", type=int, default=8)
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Timed runs per backend; the first and best later run are reported."
+        )
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        if options["file"]:
+            try:
+                sentences = split_sentences(Path(options["file"]).read_text(encoding="utf-8", errors="ignore"))
+            except OSError as exc:
+                raise CommandError(f"Could not read {options['file']}: {exc}") from exc
+        else:
+            sentences = _synthetic_sentences(max(1, options["sentences"]), options["seed"])
+        models = options["models"] or list(
+            dict.fromkeys(["nltk-frequency", "hashing", get_runtime_profile().embedding_model])
+        )
+        max_points = max(1, options["max_points"])
+
+        baseline = None
+        self.stdout.write(f"{len(sentences)} sentences, top {max_points} key points")
+        for name in models:
+            started = time.perf_counter()
+            model = None if name in FREQUENCY_MODEL_NAMES else MODEL_REGISTRY.get(name)
+            load_seconds = time.perf_counter() - started
+            if name not in FREQUENCY_MODEL_NAMES and model is None:
+                error = MODEL_REGISTRY.status().get(name, {}).get("last_error", "")
+                self.stdout.write(f"{name}: unavailable {error}".rstrip())
+                continue
+
+            timings = []
+            for _ in range(max(1, options["repeat"])):
+                started = time.perf_counter()
+                if model is None:
+                    points = _frequency_rank_sentences(sentences, max_points)
+                else:
+                    points = embedding_rank_sentences(model, name, sentences, max_points)
+                timings.append(time.perf_counter() - started)
+            best = min(timings[1:] or timings)
+            baseline = points if baseline is None else baseline
+            overlap = len(set(points) & set(baseline)) / max(len(baseline), 1)
+            self.stdout.write(
+                f"{name}: load {load_seconds:.3f}s, first rank {timings[0]:.3f}s, best rank {best:.3f}s "
+                f"({len(sentences) / max(best, 1e-9):,.0f} sentences/s), overlap with {models[0]} {overlap:.0%}"
+            )
@@ -0,0 +1,35 @@
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.reporting.ingestion import (
+    COLUMNAR_CACHE_DIRNAME,
+    columnar_cache_max_age_seconds,
+    columnar_cache_max_bytes,
+    prune_columnar_cache,
+)
+
+
+class Command(BaseCommand):
+    help = "Remove expired and least recently used columnar copies of uploaded datasets."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-bytes", type=int, default=None, help="Size cap per cache directory (default: configured cap).")
+        parser.add_argument("--max-age-days", type=float, default=None, help="Drop entries unused for longer than this.")
+
+    def handle(self, *args, **options):
+        max_bytes = options["max_bytes"] if options["max_bytes"] is not None else columnar_cache_max_bytes()
+        max_age = options["max_age_days"] * 86400 if options["max_age_days"] is not None else columnar_cache_max_age_seconds()
+        configured_root = os.getenv("OFFICE_COLUMNAR_CACHE_DIR", "").strip()
+        if configured_root:
+            roots = [Path(configured_root)]
+        else:
+            roots = sorted(path for path in Path(settings.MEDIA_ROOT).rglob(COLUMNAR_CACHE_DIRNAME) if path.is_dir())
+        for root in roots:
+            result = prune_columnar_cache(root, max_bytes=max_bytes, max_age_seconds=max_age)
+            self.stdout.write(
+                f"{root}: removed {result['removed']} entries ({result['freed_bytes']} bytes), "
+                f"{result['entries']} entries ({result['remaining_bytes']} bytes) remain under a {max_bytes} byte cap."
+            )
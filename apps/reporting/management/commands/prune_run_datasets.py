@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from apps.reporting.models import DataAnalysisRun
+from apps.reporting.queries import prune_run_datasets, run_dataset_max_age_seconds, run_dataset_max_bytes, run_dataset_root
+
+
+class Command(BaseCommand):
+    help = "Remove stored query datasets for deleted or failed runs and expire old ones past the retention limits."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-bytes", type=int, default=None, help="Size cap to prune to (default: configured cap).")
+        parser.add_argument("--max-age-days", type=float, default=None, help="Drop datasets older than this.")
+
+    def handle(self, *args, **options):
+        max_bytes = options["max_bytes"] if options["max_bytes"] is not None else run_dataset_max_bytes()
+        max_age = options["max_age_days"] * 86400 if options["max_age_days"] is not None else run_dataset_max_age_seconds()
+        live = DataAnalysisRun.objects.exclude(status=DataAnalysisRun.Status.FAILED).values_list("id", flat=True)
+        result = prune_run_datasets(live, max_bytes=max_bytes, max_age_seconds=max_age)
+        self.stdout.write(
+            f"{run_dataset_root()}: removed {result['orphans_removed']} orphaned and {result['removed']} expired datasets "
+            f"({result['freed_bytes']} bytes), {result['entries']} datasets ({result['remaining_bytes']} bytes) remain "
+            f"under a {max_bytes} byte cap."
+        )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from office_copilot.text_cache import prune_text_cache, text_cache_dir, text_cache_max_bytes
+
+
+class Command(BaseCommand):
+    help = "Evict least recently used entries from the extracted-text cache until it fits the size cap."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-bytes", type=int, default=None, help="Size cap to prune to (default: configured cap).")
+
+    def handle(self, *args, **options):
+        max_bytes = options["max_bytes"] if options["max_bytes"] is not None else text_cache_max_bytes()
+        result = prune_text_cache(max_bytes)
+        self.stdout.write(
+            f"{text_cache_dir()}: removed {result['removed']} entries ({result['freed_bytes']} bytes), "
+            f"{result['entries']} entries ({result['remaining_bytes']} bytes) remain under a {max_bytes} byte cap."
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0002_dataanalysisrun_documentreportrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataanalysisrun',
+            name='sheet_summaries',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
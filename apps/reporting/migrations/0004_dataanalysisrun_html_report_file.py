@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0003_dataanalysisrun_sheet_summaries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataanalysisrun',
+            name='html_report_file',
+            field=models.FileField(blank=True, upload_to='reporting/data_runs/html/'),
+        ),
+    ]
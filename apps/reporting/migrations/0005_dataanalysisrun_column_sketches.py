@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0004_dataanalysisrun_html_report_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataanalysisrun',
+            name='column_sketches',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
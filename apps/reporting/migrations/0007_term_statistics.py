@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0006_document_near_duplicates'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermCorpus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tenant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='term_corpus', to='tenants.tenant')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TermStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('document_frequency', models.PositiveIntegerField(default=0)),
+                ('total_frequency', models.PositiveBigIntegerField(default=0)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_statistics', to='tenants.tenant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tenant', '-document_frequency', '-total_frequency'], name='reporting_term_top_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tenant', 'term'), name='reporting_unique_tenant_term')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0007_term_statistics'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentPassage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('text', models.TextField()),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='passages', to='reporting.documentreportrun')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_passages', to='tenants.tenant')),
+            ],
+            options={
+                'ordering': ['run', 'position'],
+                'constraints': [models.UniqueConstraint(fields=('run', 'position'), name='reporting_unique_run_passage')],
+            },
+        ),
+    ]
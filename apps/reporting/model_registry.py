@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+DEFAULT_MODEL_LOAD_ATTEMPTS = 2
+DEFAULT_MODEL_LOAD_BACKOFF_SECONDS = 0.5
+DEFAULT_MODEL_RETRY_COOLDOWN_SECONDS = 60.0
+MODEL_RETRY_COOLDOWN_MAX_DOUBLINGS = 5
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, str(default)))
+    except ValueError:
+        value = default
+    return max(0.0, value)
+
+
+@dataclass
+class _ModelSlot:
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    model: object = None
+    failures: int = 0
+    retry_after: float = 0.0
+    last_error: str = ""
+    load_seconds: float = 0.0
+
+
+class ModelRegistry:
+    def __init__(self, loader: Callable[[str], object]):
+        self._loader = loader
+        self._slots: dict[str, _ModelSlot] = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, name: str) -> _ModelSlot:
+        slot = self._slots.get(name)
+        if slot is None:
+            with self._lock:
+                slot = self._slots.setdefault(name, _ModelSlot())
+        return slot
+
+    def get(self, name: str):
+        slot = self._slot(name)
+        if slot.model is not None:
+            return slot.model
+        if time.monotonic() < slot.retry_after:
+            return None
+        with slot.lock:
+            if slot.model is not None:
+                return slot.model
+            if time.monotonic() < slot.retry_after:
+                return None
+            return self._load(name, slot)
+
+    def _load(self, name: str, slot: _ModelSlot):
+        attempts = max(1, int(_env_float("OFFICE_EMBED_LOAD_ATTEMPTS", DEFAULT_MODEL_LOAD_ATTEMPTS)))
+        backoff = _env_float("OFFICE_EMBED_LOAD_BACKOFF_SECONDS", DEFAULT_MODEL_LOAD_BACKOFF_SECONDS)
+        for attempt in range(attempts):
+            started = time.monotonic()
+            try:
+                model = self._loader(name)
+            except ImportError as exc:
+                slot.last_error = repr(exc)
+                slot.failures += 1
+                slot.retry_after = math.inf
+                return None
+            except Exception as exc:
+                slot.last_error = repr(exc)
+                if attempt + 1 < attempts:
+                    time.sleep(backoff * (2**attempt))
+                continue
+            slot.model = model
+            slot.failures = 0
+            slot.retry_after = 0.0
+            slot.last_error = ""
+            slot.load_seconds = round(time.monotonic() - started, 3)
+            return model
+
+        slot.failures += 1
+        cooldown = _env_float("OFFICE_EMBED_RETRY_COOLDOWN_SECONDS", DEFAULT_MODEL_RETRY_COOLDOWN_SECONDS)
+        slot.retry_after = time.monotonic() + cooldown * (2 ** min(slot.failures - 1, MODEL_RETRY_COOLDOWN_MAX_DOUBLINGS))
+        return None
+
+    def status(self) -> dict[str, dict]:
+        now = time.monotonic()
+        with self._lock:
+            slots = dict(self._slots)
+        return {
+            name: {
+                "loaded": slot.model is not None,
+                "failures": slot.failures,
+                "last_error": slot.last_error,
+                "load_seconds": slot.load_seconds,
+                "retry_in_seconds": (
+                    None if math.isinf(slot.retry_after) else round(max(slot.retry_after - now, 0.0), 1)
+                ),
+            }
+            for name, slot in slots.items()
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slots.clear()
@@ -34,8 +34,11 @@ class DataAnalysisRun(models.Model):
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="data_analysis_runs")
     source_file = models.FileField(upload_to="reporting/data_runs/source/")
     workbook_file = models.FileField(upload_to="reporting/data_runs/output/", blank=True)
+    html_report_file = models.FileField(upload_to="reporting/data_runs/html/", blank=True)
     status = models.CharField(max_length=16, choices=Status.choices, default=Status.PROCESSING)
     summary = models.JSONField(default=dict, blank=True)
+    sheet_summaries = models.JSONField(default=list, blank=True)
+    column_sketches = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -57,6 +60,10 @@ class DocumentReportRun(models.Model):
     powerpoint_file = models.FileField(upload_to="reporting/doc_reports/output/", blank=True)
     status = models.CharField(max_length=16, choices=Status.choices, default=Status.PROCESSING)
     summary = models.JSONField(default=dict, blank=True)
+    similarity = models.FloatField(null=True, blank=True)
+    duplicate_of = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, null=True, blank=True, related_name="near_duplicates"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -64,3 +71,65 @@ class DocumentReportRun(models.Model):
 
     def __str__(self):
         return f"Document Report #{self.id}"
+
+
+class DocumentSignature(models.Model):
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name="document_signatures")
+    run = models.OneToOneField(DocumentReportRun, on_delete=models.CASCADE, related_name="signature")
+    signature = models.BinaryField()
+    shingle_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Signature for Document Report #{self.run_id}"
+
+
+class DocumentSignatureBand(models.Model):
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name="document_signature_bands")
+    signature = models.ForeignKey(DocumentSignature, on_delete=models.CASCADE, related_name="bands")
+    band = models.PositiveSmallIntegerField()
+    bucket = models.CharField(max_length=16)
+
+    class Meta:
+        indexes = [models.Index(fields=["tenant", "band", "bucket"])]
+
+
+class TermCorpus(models.Model):
+    tenant = models.OneToOneField(Tenant, on_delete=models.CASCADE, related_name="term_corpus")
+    document_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Term corpus for {self.tenant}"
+
+
+class TermStatistic(models.Model):
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name="term_statistics")
+    term = models.CharField(max_length=64)
+    document_frequency = models.PositiveIntegerField(default=0)
+    total_frequency = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["tenant", "term"], name="reporting_unique_tenant_term")]
+        indexes = [
+            models.Index(
+                fields=["tenant", "-document_frequency", "-total_frequency"], name="reporting_term_top_idx"
+            )
+        ]
+
+    def __str__(self):
+        return self.term
+
+
+class DocumentPassage(models.Model):
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name="document_passages")
+    run = models.ForeignKey(DocumentReportRun, on_delete=models.CASCADE, related_name="passages")
+    position = models.PositiveIntegerField()
+    text = models.TextField()
+
+    class Meta:
+        ordering = ["run", "position"]
+        constraints = [models.UniqueConstraint(fields=["run", "position"], name="reporting_unique_run_passage")]
+
+    def __str__(self):
+        return f"Document Report #{self.run_id} passage {self.position}"
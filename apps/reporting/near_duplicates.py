@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import zlib
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+
+from .models import DocumentReportRun, DocumentSignature, DocumentSignatureBand
+
+MINHASH_PERMUTATIONS = 128
+MINHASH_BANDS = 16
+MINHASH_ROWS_PER_BAND = MINHASH_PERMUTATIONS // MINHASH_BANDS
+MINHASH_PRIME = (1 << 31) - 1
+SHINGLE_WORDS = 5
+SHINGLE_CHUNK = 4096
+DEFAULT_NEAR_DUPLICATE_THRESHOLD = 0.9
+SHINGLE_TOKEN_PATTERN = re.compile(r"\w+")
+
+_generator = np.random.default_rng(0x5EED)
+_MULTIPLIERS = _generator.integers(1, MINHASH_PRIME, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_OFFSETS = _generator.integers(0, MINHASH_PRIME, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+def near_duplicate_threshold() -> float:
+    try:
+        value = float(os.getenv("OFFICE_NEAR_DUPLICATE_THRESHOLD", str(DEFAULT_NEAR_DUPLICATE_THRESHOLD)))
+    except ValueError:
+        value = DEFAULT_NEAR_DUPLICATE_THRESHOLD
+    return min(max(value, 0.0), 1.0)
+
+
+class MinHasher:
+    def __init__(self):
+        self.signature = np.full(MINHASH_PERMUTATIONS, MINHASH_PRIME, dtype=np.uint64)
+        self.shingles = 0
+        self._tail: list[str] = []
+
+    def update(self, text: str) -> None:
+        tokens = self._tail + SHINGLE_TOKEN_PATTERN.findall(text.lower())
+        count = len(tokens) - SHINGLE_WORDS + 1
+        if count > 0:
+            hashes = np.fromiter(
+                (zlib.crc32(" ".join(tokens[i : i + SHINGLE_WORDS]).encode("utf-8")) for i in range(count)),
+                dtype=np.uint64,
+                count=count,
+            )
+            self._add(hashes % MINHASH_PRIME)
+        self._tail = tokens[-(SHINGLE_WORDS - 1) :]
+
+    def _add(self, hashes: np.ndarray) -> None:
+        self.shingles += len(hashes)
+        for start in range(0, len(hashes), SHINGLE_CHUNK):
+            chunk = hashes[start : start + SHINGLE_CHUNK]
+            permuted = (np.outer(_MULTIPLIERS, chunk) + _OFFSETS[:, None]) % MINHASH_PRIME
+            np.minimum(self.signature, permuted.min(axis=1), out=self.signature)
+
+    def finish(self) -> np.ndarray:
+        if not self.shingles and self._tail:
+            self._add(np.array([zlib.crc32(" ".join(self._tail).encode("utf-8")) % MINHASH_PRIME], dtype=np.uint64))
+        return self.signature.astype(np.uint32)
+
+
+def document_signature(pages: Iterable[str]) -> tuple[np.ndarray, int]:
+    hasher = MinHasher()
+    for page in pages:
+        hasher.update(page)
+    signature = hasher.finish()
+    return signature, hasher.shingles
+
+
+def hash_pages(pages: Iterable[str], hasher: MinHasher) -> Iterator[str]:
+    for page in pages:
+        hasher.update(page)
+        yield page
+
+
+def signature_similarity(left: np.ndarray, right: np.ndarray) -> float:
+    return float(np.mean(left == right))
+
+
+def band_buckets(signature: np.ndarray) -> list[tuple[int, str]]:
+    rows = signature.astype("<u4").reshape(MINHASH_BANDS, MINHASH_ROWS_PER_BAND)
+    return [(band, hashlib.blake2b(row.tobytes(), digest_size=8).hexdigest()) for band, row in enumerate(rows)]
+
+
+def find_near_duplicate(tenant, signature: np.ndarray, exclude_run_id=None) -> tuple[DocumentReportRun | None, float]:
+    matches = Q()
+    for band, bucket in band_buckets(signature):
+        matches |= Q(band=band, bucket=bucket)
+    candidate_ids = set(
+        DocumentSignatureBand.objects.filter(matches, tenant=tenant).values_list("signature__run_id", flat=True)
+    )
+    candidate_ids.discard(exclude_run_id)
+    if not candidate_ids:
+        return None, 0.0
+
+    best_run_id, best_similarity = None, 0.0
+    stored = DocumentSignature.objects.filter(
+        run_id__in=candidate_ids, run__status=DocumentReportRun.Status.COMPLETED
+    ).order_by("-run_id").values_list("run_id", "signature")
+    for run_id, raw in stored:
+        similarity = signature_similarity(signature, np.frombuffer(bytes(raw), dtype="<u4"))
+        if similarity > best_similarity:
+            best_run_id, best_similarity = run_id, similarity
+    if best_run_id is None:
+        return None, 0.0
+    return DocumentReportRun.objects.get(id=best_run_id), best_similarity
+
+
+@transaction.atomic
+def index_document_signature(run: DocumentReportRun, signature: np.ndarray, shingle_count: int) -> DocumentSignature:
+    stored, _ = DocumentSignature.objects.update_or_create(
+        run=run,
+        defaults={
+            "tenant": run.tenant,
+            "signature": signature.astype("<u4").tobytes(),
+            "shingle_count": shingle_count,
+        },
+    )
+    stored.bands.all().delete()
+    DocumentSignatureBand.objects.bulk_create(
+        [
+            DocumentSignatureBand(tenant=run.tenant, signature=stored, band=band, bucket=bucket)
+            for band, bucket in band_buckets(signature)
+        ]
+    )
+    return stored
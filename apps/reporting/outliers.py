@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+IQR_FLAG = 1
+MAD_FLAG = 2
+ZSCORE_FLAG = 4
+METHOD_FLAGS = (("iqr", IQR_FLAG), ("mad", MAD_FLAG), ("zscore", ZSCORE_FLAG))
+IQR_MULTIPLIER = 1.5
+MAD_THRESHOLD = 3.5
+MAD_CONSISTENCY = 0.6745
+ZSCORE_THRESHOLD = 3.0
+MIN_OBSERVATIONS = 4
+
+
+@dataclass(frozen=True)
+class OutlierScan:
+    columns: list[str]
+    lower: dict[str, np.ndarray]
+    upper: dict[str, np.ndarray]
+    counts: dict[str, np.ndarray]
+    row_flags: np.ndarray
+    row_columns: list[str]
+
+    @property
+    def flagged_rows(self) -> int:
+        return int(np.count_nonzero(self.row_flags))
+
+    def method_totals(self) -> dict[str, int]:
+        return {method: int(self.counts[method].sum()) for method, _ in METHOD_FLAGS}
+
+    def column_details(self) -> list[list]:
+        details = []
+        for idx, column in enumerate(self.columns):
+            if not any(np.isfinite(self.lower[method][idx]) for method, _ in METHOD_FLAGS):
+                continue
+            iqr_valid = np.isfinite(self.lower["iqr"][idx])
+            details.append(
+                [
+                    column,
+                    int(self.counts["iqr"][idx]),
+                    float(self.lower["iqr"][idx]) if iqr_valid else "",
+                    float(self.upper["iqr"][idx]) if iqr_valid else "",
+                    int(self.counts["mad"][idx]),
+                    int(self.counts["zscore"][idx]),
+                ]
+            )
+        return details
+
+
+def _bounds(values: np.ndarray) -> tuple[dict[str, np.ndarray], dict[str, np.ndarray]]:
+    observations = np.count_nonzero(~np.isnan(values), axis=0)
+    enough = observations >= MIN_OBSERVATIONS
+    q1, median, q3 = np.nanquantile(values, [0.25, 0.5, 0.75], axis=0)
+    iqr = q3 - q1
+    mad = np.nanmedian(np.abs(values - median), axis=0)
+    mean = np.nanmean(values, axis=0)
+    std = np.nanstd(values, axis=0)
+
+    lower = {
+        "iqr": np.where(enough & (iqr > 0), q1 - IQR_MULTIPLIER * iqr, np.nan),
+        "mad": np.where(enough & (mad > 0), median - MAD_THRESHOLD * mad / MAD_CONSISTENCY, np.nan),
+        "zscore": np.where(enough & (std > 0), mean - ZSCORE_THRESHOLD * std, np.nan),
+    }
+    upper = {
+        "iqr": np.where(enough & (iqr > 0), q3 + IQR_MULTIPLIER * iqr, np.nan),
+        "mad": np.where(enough & (mad > 0), median + MAD_THRESHOLD * mad / MAD_CONSISTENCY, np.nan),
+        "zscore": np.where(enough & (std > 0), mean + ZSCORE_THRESHOLD * std, np.nan),
+    }
+    return lower, upper
+
+
+def scan_outliers(frame: pd.DataFrame, columns: list[str]) -> OutlierScan:
+    row_count = len(frame)
+    if not columns or row_count == 0:
+        empty = {method: np.zeros(len(columns), dtype=np.int64) for method, _ in METHOD_FLAGS}
+        nan_bounds = {method: np.full(len(columns), np.nan) for method, _ in METHOD_FLAGS}
+        return OutlierScan(list(columns), nan_bounds, nan_bounds, empty, np.zeros(row_count, dtype=np.uint8), [""] * row_count)
+
+    values = frame[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            lower, upper = _bounds(values)
+
+        row_flags = np.zeros(row_count, dtype=np.uint8)
+        column_hits = np.zeros(values.shape, dtype=bool)
+        counts = {}
+        for method, flag in METHOD_FLAGS:
+            hits = (values < lower[method]) | (values > upper[method])
+            counts[method] = hits.sum(axis=0)
+            row_flags |= np.where(hits.any(axis=1), flag, 0).astype(np.uint8)
+            column_hits |= hits
+
+    labels = np.asarray(columns, dtype=object)
+    row_columns = [""] * row_count
+    for position in np.flatnonzero(row_flags):
+        row_columns[position] = ", ".join(labels[column_hits[position]])
+    return OutlierScan(list(columns), lower, upper, counts, row_flags, row_columns)
+
+
+def describe_flags(flags: int) -> str:
+    return "|".join(method for method, flag in METHOD_FLAGS if flags & flag)
+
+
+def flagged_rows_frame(frame: pd.DataFrame, scan: OutlierScan, limit: int) -> pd.DataFrame:
+    positions = np.flatnonzero(scan.row_flags)[:limit]
+    flagged = frame.iloc[positions]
+    source_rows = flagged.index.to_numpy()
+    if pd.api.types.is_integer_dtype(source_rows.dtype):
+        source_rows = source_rows + 2
+    report = pd.DataFrame(
+        {
+            "Source_Row": source_rows,
+            "Outlier_Methods": [describe_flags(int(flag)) for flag in scan.row_flags[positions]],
+            "Outlier_Columns": [scan.row_columns[position] for position in positions],
+        }
+    )
+    return pd.concat([report, flagged.reset_index(drop=True)], axis=1)
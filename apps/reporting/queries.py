@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import operator
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+
+from .columnar import MANIFEST_NAME, columnar_columns, has_columnar, prune_columnar_root, read_columnar, write_columnar
+
+RUN_DATASET_DIRNAME = "reporting/data_runs/columnar"
+DEFAULT_RUN_DATASET_MAX_BYTES = 10 * 1024 * 1024 * 1024
+DEFAULT_RUN_DATASET_MAX_AGE_DAYS = 90
+DEFAULT_QUERY_CACHE_SECONDS = 600
+DEFAULT_QUERY_LIMIT = 1_000
+QUERY_MAX_LIMIT = 10_000
+QUERY_MAX_FILTERS = 10
+QUERY_MAX_GROUP_BY = 4
+QUERY_MAX_AGGREGATES = 12
+QUERY_COMPARISONS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+QUERY_FILTER_OPS = set(QUERY_COMPARISONS) | {"in", "not_in", "between", "is_null", "not_null"}
+QUERY_AGGREGATES = {"count", "sum", "mean", "median", "min", "max", "nunique"}
+
+
+def run_dataset_root() -> Path:
+    configured_root = os.getenv("OFFICE_RUN_DATASET_DIR", "").strip()
+    return Path(configured_root) if configured_root else Path(settings.MEDIA_ROOT) / RUN_DATASET_DIRNAME
+
+
+def run_dataset_dir(run) -> Path:
+    return run_dataset_root() / str(run.id)
+
+
+def remove_run_dataset(run) -> None:
+    shutil.rmtree(run_dataset_dir(run), ignore_errors=True)
+
+
+def run_dataset_max_bytes() -> int:
+    try:
+        value = int(os.getenv("OFFICE_RUN_DATASET_MAX_BYTES", str(DEFAULT_RUN_DATASET_MAX_BYTES)))
+    except ValueError:
+        value = DEFAULT_RUN_DATASET_MAX_BYTES
+    return max(0, value)
+
+
+def run_dataset_max_age_seconds() -> float:
+    try:
+        value = float(os.getenv("OFFICE_RUN_DATASET_MAX_AGE_DAYS", str(DEFAULT_RUN_DATASET_MAX_AGE_DAYS)))
+    except ValueError:
+        value = DEFAULT_RUN_DATASET_MAX_AGE_DAYS
+    return max(0.0, value) * 86400
+
+
+def prune_run_datasets(live_run_ids, max_bytes: int | None = None, max_age_seconds: float | None = None) -> dict:
+    root = run_dataset_root()
+    live = {str(run_id) for run_id in live_run_ids}
+    orphans = 0
+    for path in root.iterdir() if root.is_dir() else []:
+        if path.is_dir() and not path.name.startswith(".") and path.name not in live:
+            shutil.rmtree(path, ignore_errors=True)
+            orphans += 1
+    result = prune_columnar_root(
+        root,
+        run_dataset_max_bytes() if max_bytes is None else max(0, max_bytes),
+        run_dataset_max_age_seconds() if max_age_seconds is None else max_age_seconds,
+    )
+    return {**result, "orphans_removed": orphans}
+
+
+def persist_dataset(dataframe: pd.DataFrame, directory) -> Path:
+    target = Path(directory)
+    if target.exists():
+        shutil.rmtree(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    return write_columnar(dataframe, target)
+
+
+def _query_cache_seconds() -> int:
+    try:
+        value = int(os.getenv("OFFICE_QUERY_CACHE_SECONDS", str(DEFAULT_QUERY_CACHE_SECONDS)))
+    except ValueError:
+        value = DEFAULT_QUERY_CACHE_SECONDS
+    return max(0, value)
+
+
+def _as_list(value, field: str) -> list:
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError(f"'{field}' must be a list.")
+    return value
+
+
+def _column(name, available: list[str], field: str) -> str:
+    if not isinstance(name, str) or name not in available:
+        raise ValueError(f"Unknown column in {field}: {name!r}")
+    return name
+
+
+def normalize_query_spec(spec, available: list[str]) -> dict:
+    if not isinstance(spec, dict):
+        raise ValueError("Query spec must be a JSON object.")
+    unknown = set(spec) - {"filters", "group_by", "aggregates", "order_by", "descending", "limit"}
+    if unknown:
+        raise ValueError(f"Unsupported query keys: {', '.join(sorted(unknown))}")
+
+    filters = []
+    for item in _as_list(spec.get("filters"), "filters"):
+        if not isinstance(item, dict):
+            raise ValueError("Each filter must be an object.")
+        op = item.get("op", "eq")
+        if op not in QUERY_FILTER_OPS:
+            raise ValueError(f"Unsupported filter op: {op!r}")
+        value = item.get("value")
+        if op in {"in", "not_in"} and not isinstance(value, list):
+            raise ValueError(f"'{op}' filters need a list value.")
+        if op == "between" and not (isinstance(value, list) and len(value) == 2):
+            raise ValueError("'between' filters need a [low, high] value.")
+        filters.append({"column": _column(item.get("column"), available, "filters"), "op": op, "value": value})
+    if len(filters) > QUERY_MAX_FILTERS:
+        raise ValueError(f"At most {QUERY_MAX_FILTERS} filters are allowed.")
+
+    group_by = [_column(name, available, "group_by") for name in _as_list(spec.get("group_by"), "group_by")]
+    if len(group_by) > QUERY_MAX_GROUP_BY:
+        raise ValueError(f"At most {QUERY_MAX_GROUP_BY} group_by columns are allowed.")
+
+    aggregates = []
+    for item in _as_list(spec.get("aggregates"), "aggregates"):
+        if not isinstance(item, dict):
+            raise ValueError("Each aggregate must be an object.")
+        func = item.get("func", "count")
+        if func not in QUERY_AGGREGATES:
+            raise ValueError(f"Unsupported aggregate: {func!r}")
+        aggregates.append({"column": _column(item.get("column"), available, "aggregates"), "func": func})
+    if not aggregates:
+        aggregates = [{"column": group_by[0] if group_by else available[0], "func": "count"}]
+    if len(aggregates) > QUERY_MAX_AGGREGATES:
+        raise ValueError(f"At most {QUERY_MAX_AGGREGATES} aggregates are allowed.")
+
+    output_columns = group_by + [f"{item['column']}_{item['func']}" for item in aggregates]
+    order_by = spec.get("order_by")
+    if order_by is not None and order_by not in output_columns:
+        raise ValueError(f"order_by must be one of: {', '.join(output_columns)}")
+    try:
+        limit = int(spec.get("limit", DEFAULT_QUERY_LIMIT))
+    except (TypeError, ValueError) as exc:
+        raise ValueError("limit must be an integer.") from exc
+    return {
+        "filters": filters,
+        "group_by": group_by,
+        "aggregates": aggregates,
+        "order_by": order_by,
+        "descending": bool(spec.get("descending", False)),
+        "limit": max(1, min(limit, QUERY_MAX_LIMIT)),
+    }
+
+
+def query_spec_hash(spec: dict) -> str:
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _coerce_value(series: pd.Series, value):
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        stamp = pd.Timestamp(value)
+        tz = getattr(series.dt, "tz", None)
+        if tz is not None and stamp.tzinfo is None:
+            stamp = stamp.tz_localize(tz)
+        return stamp
+    if pd.api.types.is_numeric_dtype(series.dtype) and isinstance(value, str):
+        return float(value)
+    return value
+
+
+def _filter_mask(frame: pd.DataFrame, filters: list[dict]) -> np.ndarray:
+    mask = np.ones(len(frame), dtype=bool)
+    for item in filters:
+        series = frame[item["column"]]
+        op, value = item["op"], item["value"]
+        try:
+            if op == "is_null":
+                hits = series.isna()
+            elif op == "not_null":
+                hits = series.notna()
+            elif op in {"in", "not_in"}:
+                hits = series.isin([_coerce_value(series, entry) for entry in value])
+                hits = ~hits if op == "not_in" else hits
+            elif op == "between":
+                hits = series.between(_coerce_value(series, value[0]), _coerce_value(series, value[1]))
+            else:
+                hits = QUERY_COMPARISONS[op](series, _coerce_value(series, value))
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"Filter on {item['column']!r} is not valid for its type: {exc}") from exc
+        mask &= hits.to_numpy(dtype=bool, na_value=False)
+    return mask
+
+
+def execute_query(directory, spec: dict) -> dict:
+    needed = list(
+        dict.fromkeys(
+            [item["column"] for item in spec["filters"]]
+            + spec["group_by"]
+            + [item["column"] for item in spec["aggregates"]]
+        )
+    )
+    frame = read_columnar(directory, columns=needed)
+    mask = _filter_mask(frame, spec["filters"])
+    selected = frame if mask.all() else frame.loc[mask]
+    named = {f"{item['column']}_{item['func']}": (item["column"], item["func"]) for item in spec["aggregates"]}
+    try:
+        if spec["group_by"]:
+            result = selected.groupby(spec["group_by"], sort=True, dropna=False).agg(**named).reset_index()
+        else:
+            result = pd.DataFrame({name: [selected[column].agg(func)] for name, (column, func) in named.items()})
+    except TypeError as exc:
+        raise ValueError(f"Aggregate is not valid for the column type: {exc}") from exc
+
+    if spec["order_by"]:
+        result = result.sort_values(spec["order_by"], ascending=not spec["descending"], kind="mergesort")
+    total = len(result)
+    result = result.head(spec["limit"])
+    payload = json.loads(result.to_json(orient="split", index=False, date_format="iso"))
+    return {
+        "columns": payload["columns"],
+        "rows": payload["data"],
+        "row_count": total,
+        "truncated": total > len(result),
+        "rows_matched": int(mask.sum()),
+    }
+
+
+def run_query(run, spec) -> dict:
+    directory = run_dataset_dir(run)
+    if not has_columnar(directory):
+        raise FileNotFoundError("No queryable dataset stored for this run.")
+    normalized = normalize_query_spec(spec, columnar_columns(directory))
+    version = (directory / MANIFEST_NAME).stat().st_mtime_ns
+    cache_key = f"reporting:query:{run.id}:{version}:{query_spec_hash(normalized)}"
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return {**cached, "cached": True}
+    result = execute_query(directory, normalized)
+    cache.set(cache_key, result, _query_cache_seconds())
+    return {**result, "cached": False}
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+from .ai_runtime import get_embedder, get_runtime_profile, split_sentences
+from .embedding_cache import encode_sentences
+from .hashing_embedder import HashingEmbedder
+from .models import DocumentPassage, DocumentReportRun
+from .vector_index import tenant_vector_index, tenant_vector_indexes
+
+PASSAGE_SENTENCES = 5
+PASSAGE_MAX_CHARS = 1_200
+PASSAGE_BATCH = 256
+SEMANTIC_SEARCH_MAX_RESULTS = 50
+FALLBACK_PASSAGE_MODEL = "hashing"
+
+
+def passage_embedder() -> tuple[object, str]:
+    model = get_embedder()
+    if model is None:
+        return HashingEmbedder.from_name(FALLBACK_PASSAGE_MODEL), FALLBACK_PASSAGE_MODEL
+    return model, get_runtime_profile().embedding_model
+
+
+def _passage_vectors(model, model_name: str, passages: list[list[str]]) -> np.ndarray:
+    if isinstance(model, HashingEmbedder):
+        return model.encode([" ".join(passage) for passage in passages])
+    sentences = [sentence for passage in passages for sentence in passage]
+    vectors = encode_sentences(model, model_name, sentences)
+    bounds = np.cumsum([0] + [len(passage) for passage in passages])
+    return np.add.reduceat(vectors, bounds[:-1], axis=0) / np.diff(bounds)[:, None]
+
+
+def _flush(run: DocumentReportRun, model, model_name: str, batch: list[list[str]], start: int) -> None:
+    passages = DocumentPassage.objects.bulk_create(
+        [
+            DocumentPassage(tenant_id=run.tenant_id, run=run, position=start + offset, text=" ".join(passage))
+            for offset, passage in enumerate(batch)
+        ]
+    )
+    tenant_vector_index(run.tenant_id, model_name).add(
+        [passage.pk for passage in passages], _passage_vectors(model, model_name, batch)
+    )
+
+
+def remove_run_passages(run: DocumentReportRun) -> int:
+    passage_ids = list(DocumentPassage.objects.filter(run=run).values_list("id", flat=True))
+    for index in tenant_vector_indexes(run.tenant_id):
+        index.remove(passage_ids)
+    return len(passage_ids)
+
+
+def clear_run_passages(run: DocumentReportRun) -> None:
+    remove_run_passages(run)
+    DocumentPassage.objects.filter(run=run).delete()
+
+
+class PassageIndexer:
+    def __init__(self, run: DocumentReportRun):
+        self.run = run
+        self.model, self.model_name = passage_embedder()
+        self.indexed = 0
+        self._batch: list[list[str]] = []
+        self._passage: list[str] = []
+        self._size = 0
+        self._pending = ""
+
+    def pages(self, pages: Iterable[str]) -> Iterator[str]:
+        for page in pages:
+            sentences = split_sentences(f"{self._pending}\n{page}" if self._pending else page)
+            self._pending = sentences.pop() if sentences else ""
+            for sentence in sentences:
+                self._add_sentence(sentence)
+            yield page
+
+    def _add_sentence(self, sentence: str) -> None:
+        self._passage.append(sentence)
+        self._size += len(sentence)
+        if len(self._passage) >= PASSAGE_SENTENCES or self._size >= PASSAGE_MAX_CHARS:
+            self._end_passage()
+
+    def _end_passage(self) -> None:
+        self._batch.append(self._passage)
+        self._passage, self._size = [], 0
+        if len(self._batch) >= PASSAGE_BATCH:
+            self._flush()
+
+    def _flush(self) -> None:
+        _flush(self.run, self.model, self.model_name, self._batch, self.indexed)
+        self.indexed += len(self._batch)
+        self._batch = []
+
+    def finish(self) -> int:
+        if self._pending:
+            self._passage.append(self._pending)
+            self._pending = ""
+        if self._passage:
+            self._end_passage()
+        if self._batch:
+            self._flush()
+        return self.indexed
+
+
+def _live_results(tenant, hits: list[tuple[int, float]], k: int) -> list[dict]:
+    passages = DocumentPassage.objects.filter(tenant=tenant, id__in=[passage_id for passage_id, _ in hits]).select_related(
+        "run"
+    )
+    by_id = {passage.id: passage for passage in passages}
+    results = []
+    for passage_id, score in hits:
+        passage = by_id.get(passage_id)
+        if passage is None:
+            continue
+        results.append(
+            {
+                "run_id": passage.run_id,
+                "source_name": (passage.run.summary or {}).get("source_name") or passage.run.source_file.name.split("/")[-1],
+                "position": passage.position,
+                "passage": passage.text,
+                "score": round(score, 4),
+            }
+        )
+        if len(results) >= k:
+            break
+    return results
+
+
+def semantic_search(tenant, query: str, k: int = 10) -> list[dict]:
+    k = min(max(1, k), SEMANTIC_SEARCH_MAX_RESULTS)
+    model, model_name = passage_embedder()
+    if isinstance(model, HashingEmbedder):
+        query_vector = model.encode([query])[0]
+    else:
+        query_vector = np.asarray(model.encode([query], normalize_embeddings=True), dtype=np.float32)[0]
+    index = tenant_vector_index(tenant.id, model_name)
+    fetch = k
+    while True:
+        hits = index.search(query_vector, k=fetch)
+        results = _live_results(tenant, hits, k)
+        if len(results) >= k or len(hits) < fetch:
+            return results
+        fetch *= 2
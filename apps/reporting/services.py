@@ -3,18 +3,30 @@ from __future__ import annotations
 import math
 import os
 import re
-from collections import Counter
+import tracemalloc
+from collections.abc import Iterable
+from dataclasses import dataclass
 from datetime import datetime
-from io import BytesIO
+from itertools import repeat
+from tempfile import SpooledTemporaryFile
 
 import pandas as pd
-from docx import Document
 from openpyxl import Workbook
-from openpyxl.chart import BarChart, PieChart, Reference
+from openpyxl.chart import BarChart, LineChart, PieChart, Reference
 from openpyxl.styles import Font, PatternFill
-from pypdf import PdfReader
 from pptx import Presentation
-from .ai_runtime import semantic_key_points
+
+from office_copilot.artifacts import artifact_buffer, finish_artifact
+from office_copilot.keywords import KEYWORD_COUNTER_CAPACITY, BoundedCounter, keyword_counts
+from office_copilot.uploads import is_supported_upload
+from .ai_runtime import get_runtime_profile, long_document_key_points, process_pool, split_sentences
+from .documents import iter_document_pages
+from .html_report import build_html_report
+from .ingestion import DATA_FILE_SUFFIXES, load_mapped_dataframe, local_source_path, parse_data_source, source_path
+from .outliers import flagged_rows_frame, scan_outliers
+from .queries import persist_dataset
+from .sketches import build_column_sketches
+from .term_stats import tenant_keywords
 
 EXCEL_MAX_ROWS = 1_048_576
 MAX_DATA_ROWS_PER_SHEET = EXCEL_MAX_ROWS - 1
@@ -23,6 +35,29 @@ DEFAULT_CLEANED_EXPORT_MAX_ROWS = 50_000
 DEFAULT_ANALYSIS_SAMPLE_MAX_ROWS = 200_000
 TYPE_INFERENCE_SAMPLE_ROWS = 2_000
 DEFAULT_MAX_PROCESS_ROWS = 300_000
+MEMORY_PROFILE_TOP_ALLOCATIONS = 3
+KEYWORD_CANDIDATE_TERMS = 200
+NONBLANK_LINE_PATTERN = re.compile(r"^[^\n]*\S[^\n]*$", re.MULTILINE)
+DEFAULT_OUTLIER_ROWS_EXPORT_MAX = 10_000
+OUTLIER_DETAIL_HEADERS = ["Column", "IQR Outliers", "IQR Lower Bound", "IQR Upper Bound", "MAD Outliers", "Z-Score Outliers"]
+TIME_TRENDS_MAX_COLUMNS = 10
+TIME_TREND_BUCKETS = (
+    (pd.Timedelta(days=92), "D", "day"),
+    (pd.Timedelta(days=731), "W", "week"),
+    (None, "MS", "month"),
+)
+SHEET_PREFIX_MAX_CHARS = 20
+INVALID_SHEET_TITLE_CHARS = re.compile(r"[\\/?*\[\]:]")
+SHEET_SUMMARY_FIELDS = (
+    "rows_uploaded",
+    "columns_uploaded",
+    "rows_after_cleaning",
+    "rows_removed",
+    "missing_cells_filled",
+    "duplicate_rows_removed",
+    "outlier_count",
+    "cleaned_rows_exported",
+)
 
 
 def _excel_value(value):
@@ -117,22 +152,213 @@ def _infer_series_type(series: pd.Series, sample_rows: int = TYPE_INFERENCE_SAMP
 
 def _load_business_dataframe(uploaded_file, filename: str) -> pd.DataFrame:
     lower_name = filename.lower()
-    if lower_name.endswith(".csv"):
-        return pd.read_csv(uploaded_file)
-    if lower_name.endswith(".xlsx") or lower_name.endswith(".xls"):
-        return pd.read_excel(uploaded_file)
-    raise ValueError("Only .xlsx, .xls, and .csv files are supported for data analysis.")
+    if not is_supported_upload(lower_name, DATA_FILE_SUFFIXES):
+        raise ValueError("Only .xlsx, .xls, and .csv files (optionally as .gz, .zst or .zip) are supported for data analysis.")
+    path = source_path(uploaded_file)
+    if path is not None:
+        return load_mapped_dataframe(path, lower_name)
+    return parse_data_source(uploaded_file, lower_name)
+
+
+class _StageMemoryProfiler:
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.stages = []
+        self._owns_tracing = False
+        self._snapshot = None
+        self._baseline = 0
+
+    def __enter__(self):
+        if not self.enabled:
+            return self
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+        tracemalloc.reset_peak()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        self._snapshot = tracemalloc.take_snapshot()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._owns_tracing:
+            tracemalloc.stop()
+        self._snapshot = None
+        return False
+
+    def mark(self, stage: str) -> None:
+        if not self.enabled:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        top = snapshot.compare_to(self._snapshot, "lineno")[:MEMORY_PROFILE_TOP_ALLOCATIONS]
+        self.stages.append(
+            {
+                "stage": stage,
+                "current_bytes": int(max(current - self._baseline, 0)),
+                "peak_bytes": int(max(peak - self._baseline, 0)),
+                "top_allocations": [
+                    {"location": str(stat.traceback[0]), "size_diff_bytes": int(stat.size_diff)} for stat in top
+                ],
+            }
+        )
+        self._snapshot = snapshot
+        tracemalloc.reset_peak()
+
+    def report(self, input_bytes: int) -> dict:
+        peak = max((stage["peak_bytes"] for stage in self.stages), default=0)
+        return {
+            "input_bytes": int(input_bytes),
+            "peak_bytes": int(peak),
+            "peak_to_input_ratio": round(peak / input_bytes, 2) if input_bytes else 0.0,
+            "stages": self.stages,
+        }
+
+
+@dataclass
+class _PreparedAnalysis:
+    summary: dict
+    cleaned_df: pd.DataFrame
+    dataset_df: pd.DataFrame
+    analysis_df: pd.DataFrame
+    export_df: pd.DataFrame
+    numeric_cols: list[str]
+    categorical_cols: list[str]
+    datetime_cols: list[str]
+    missing_by_column_before: pd.Series
+    column_profile_rows: list[list]
+    outlier_details: list[list]
+    outlier_rows: pd.DataFrame
+    pivot1: pd.DataFrame | None
+    pivot2: pd.DataFrame | None
+    time_trends: pd.DataFrame | None
+    input_bytes: int
+
+
+def _time_trend_bucket(timestamps: pd.Series) -> tuple[str, str] | None:
+    first, last = timestamps.min(), timestamps.max()
+    if pd.isna(first) or pd.isna(last) or first == last:
+        return None
+    span = last - first
+    for limit, freq, label in TIME_TREND_BUCKETS:
+        if limit is None or span <= limit:
+            return freq, label
+    return None
+
+
+def _time_trends(df: pd.DataFrame, datetime_cols: list[str], numeric_cols: list[str]) -> tuple[pd.DataFrame | None, dict]:
+    for time_col in datetime_cols:
+        bucket = _time_trend_bucket(df[time_col])
+        if bucket is None:
+            continue
+        freq, label = bucket
+        value_cols = numeric_cols[:TIME_TRENDS_MAX_COLUMNS]
+        grouped = df.groupby(pd.Grouper(key=time_col, freq=freq))
+        trends = grouped.size().rename("Rows").to_frame()
+        if value_cols:
+            stats = grouped[value_cols].agg(["count", "sum", "mean"])
+            stats.columns = [f"{column} {stat}" for column, stat in stats.columns]
+            trends = trends.join(stats)
+        trends.index = trends.index.tz_localize(None) if trends.index.tz is not None else trends.index
+        trends.index.name = "Bucket Start"
+        return trends.reset_index(), {"time_trend_column": time_col, "time_trend_bucket": label, "time_trend_buckets": len(trends)}
+    return None, {"time_trend_column": None, "time_trend_bucket": None, "time_trend_buckets": 0}
+
+
+def _memory_profile_enabled(profile_memory: bool | None) -> bool:
+    if profile_memory is not None:
+        return profile_memory
+    return os.getenv("OFFICE_MEMORY_PROFILE", "False") == "True"
+
+
+def analyze_business_data(
+    uploaded_file, filename: str, profile_memory: bool | None = None, dataset_dir=None
+) -> tuple[dict, SpooledTemporaryFile]:
+    with _StageMemoryProfiler(_memory_profile_enabled(profile_memory)) as profiler:
+        summary, workbook_artifact, _ = _analyze_business_data(
+            uploaded_file, filename, profiler, html_report=False, dataset_dir=dataset_dir
+        )
+        return summary, workbook_artifact
+
+
+def analyze_business_data_with_html(
+    uploaded_file, filename: str, profile_memory: bool | None = None, dataset_dir=None
+) -> tuple[dict, SpooledTemporaryFile, SpooledTemporaryFile | None]:
+    with _StageMemoryProfiler(_memory_profile_enabled(profile_memory)) as profiler:
+        return _analyze_business_data(uploaded_file, filename, profiler, html_report=True, dataset_dir=dataset_dir)
+
+
+def _analyze_business_data(
+    uploaded_file, filename: str, profiler: _StageMemoryProfiler, html_report: bool, dataset_dir=None
+) -> tuple[dict, SpooledTemporaryFile, SpooledTemporaryFile | None]:
+    prepared = _prepare_analysis(
+        _load_business_dataframe(uploaded_file, filename), filename, profiler, keep_full_dataset=dataset_dir is not None
+    )
+    if dataset_dir is not None:
+        persist_dataset(prepared.dataset_df, dataset_dir)
+        prepared.summary["query_dataset_rows"] = int(len(prepared.dataset_df))
+        prepared.dataset_df = prepared.cleaned_df
+        profiler.mark("dataset")
+    workbook = _build_analysis_workbook(prepared)
+
+    output = artifact_buffer()
+    workbook.save(output)
+    profiler.mark("workbook")
+    html_artifact = None
+    if html_report:
+        html_artifact = build_html_report(
+            prepared.cleaned_df, prepared.summary, prepared.datetime_cols, prepared.numeric_cols
+        )
+        prepared.summary["html_report_generated"] = html_artifact is not None
+        profiler.mark("html_report")
+    if profiler.enabled:
+        prepared.summary["memory_profile"] = profiler.report(prepared.input_bytes)
+    return prepared.summary, finish_artifact(output), html_artifact
+
 
+def _convert_columns(df: pd.DataFrame, conversions: dict[str, str]) -> None:
+    for col, inferred in conversions.items():
+        if inferred == "numeric":
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        else:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+
+
+def _fill_missing(df: pd.DataFrame, fill_values: dict, datetime_missing: list[str]) -> None:
+    if fill_values:
+        df.fillna(value=fill_values, inplace=True)
+    if datetime_missing:
+        df[datetime_missing] = df[datetime_missing].ffill().bfill()
 
-def analyze_business_data(uploaded_file, filename: str) -> tuple[dict, bytes]:
-    raw_df = _load_business_dataframe(uploaded_file, filename)
+
+def _deduplicate(df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    duplicate_mask = df.duplicated()
+    duplicate_rows = int(duplicate_mask.sum())
+    if duplicate_rows:
+        df = df.loc[~duplicate_mask]
+    return df, duplicate_rows
+
+
+def _prepare_analysis(
+    raw_df: pd.DataFrame,
+    filename: str,
+    profiler: _StageMemoryProfiler,
+    profile_only: bool = False,
+    keep_full_dataset: bool = False,
+) -> _PreparedAnalysis:
     if raw_df.empty:
         raise ValueError("Uploaded dataset is empty.")
 
     original_shape = raw_df.shape
-    raw_df = raw_df.dropna(how="all").copy()
+    input_bytes = int(raw_df.memory_usage(index=True, deep=profiler.enabled).sum()) if profiler.enabled else 0
+    profiler.mark("load")
+
+    empty_rows = raw_df.isna().all(axis=1).to_numpy()
     raw_df.columns = [str(col).strip() if str(col).strip() else f"column_{idx}" for idx, col in enumerate(raw_df.columns)]
-    raw_df = raw_df.loc[:, ~raw_df.columns.duplicated()].copy()
+    duplicate_columns = raw_df.columns.duplicated()
+    if empty_rows.any() or duplicate_columns.any():
+        raw_df = raw_df.loc[~empty_rows, ~duplicate_columns].copy()
+    del empty_rows
+    profiler.mark("normalize")
 
     try:
         max_process_rows = int(os.getenv("OFFICE_MAX_PROCESS_ROWS", str(DEFAULT_MAX_PROCESS_ROWS)))
@@ -141,20 +367,24 @@ def analyze_business_data(uploaded_file, filename: str) -> tuple[dict, bytes]:
     max_process_rows = max(50_000, max_process_rows)
 
     large_dataset_mode = len(raw_df) > max_process_rows
+    full_df = None
     if large_dataset_mode:
-        df = raw_df.sample(n=max_process_rows, random_state=42).copy()
+        df = raw_df.sample(n=max_process_rows, random_state=42)
+        if keep_full_dataset:
+            full_df = raw_df
     else:
-        df = raw_df.copy()
+        df = raw_df
+    del raw_df
     processing_input_rows = int(len(df))
 
+    conversions = {}
     for col in df.columns:
-        if df[col].dtype != "object":
-            continue
-        inferred = _infer_series_type(df[col])
-        if inferred == "numeric":
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-        elif inferred == "datetime":
-            df[col] = pd.to_datetime(df[col], errors="coerce")
+        if df[col].dtype == "object":
+            inferred = _infer_series_type(df[col])
+            if inferred in {"numeric", "datetime"}:
+                conversions[col] = inferred
+    _convert_columns(df, conversions)
+    profiler.mark("type_inference")
 
     numeric_cols = df.select_dtypes(include=["number"]).columns.tolist()
     datetime_cols = df.select_dtypes(include=["datetime64[ns]", "datetime64[ns, UTC]"]).columns.tolist()
@@ -162,21 +392,29 @@ def analyze_business_data(uploaded_file, filename: str) -> tuple[dict, bytes]:
 
     missing_by_column_before = df.isna().sum().sort_values(ascending=False)
     missing_before = int(missing_by_column_before.sum())
+    fill_values = {}
     for col in numeric_cols:
-        if df[col].isna().any():
-            df[col] = df[col].fillna(df[col].median())
+        if missing_by_column_before[col]:
+            fill_values[col] = df[col].median()
     for col in categorical_cols:
-        if df[col].isna().any():
+        if missing_by_column_before[col]:
             mode = df[col].mode()
-            fill_value = mode.iloc[0] if not mode.empty else "unknown"
-            df[col] = df[col].fillna(fill_value)
-    for col in datetime_cols:
-        if df[col].isna().any():
-            df[col] = df[col].fillna(method="ffill").fillna(method="bfill")
-
-    duplicate_rows = int(df.duplicated().sum())
-    df = df.drop_duplicates()
+            fill_values[col] = mode.iloc[0] if not mode.empty else "unknown"
+    datetime_missing = [col for col in datetime_cols if missing_by_column_before[col]]
+    _fill_missing(df, fill_values, datetime_missing)
+    profiler.mark("fill_missing")
+
+    df, duplicate_rows = _deduplicate(df)
     rows_removed = int(processing_input_rows - len(df))
+    profiler.mark("deduplicate")
+
+    dataset_df = df
+    if full_df is not None:
+        _convert_columns(full_df, conversions)
+        _fill_missing(full_df, fill_values, datetime_missing)
+        dataset_df, _ = _deduplicate(full_df)
+        del full_df
+        profiler.mark("full_dataset")
 
     try:
         analysis_sample_limit = int(
@@ -187,26 +425,20 @@ def analyze_business_data(uploaded_file, filename: str) -> tuple[dict, bytes]:
     analysis_sample_limit = max(50_000, analysis_sample_limit)
     analysis_df = df if len(df) <= analysis_sample_limit else df.sample(n=analysis_sample_limit, random_state=42)
 
-    outlier_total = 0
-    outlier_details = []
-    for col in numeric_cols:
-        series = analysis_df[col].dropna()
-        if len(series) < 4:
-            continue
-        q1 = series.quantile(0.25)
-        q3 = series.quantile(0.75)
-        iqr = q3 - q1
-        if iqr == 0:
-            continue
-        lower = q1 - 1.5 * iqr
-        upper = q3 + 1.5 * iqr
-        outliers = int(((analysis_df[col] < lower) | (analysis_df[col] > upper)).sum())
-        outlier_total += outliers
-        outlier_details.append([col, outliers, float(lower), float(upper)])
+    outlier_scan = scan_outliers(analysis_df, numeric_cols)
+    outlier_totals = outlier_scan.method_totals()
+    outlier_total = outlier_totals["iqr"]
+    outlier_details = outlier_scan.column_details()
+    try:
+        outlier_rows_limit = int(os.getenv("OFFICE_OUTLIER_ROWS_EXPORT_MAX", str(DEFAULT_OUTLIER_ROWS_EXPORT_MAX)))
+    except ValueError:
+        outlier_rows_limit = DEFAULT_OUTLIER_ROWS_EXPORT_MAX
+    outlier_rows = flagged_rows_frame(analysis_df, outlier_scan, max(0, outlier_rows_limit))
+    profiler.mark("outliers")
 
     pivot1 = None
     pivot2 = None
-    if categorical_cols and numeric_cols:
+    if categorical_cols and numeric_cols and not profile_only:
         pivot1 = pd.pivot_table(
             analysis_df,
             index=categorical_cols[0],
@@ -214,7 +446,7 @@ def analyze_business_data(uploaded_file, filename: str) -> tuple[dict, bytes]:
             aggfunc=["sum", "mean", "count"],
             fill_value=0,
         )
-    if len(categorical_cols) > 1:
+    if len(categorical_cols) > 1 and not profile_only:
         pivot2 = pd.pivot_table(
             analysis_df,
             index=categorical_cols[0],
@@ -223,6 +455,17 @@ def analyze_business_data(uploaded_file, filename: str) -> tuple[dict, bytes]:
             aggfunc="count",
             fill_value=0,
         )
+    profiler.mark("pivots")
+
+    time_trends = None
+    time_trend_summary = {}
+    column_sketches = None
+    if not profile_only:
+        time_trends, time_trend_summary = _time_trends(df, datetime_cols, numeric_cols)
+        profiler.mark("time_trends")
+        null_rates = (missing_by_column_before / max(processing_input_rows, 1)).to_dict()
+        column_sketches = build_column_sketches(df, null_rates)
+        profiler.mark("sketches")
 
     summary = {
         "filename": filename,
@@ -238,10 +481,16 @@ def analyze_business_data(uploaded_file, filename: str) -> tuple[dict, bytes]:
         "categorical_columns": categorical_cols,
         "datetime_columns": datetime_cols,
         "outlier_count": outlier_total,
+        "outlier_counts_by_method": outlier_totals,
+        "outlier_rows_flagged": outlier_scan.flagged_rows,
+        "outlier_rows_exported": int(len(outlier_rows)),
         "analysis_sample_rows": int(len(analysis_df)),
         "large_dataset_mode": large_dataset_mode,
+        **time_trend_summary,
         "generated_at": datetime.utcnow().isoformat(),
     }
+    if column_sketches is not None:
+        summary["column_sketches"] = column_sketches
     try:
         cleaned_export_limit = int(os.getenv("OFFICE_CLEANED_EXPORT_MAX_ROWS", str(DEFAULT_CLEANED_EXPORT_MAX_ROWS)))
     except ValueError:
@@ -251,6 +500,47 @@ def analyze_business_data(uploaded_file, filename: str) -> tuple[dict, bytes]:
     summary["cleaned_rows_exported"] = int(len(export_df))
     summary["cleaned_rows_truncated"] = int(max(len(df) - len(export_df), 0))
 
+    column_profile_rows = []
+    for col in df.columns:
+        column_profile_rows.append(
+            [
+                col,
+                str(df[col].dtype),
+                int(df[col].isna().sum()),
+                int(df[col].nunique(dropna=True)),
+                str(df[col].head(1).iloc[0]) if len(df[col]) else "",
+            ]
+        )
+
+    return _PreparedAnalysis(
+        summary=summary,
+        cleaned_df=df,
+        dataset_df=dataset_df,
+        analysis_df=analysis_df,
+        export_df=export_df,
+        numeric_cols=numeric_cols,
+        categorical_cols=categorical_cols,
+        datetime_cols=datetime_cols,
+        missing_by_column_before=missing_by_column_before,
+        column_profile_rows=column_profile_rows,
+        outlier_details=outlier_details,
+        outlier_rows=outlier_rows,
+        pivot1=pivot1,
+        pivot2=pivot2,
+        time_trends=time_trends,
+        input_bytes=input_bytes,
+    )
+
+
+def _build_analysis_workbook(prepared: _PreparedAnalysis) -> Workbook:
+    summary = prepared.summary
+    analysis_df = prepared.analysis_df
+    numeric_cols = prepared.numeric_cols
+    categorical_cols = prepared.categorical_cols
+    outlier_details = prepared.outlier_details
+    pivot1 = prepared.pivot1
+    pivot2 = prepared.pivot2
+
     workbook = Workbook()
     workbook.remove(workbook.active)
 
@@ -267,6 +557,7 @@ def analyze_business_data(uploaded_file, filename: str) -> tuple[dict, bytes]:
             ["Missing Cells Filled", summary["missing_cells_filled"]],
             ["Duplicate Rows Removed", summary["duplicate_rows_removed"]],
             ["Outlier Count", summary["outlier_count"]],
+            ["Rows Flagged as Outliers", summary["outlier_rows_flagged"]],
         ],
     )
     ws_dashboard["D1"] = "Analyst Workflow"
@@ -274,32 +565,23 @@ def analyze_business_data(uploaded_file, filename: str) -> tuple[dict, bytes]:
     ws_dashboard["D1"].font = Font(bold=True)
 
     ws_profile = workbook.create_sheet("Column_Profile")
-    profile_rows = []
-    for col in df.columns:
-        profile_rows.append(
-            [
-                col,
-                str(df[col].dtype),
-                int(df[col].isna().sum()),
-                int(df[col].nunique(dropna=True)),
-                str(df[col].head(1).iloc[0]) if len(df[col]) else "",
-            ]
-        )
-    _write_table(ws_profile, ["Column", "DType", "Missing", "Distinct", "Sample"], profile_rows)
+    _write_table(ws_profile, ["Column", "DType", "Missing", "Distinct", "Sample"], prepared.column_profile_rows)
 
     ws_missing = workbook.create_sheet("Missing_Before_Clean")
     _write_table(
         ws_missing,
         ["Column", "Missing Cells"],
-        [[col, int(val)] for col, val in missing_by_column_before.items()],
+        [[col, int(val)] for col, val in prepared.missing_by_column_before.items()],
     )
 
-    cleaned_sheet_count = _write_dataframe_paginated(workbook, "Cleaned_Data", export_df)
+    cleaned_sheet_count = _write_dataframe_paginated(workbook, "Cleaned_Data", prepared.export_df)
     summary["cleaned_data_sheets"] = cleaned_sheet_count
 
     if outlier_details:
         ws_outliers = workbook.create_sheet("Outliers")
-        _write_table(ws_outliers, ["Column", "Outlier Count", "Lower Bound", "Upper Bound"], outlier_details)
+        _write_table(ws_outliers, OUTLIER_DETAIL_HEADERS, outlier_details)
+    if not prepared.outlier_rows.empty:
+        _write_dataframe_paginated(workbook, "Outlier_Rows", prepared.outlier_rows)
 
     if pivot1 is not None:
         ws_pivot1 = workbook.create_sheet("Pivot_1")
@@ -321,6 +603,26 @@ def analyze_business_data(uploaded_file, filename: str) -> tuple[dict, bytes]:
         p2 = pivot2.reset_index()
         _write_table(ws_pivot2, _flatten_columns(list(p2.columns)), p2.values.tolist())
 
+    if prepared.time_trends is not None:
+        ws_trends = workbook.create_sheet("Time_Trends")
+        trends = prepared.time_trends
+        _write_table(
+            ws_trends,
+            list(trends.columns),
+            [[_excel_value(value) for value in row] for row in trends.itertuples(index=False)],
+        )
+        value_col = 4 if len(trends.columns) > 2 else 2
+        line = LineChart()
+        line.title = f"{trends.columns[value_col - 1]} by {summary['time_trend_bucket']}"
+        line.add_data(
+            Reference(ws_trends, min_col=value_col, min_row=1, max_row=ws_trends.max_row), titles_from_data=True
+        )
+        line.set_categories(Reference(ws_trends, min_col=1, min_row=2, max_row=ws_trends.max_row))
+        line.x_axis.number_format = "yyyy-mm-dd"
+        line.height = 7
+        line.width = 16
+        ws_trends.add_chart(line, f"{ws_trends.cell(row=1, column=len(trends.columns) + 2).column_letter}2")
+
     if numeric_cols:
         ws_numeric = workbook.create_sheet("Numeric_Stats")
         numeric_stats = analysis_df[numeric_cols].describe().transpose().reset_index()
@@ -370,47 +672,206 @@ def analyze_business_data(uploaded_file, filename: str) -> tuple[dict, bytes]:
             [f"Large cleaned datasets are split across {cleaned_sheet_count} sheet(s) to respect Excel row limits."],
             [f"Cleaned row export capped at {summary['cleaned_rows_exported']} rows for performance."],
             [f"Advanced stats/pivots computed on a representative sample of {summary['analysis_sample_rows']} rows for speed."],
-            [f"Large dataset mode: {'Enabled' if large_dataset_mode else 'Disabled'}."],
+            [f"Large dataset mode: {'Enabled' if summary['large_dataset_mode'] else 'Disabled'}."],
         ],
     )
 
-    output = BytesIO()
-    workbook.save(output)
-    output.seek(0)
-    return summary, output.getvalue()
+    return workbook
+
+
+def _sheet_worker_count(sheet_count: int) -> int:
+    try:
+        configured = int(os.getenv("OFFICE_SHEET_WORKERS", "0"))
+    except ValueError:
+        configured = 0
+    workers = configured if configured > 0 else get_runtime_profile().worker_threads
+    return max(1, min(workers, sheet_count))
+
 
+def _sheet_prefix(sheet_name: str, used: set[str]) -> str:
+    base = INVALID_SHEET_TITLE_CHARS.sub("_", str(sheet_name)).strip("' ")[:SHEET_PREFIX_MAX_CHARS] or "Sheet"
+    prefix = base
+    suffix = 2
+    while prefix.lower() in used:
+        marker = f"~{suffix}"
+        prefix = f"{base[: SHEET_PREFIX_MAX_CHARS - len(marker)]}{marker}"
+        suffix += 1
+    used.add(prefix.lower())
+    return prefix
 
-def _extract_keywords(text: str, limit: int = 8) -> list[str]:
-    tokens = re.findall(r"[A-Za-z]{4,}", text.lower())
-    stop_words = {"this", "that", "with", "from", "have", "will", "would", "about", "there", "were", "been"}
-    counts = Counter(word for word in tokens if word not in stop_words)
-    return [word for word, _ in counts.most_common(limit)]
+
+def _profile_workbook_sheet(path: str, sheet_name: str, filename: str) -> dict:
+    try:
+        prepared = _prepare_analysis(
+            pd.read_excel(path, sheet_name=sheet_name),
+            f"{filename} [{sheet_name}]",
+            _StageMemoryProfiler(False),
+            profile_only=True,
+        )
+    except ValueError as exc:
+        return {"sheet": sheet_name, "status": "skipped", "detail": str(exc)}
+    return {
+        "sheet": sheet_name,
+        "status": "completed",
+        "summary": prepared.summary,
+        "column_profile_rows": prepared.column_profile_rows,
+        "outlier_details": prepared.outlier_details,
+        "outlier_rows": prepared.outlier_rows,
+        "export_df": prepared.export_df,
+    }
+
+
+def analyze_workbook_sheets(
+    uploaded_file, filename: str, sheet_names: list[str] | None = None
+) -> tuple[dict, list[dict], SpooledTemporaryFile]:
+    lower_name = filename.lower()
+    if not (lower_name.endswith(".xlsx") or lower_name.endswith(".xls")):
+        raise ValueError("Multi-sheet analysis requires an .xlsx or .xls workbook.")
+
+    with local_source_path(uploaded_file, filename) as path:
+        with pd.ExcelFile(path) as excel:
+            available = list(excel.sheet_names)
+        if sheet_names:
+            selected = list(dict.fromkeys(sheet_names))
+            missing = [name for name in selected if name not in available]
+            if missing:
+                raise ValueError(f"Sheets not found in workbook: {', '.join(missing)}")
+        else:
+            selected = available
+        if not selected:
+            raise ValueError("Workbook has no sheets to analyze.")
+
+        workers = _sheet_worker_count(len(selected))
+        if workers == 1:
+            results = [_profile_workbook_sheet(path, name, filename) for name in selected]
+        else:
+            with process_pool(workers) as executor:
+                results = list(executor.map(_profile_workbook_sheet, repeat(path), selected, repeat(filename)))
+
+    completed = [result for result in results if result["status"] == "completed"]
+    if not completed:
+        raise ValueError("All selected sheets are empty.")
+
+    sheet_summaries = []
+    for result in results:
+        entry = {"sheet": result["sheet"], "status": result["status"]}
+        if result["status"] == "completed":
+            entry.update({key: value for key, value in result["summary"].items() if key not in ("filename", "generated_at")})
+        else:
+            entry["detail"] = result["detail"]
+        sheet_summaries.append(entry)
+
+    summary = {"filename": filename, "mode": "multi_sheet"}
+    for field in SHEET_SUMMARY_FIELDS:
+        summary[field] = int(sum(result["summary"][field] for result in completed))
+    summary.update(
+        {
+            "sheets_analyzed": len(completed),
+            "sheets_skipped": len(results) - len(completed),
+            "sheet_workers": workers,
+            "generated_at": datetime.utcnow().isoformat(),
+        }
+    )
+
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    ws_overview = workbook.create_sheet("Sheets_Overview")
+    _write_table(
+        ws_overview,
+        [
+            "Sheet",
+            "Status",
+            "Rows Uploaded",
+            "Rows After Cleaning",
+            "Rows Removed",
+            "Missing Cells Filled",
+            "Duplicate Rows Removed",
+            "Outlier Count",
+        ],
+        [
+            [
+                entry["sheet"],
+                entry["status"],
+                entry.get("rows_uploaded", 0),
+                entry.get("rows_after_cleaning", 0),
+                entry.get("rows_removed", 0),
+                entry.get("missing_cells_filled", 0),
+                entry.get("duplicate_rows_removed", 0),
+                entry.get("outlier_count", 0),
+            ]
+            for entry in sheet_summaries
+        ],
+    )
+    if ws_overview.max_row > 1:
+        chart = BarChart()
+        chart.title = "Rows After Cleaning by Sheet"
+        data_ref = Reference(ws_overview, min_col=4, min_row=1, max_col=4, max_row=ws_overview.max_row)
+        cats_ref = Reference(ws_overview, min_col=1, min_row=2, max_row=ws_overview.max_row)
+        chart.add_data(data_ref, titles_from_data=True)
+        chart.set_categories(cats_ref)
+        chart.height = 7
+        chart.width = 14
+        ws_overview.add_chart(chart, "J2")
+
+    used_prefixes = set()
+    for result in completed:
+        prefix = _sheet_prefix(result["sheet"], used_prefixes)
+        ws_profile = workbook.create_sheet(f"{prefix}_Profile")
+        _write_table(ws_profile, ["Column", "DType", "Missing", "Distinct", "Sample"], result["column_profile_rows"])
+        _write_dataframe_paginated(workbook, f"{prefix}_Data", result["export_df"])
+        if result["outlier_details"]:
+            ws_outliers = workbook.create_sheet(f"{prefix}_Outliers")
+            _write_table(ws_outliers, OUTLIER_DETAIL_HEADERS, result["outlier_details"])
+        if not result["outlier_rows"].empty:
+            _write_dataframe_paginated(workbook, f"{prefix}_Flagged", result["outlier_rows"])
+
+    output = artifact_buffer()
+    workbook.save(output)
+    return summary, sheet_summaries, finish_artifact(output)
 
 
 def extract_document_text(uploaded_file, filename: str) -> str:
-    name = filename.lower()
-    if name.endswith(".txt") or name.endswith(".md"):
-        return uploaded_file.read().decode("utf-8", errors="ignore")
-    if name.endswith(".docx"):
-        doc = Document(uploaded_file)
-        return "\n".join(p.text.strip() for p in doc.paragraphs if p.text.strip())
-    if name.endswith(".pdf"):
-        reader = PdfReader(uploaded_file)
-        chunks = []
-        for page in reader.pages:
-            chunks.append(page.extract_text() or "")
-        return "\n".join(chunks).strip()
-    raise ValueError("Supported document formats: .txt, .md, .docx, .pdf")
-
-
-def build_powerpoint_report(source_name: str, text: str) -> tuple[dict, bytes]:
-    paragraphs = [p.strip() for p in re.split(r"\n{1,2}", text) if p.strip()]
-    if not paragraphs:
+    return "\n".join(iter_document_pages(uploaded_file, filename)).strip()
+
+
+def build_powerpoint_report(
+    source_name: str, text: str | Iterable[str], reuse: dict | None = None, tenant=None
+) -> tuple[dict, SpooledTemporaryFile]:
+    pages = [text] if isinstance(text, str) else text
+    term_counts = BoundedCounter()
+    chunks = []
+    paragraph_count = 0
+
+    def document_sentences():
+        nonlocal paragraph_count
+        pending = ""
+        for page in pages:
+            if len(chunks) < 24:
+                page_paragraphs = [p.strip() for p in re.split(r"\n{1,2}", page) if p.strip()]
+                paragraph_count += len(page_paragraphs)
+                chunks.extend(page_paragraphs[: 24 - len(chunks)])
+            else:
+                paragraph_count += sum(1 for _ in NONBLANK_LINE_PATTERN.finditer(page))
+            term_counts.update(keyword_counts(page))
+            if reuse is not None:
+                continue
+            page_sentences = split_sentences(f"{pending}\n{page}" if pending else page)
+            pending = page_sentences.pop() if page_sentences else ""
+            yield from page_sentences
+        if pending:
+            yield pending
+
+    if reuse is None:
+        semantic_points = long_document_key_points(document_sentences(), max_points=10)
+        top_keywords = tenant_keywords(tenant, dict(term_counts.most_common(KEYWORD_CANDIDATE_TERMS)), 8)
+    else:
+        for _ in document_sentences():
+            pass
+        semantic_points = list(reuse.get("semantic_points", []))
+        top_keywords = list(reuse.get("top_keywords", []))
+    if not paragraph_count:
         raise ValueError("Could not extract readable text from document.")
 
-    top_keywords = _extract_keywords(text)
-    semantic_points = semantic_key_points(text, max_points=10)
-    chunks = paragraphs[:24]
     grouped = [chunks[i : i + 4] for i in range(0, len(chunks), 4)]
 
     slides = [{"title": "Executive Snapshot", "bullets": top_keywords or ["No keywords extracted"]}]
@@ -436,15 +897,15 @@ def build_powerpoint_report(source_name: str, text: str) -> tuple[dict, bytes]:
             paragraph.text = str(bullet)[:300]
             paragraph.level = 0
 
-    output = BytesIO()
+    output = artifact_buffer()
     presentation.save(output)
-    output.seek(0)
     summary = {
         "source_name": source_name,
         "slides_generated": len(slides) + 1,
-        "paragraphs_analyzed": len(paragraphs),
+        "paragraphs_analyzed": paragraph_count,
         "top_keywords": top_keywords,
         "semantic_points": semantic_points[:8],
+        "term_counts": dict(term_counts.most_common(KEYWORD_COUNTER_CAPACITY)),
         "generated_at": datetime.utcnow().isoformat(),
     }
-    return summary, output.getvalue()
+    return summary, finish_artifact(output)
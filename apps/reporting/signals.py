@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from .models import DataAnalysisRun, DocumentReportRun
+from .queries import remove_run_dataset
+from .semantic_search import remove_run_passages
+
+
+@receiver(post_delete, sender=DataAnalysisRun)
+def delete_run_dataset(sender, instance, **kwargs):
+    remove_run_dataset(instance)
+
+
+@receiver(pre_delete, sender=DocumentReportRun)
+def delete_run_passages(sender, instance, **kwargs):
+    remove_run_passages(instance)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+
+SKETCH_VERSION = 1
+SKETCH_QUANTILES = tuple(round(step / 10, 1) for step in range(11))
+KMV_SIZE = 256
+TOP_K = 20
+PSI_DRIFT_THRESHOLD = 0.2
+PSI_FLOOR = 1e-4
+NULL_RATE_DRIFT = 0.05
+TOP_K_SHARE_DRIFT = 0.1
+DISTINCT_RATIO_DRIFT = 1.5
+HASH_SPACE = float(2**64)
+
+
+def _kmv_distinct(values: pd.Series) -> int:
+    if values.empty:
+        return 0
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    cutoff = np.uint64(min(2**64 - 1, int(HASH_SPACE * min(1.0, 4 * KMV_SIZE / len(hashes)))))
+    while True:
+        smallest = np.unique(hashes[hashes <= cutoff])
+        if len(smallest) >= KMV_SIZE or cutoff == np.uint64(2**64 - 1):
+            break
+        cutoff = np.uint64(min(2**64 - 1, int(cutoff) * 4))
+    if len(smallest) < KMV_SIZE:
+        return int(len(smallest))
+    kth = float(smallest[KMV_SIZE - 1]) + 1.0
+    return int(round((KMV_SIZE - 1) * HASH_SPACE / kth))
+
+
+def _column_kind(series: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return "categorical"
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return "datetime"
+    return "categorical"
+
+
+def column_sketch(series: pd.Series, null_rate: float | None = None) -> dict:
+    kind = _column_kind(series)
+    values = series.dropna()
+    sketch = {
+        "kind": kind,
+        "count": int(len(series)),
+        "null_rate": round(float(series.isna().mean()) if null_rate is None else null_rate, 6) if len(series) else 0.0,
+        "distinct_estimate": _kmv_distinct(values),
+    }
+    if kind == "numeric" and not values.empty:
+        numbers = values.to_numpy(dtype=np.float64)
+        sketch["quantiles"] = [float(value) for value in np.quantile(numbers, SKETCH_QUANTILES)]
+        sketch["mean"] = float(numbers.mean())
+        sketch["std"] = float(numbers.std())
+    elif kind == "datetime" and not values.empty:
+        stamps = values.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        sketch["quantiles"] = [float(value) for value in np.quantile(stamps, SKETCH_QUANTILES)]
+        sketch["min"] = pd.Timestamp(int(stamps.min())).isoformat()
+        sketch["max"] = pd.Timestamp(int(stamps.max())).isoformat()
+    elif kind == "categorical" and not values.empty:
+        counts = values.astype(str).value_counts()
+        total = float(len(values))
+        sketch["top_k"] = [[str(label), round(int(count) / total, 6)] for label, count in counts.head(TOP_K).items()]
+    return sketch
+
+
+def build_column_sketches(frame: pd.DataFrame, null_rates: dict[str, float] | None = None) -> dict:
+    null_rates = null_rates or {}
+    return {
+        "version": SKETCH_VERSION,
+        "rows": int(len(frame)),
+        "columns": {str(column): column_sketch(frame[column], null_rates.get(column)) for column in frame.columns},
+    }
+
+
+def _quantile_psi(base: list[float], current: list[float]) -> float:
+    base_edges = np.asarray(base, dtype=np.float64)
+    current_edges = np.asarray(current, dtype=np.float64)
+    probabilities = np.asarray(SKETCH_QUANTILES)
+    if base_edges[-1] == base_edges[0] and current_edges[-1] == current_edges[0]:
+        return 0.0 if base_edges[0] == current_edges[0] else math.inf
+    current_cdf = np.interp(base_edges, current_edges, probabilities, left=0.0, right=1.0)
+    current_share = np.diff(current_cdf, prepend=0.0, append=1.0)
+    base_share = np.diff(probabilities, prepend=0.0, append=1.0)
+    current_share = np.clip(current_share, PSI_FLOOR, None)
+    base_share = np.clip(base_share, PSI_FLOOR, None)
+    return float(np.sum((current_share - base_share) * np.log(current_share / base_share)))
+
+
+def _compare_column(base: dict, current: dict) -> dict:
+    result = {"status": "unchanged", "reasons": []}
+    if base["kind"] != current["kind"]:
+        result.update(status="drift", reasons=[f"type changed from {base['kind']} to {current['kind']}"])
+        return result
+
+    null_delta = current["null_rate"] - base["null_rate"]
+    result["null_rate_delta"] = round(null_delta, 6)
+    if abs(null_delta) > NULL_RATE_DRIFT:
+        result["reasons"].append(f"null rate moved {base['null_rate']:.1%} -> {current['null_rate']:.1%}")
+
+    base_distinct, current_distinct = max(base["distinct_estimate"], 1), max(current["distinct_estimate"], 1)
+    result["distinct_ratio"] = round(current_distinct / base_distinct, 4)
+    if max(current_distinct / base_distinct, base_distinct / current_distinct) > DISTINCT_RATIO_DRIFT:
+        result["reasons"].append(f"distinct values {base['distinct_estimate']} -> {current['distinct_estimate']}")
+
+    if "quantiles" in base and "quantiles" in current:
+        psi = _quantile_psi(base["quantiles"], current["quantiles"])
+        result["psi"] = round(psi, 4) if math.isfinite(psi) else None
+        if psi > PSI_DRIFT_THRESHOLD:
+            result["reasons"].append("distribution shifted")
+    if "top_k" in base or "top_k" in current:
+        base_shares = dict(map(tuple, base.get("top_k", [])))
+        current_shares = dict(map(tuple, current.get("top_k", [])))
+        new_categories = [label for label in current_shares if label not in base_shares]
+        result["new_categories"] = new_categories
+        result["missing_categories"] = [label for label in base_shares if label not in current_shares]
+        labels = set(base_shares) | set(current_shares)
+        share_shift = 0.5 * sum(abs(current_shares.get(label, 0.0) - base_shares.get(label, 0.0)) for label in labels)
+        result["top_k_shift"] = round(share_shift, 4)
+        if new_categories:
+            result["reasons"].append(f"{len(new_categories)} new frequent categories")
+        if share_shift > TOP_K_SHARE_DRIFT:
+            result["reasons"].append("category mix shifted")
+
+    if result["reasons"]:
+        result["status"] = "drift"
+    return result
+
+
+def compare_sketches(base: dict, current: dict) -> dict:
+    base_columns = base.get("columns", {})
+    current_columns = current.get("columns", {})
+    columns = {}
+    for name in list(base_columns) + [name for name in current_columns if name not in base_columns]:
+        if name not in current_columns:
+            columns[name] = {"status": "removed", "reasons": ["column missing from current run"]}
+        elif name not in base_columns:
+            columns[name] = {"status": "added", "reasons": ["column not present in base run"]}
+        else:
+            columns[name] = _compare_column(base_columns[name], current_columns[name])
+    return {
+        "rows_base": base.get("rows", 0),
+        "rows_current": current.get("rows", 0),
+        "columns_with_drift": sorted(name for name, entry in columns.items() if entry["status"] != "unchanged"),
+        "columns": columns,
+    }
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Mapping
+
+from django.db import transaction
+from django.db.models import F
+
+from office_copilot.keywords import weighted_keywords
+
+from .models import TermCorpus, TermStatistic
+
+TERM_MAX_LENGTH = 64
+TERM_BATCH = 500
+
+
+def _term_batches(terms: list[str]):
+    for start in range(0, len(terms), TERM_BATCH):
+        yield terms[start : start + TERM_BATCH]
+
+
+def tenant_keywords(tenant, counts: Mapping[str, int], limit: int) -> list[str]:
+    if tenant is None or not counts:
+        return weighted_keywords(counts, {}, 0, limit)
+    corpus = TermCorpus.objects.filter(tenant=tenant).values_list("document_count", flat=True).first() or 0
+    frequencies = {}
+    for batch in _term_batches(list(counts)):
+        frequencies.update(
+            TermStatistic.objects.filter(tenant=tenant, term__in=batch).values_list("term", "document_frequency")
+        )
+    return weighted_keywords(counts, frequencies, corpus, limit)
+
+
+@transaction.atomic
+def record_document_terms(tenant, counts: Mapping[str, int]) -> None:
+    counts = {term: count for term, count in counts.items() if 0 < len(term) <= TERM_MAX_LENGTH and count > 0}
+    TermCorpus.objects.get_or_create(tenant=tenant)
+    TermCorpus.objects.filter(tenant=tenant).update(document_count=F("document_count") + 1)
+    if not counts:
+        return
+    TermStatistic.objects.bulk_create(
+        [TermStatistic(tenant=tenant, term=term) for term in counts], ignore_conflicts=True, batch_size=TERM_BATCH
+    )
+    terms_by_count = defaultdict(list)
+    for term, count in counts.items():
+        terms_by_count[count].append(term)
+    for count, terms in terms_by_count.items():
+        for batch in _term_batches(terms):
+            TermStatistic.objects.filter(tenant=tenant, term__in=batch).update(
+                document_frequency=F("document_frequency") + 1, total_frequency=F("total_frequency") + count
+            )
+
+
+def top_tenant_terms(tenant, limit: int = 8) -> list[tuple[str, int]]:
+    return list(
+        TermStatistic.objects.filter(tenant=tenant)
+        .order_by("-document_frequency", "-total_frequency")
+        .values_list("term", "document_frequency")[:limit]
+    )
@@ -1,21 +1,70 @@
+import gzip
 import json
-from io import BytesIO
+import os
+import tempfile
+import time
+import warnings
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO, StringIO
+from pathlib import Path
 from unittest.mock import patch
 
+import numpy as np
+import pandas as pd
+
 from docx import Document
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.core.management import call_command
+from django.test import Client
 from django.urls import reverse
-from openpyxl import Workbook
+from openpyxl import Workbook, load_workbook
 
+from apps.dashboard.services import get_dashboard_insights
 from apps.tenants.models import Tenant
-from .models import DataAnalysisRun, DocumentReportRun
-from .services import analyze_business_data
+from office_copilot.testing import IsolatedStorageTestCase
+from office_copilot.text_cache import cached_extraction, content_digest, load_cached_text
+from .models import (
+    DataAnalysisRun,
+    DocumentPassage,
+    DocumentReportRun,
+    DocumentSignatureBand,
+    TermCorpus,
+    TermStatistic,
+)
+from .columnar import read_columnar, write_columnar
+from .ingestion import columnar_cache_dir
+from .queries import execute_query, normalize_query_spec, run_dataset_dir, run_dataset_root
+from .html_report import lttb_indices
+from .documents import iter_document_pages, iter_pdf_pages, iter_text_pages
+from . import ai_runtime, documents, services
+from .ai_runtime import _frequency_rank_sentences, _term_sentence_matrix, _tfidf_scores, long_document_key_points
+from .embedding_batcher import EmbeddingBatcher
+from .hashing_embedder import HashingEmbedder
+from . import term_stats
+from .term_stats import record_document_terms, tenant_keywords
+from .semantic_search import semantic_search
+from .vector_index import VectorIndex, tenant_vector_indexes
+from .model_registry import ModelRegistry
+from .embedding_cache import embedding_cache_stats, encode_sentences, get_embedding_cache, reset_embedding_caches
+from .services import (
+    BoundedCounter,
+    _StageMemoryProfiler,
+    _load_business_dataframe,
+    _prepare_analysis,
+    analyze_business_data,
+    analyze_workbook_sheets,
+    build_powerpoint_report,
+    extract_document_text,
+)
 
 
-class ReportingRoleAccessTests(TestCase):
+class ReportingTestCase(IsolatedStorageTestCase):
     def setUp(self):
+        super().setUp()
+        reset_embedding_caches()
+        self.addCleanup(reset_embedding_caches)
         tenant = Tenant.objects.create(name="Tenant A", domain="a.local")
         user_model = get_user_model()
         self.staff = user_model.objects.create_user(
@@ -26,28 +75,6 @@ class ReportingRoleAccessTests(TestCase):
         )
         self.client = Client()
 
-    def test_staff_can_create_report(self):
-        self.client.login(username="staff", password="pass1234")
-        response = self.client.post(
-            reverse("report-list-create"),
-            data=json.dumps({"name": "Ops Weekly"}),
-            content_type="application/json",
-            HTTP_X_TENANT="a.local",
-            HTTP_HOST="localhost",
-        )
-        self.assertEqual(response.status_code, 201)
-
-    def test_regular_user_cannot_create_report(self):
-        self.client.login(username="member", password="pass1234")
-        response = self.client.post(
-            reverse("report-list-create"),
-            data=json.dumps({"name": "Ops Weekly"}),
-            content_type="application/json",
-            HTTP_X_TENANT="a.local",
-            HTTP_HOST="localhost",
-        )
-        self.assertEqual(response.status_code, 403)
-
     def _dataset_upload(self):
         workbook = Workbook()
         ws = workbook.active
@@ -77,6 +104,53 @@ class ReportingRoleAccessTests(TestCase):
             content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
         )
 
+    def _pdf_bytes(self, page_texts):
+        objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+        kids = []
+        for text in page_texts:
+            stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+            objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+            objects.append(
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {len(objects)} 0 R "
+                "/Resources << /Font << /F1 3 0 R >> >> >>"
+            )
+            kids.append(f"{len(objects)} 0 R")
+        objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+        body = b"%PDF-1.4\n"
+        offsets = []
+        for number, obj in enumerate(objects, start=1):
+            offsets.append(len(body))
+            body += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+        xref = len(body)
+        body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+        body += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+        body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF".encode("latin-1")
+        return body
+
+
+class ReportingRoleAccessTests(ReportingTestCase):
+    def test_staff_can_create_report(self):
+        self.client.login(username="staff", password="pass1234")
+        response = self.client.post(
+            reverse("report-list-create"),
+            data=json.dumps({"name": "Ops Weekly"}),
+            content_type="application/json",
+            HTTP_X_TENANT="a.local",
+            HTTP_HOST="localhost",
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_regular_user_cannot_create_report(self):
+        self.client.login(username="member", password="pass1234")
+        response = self.client.post(
+            reverse("report-list-create"),
+            data=json.dumps({"name": "Ops Weekly"}),
+            content_type="application/json",
+            HTTP_X_TENANT="a.local",
+            HTTP_HOST="localhost",
+        )
+        self.assertEqual(response.status_code, 403)
+
     def test_staff_can_run_data_analysis_workflow(self):
         self.client.login(username="staff", password="pass1234")
         response = self.client.post(
@@ -118,3 +192,948 @@ class ReportingRoleAccessTests(TestCase):
             summary, _ = analyze_business_data(content, "large_data.xlsx")
         self.assertGreaterEqual(summary["cleaned_data_sheets"], 5)
         self.assertIn("cleaned_rows_exported", summary)
+
+
+class DataIngestionTests(ReportingTestCase):
+    def test_cleaning_pipeline_peak_memory_stays_within_input_multiple(self):
+        lines = ["department,revenue,cost,region"]
+        for i in range(8_000):
+            revenue = "" if i % 40 == 0 else str(1000 + (i % 97) * 13)
+            region = "" if i % 55 == 0 else ["North", "South", "East", "West"][i % 4]
+            lines.append(f"Dept{i % 11},{revenue},{500 + i % 31},{region}")
+        lines.extend(lines[1:200])
+        content = BytesIO("\n".join(lines).encode("utf-8"))
+        summary, _ = analyze_business_data(content, "memory_check.csv", profile_memory=True)
+        profile = summary["memory_profile"]
+        stages = {stage["stage"]: stage for stage in profile["stages"]}
+        self.assertIn("fill_missing", stages)
+        self.assertIn("workbook", stages)
+        pipeline_peak = max(stage["peak_bytes"] for name, stage in stages.items() if name != "workbook")
+        self.assertGreater(profile["input_bytes"], 0)
+        self.assertLess(pipeline_peak, profile["input_bytes"] * 3)
+
+    def test_stored_csv_is_served_from_memory_mapped_columnar_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "sales.csv"
+            source.write_text("region,revenue\nNorth,10\nSouth,\nNorth,30\n", encoding="utf-8")
+
+            first = _load_business_dataframe(str(source), source.name)
+            self.assertTrue((columnar_cache_dir(source) / "manifest.json").exists())
+            second = _load_business_dataframe(str(source), source.name)
+
+            self.assertEqual(list(second.columns), ["region", "revenue"])
+            self.assertEqual(second["region"].tolist(), ["North", "South", "North"])
+            self.assertTrue(np.isnan(second["revenue"].iloc[1]))
+            self.assertIsInstance(second["revenue"].to_numpy().base, np.memmap)
+            self.assertEqual(first["revenue"].sum(), second["revenue"].sum())
+
+            summary, _ = analyze_business_data(str(source), source.name)
+            self.assertEqual(summary["rows_uploaded"], 3)
+
+    def test_columnar_cache_stores_plain_categories_and_prunes_stale_copies(self):
+        source = self.storage_root / "regions.csv"
+        source.write_text("region,revenue\nNorth,10\n,20\nSöd,30\n", encoding="utf-8")
+        frame = _load_business_dataframe(str(source), source.name)
+        cache_dir = columnar_cache_dir(source)
+        categories = np.load(cache_dir / "0.categories.npy", allow_pickle=False)
+        offsets = np.load(cache_dir / "0.offsets.npy", allow_pickle=False)
+        self.assertEqual(categories.dtype, np.uint8)
+        self.assertEqual(categories.tobytes().decode("utf-8"), "NorthSöd")
+        self.assertEqual(offsets.tolist(), [0, 5, 9])
+        self.assertEqual(frame["region"].iloc[0], "North")
+        self.assertTrue(pd.isna(frame["region"].iloc[1]))
+
+        wide = pd.DataFrame({"id": [f"id{index}" for index in range(2000)] + ["x" * 5000]})
+        stored = write_columnar(wide, self.storage_root / "wide")
+        self.assertLess((stored / "0.categories.npy").stat().st_size, 20_000)
+        subset = read_columnar(stored).iloc[[0, 2000]]
+        self.assertEqual(subset["id"].tolist(), ["id0", "x" * 5000])
+
+        stale = write_columnar(pd.DataFrame({"revenue": [1.0]}), cache_dir.parent / "old.csv-1-1")
+        os.utime(stale / "manifest.json", (1, 1))
+        source.write_text("region,revenue\nEast,5\n", encoding="utf-8")
+        _load_business_dataframe(str(source), source.name)
+        self.assertFalse(stale.exists())
+        self.assertTrue(cache_dir.exists())
+
+        output = StringIO()
+        call_command("prune_columnar_cache", max_bytes=0, stdout=output)
+        self.assertEqual(list(cache_dir.parent.iterdir()), [])
+        self.assertIn("removed 2 entries", output.getvalue())
+
+    def test_cleaning_owns_its_frame_after_dropping_empty_rows(self):
+        frame = pd.DataFrame(
+            {
+                "revenue": ["10", None, None, "30", "30"],
+                "region": ["North", None, None, "South", "South"],
+                "date": ["2024-01-01", "2024-01-02", None, None, None],
+                " ": [None, None, None, None, None],
+            },
+            dtype=object,
+        )
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", pd.errors.SettingWithCopyWarning)
+            prepared = _prepare_analysis(frame, "sparse.csv", _StageMemoryProfiler(False))
+        self.assertEqual(prepared.summary["rows_after_cleaning"], 2)
+        self.assertEqual(prepared.cleaned_df["region"].tolist(), ["North", "South"])
+
+    def test_semicolon_latin1_csv_is_sniffed_and_parsed_typed(self):
+        content = (
+            "Région;Umsatz;Datum\n"
+            "Nördlich;1.234,50;2024-01-03\n"
+            "Süd;99,10;2024-02-03\n"
+            "Öst;;2024-03-05\n"
+        ).encode("cp1252")
+        dataframe = _load_business_dataframe(BytesIO(content), "export.csv")
+        self.assertEqual(list(dataframe.columns), ["Région", "Umsatz", "Datum"])
+        self.assertEqual(str(dataframe["Umsatz"].dtype), "float64")
+        self.assertAlmostEqual(dataframe["Umsatz"].iloc[0], 1234.5)
+        self.assertTrue(str(dataframe["Datum"].dtype).startswith("datetime64"))
+        self.assertEqual(dataframe["Région"].iloc[1], "Süd")
+
+    def test_compressed_csv_uploads_stream_into_parser_with_decompressed_limit(self):
+        lines = ["region,revenue,cost"] + [f"R{i % 4},{100 + i},{50 + i}" for i in range(200)]
+        raw = "\n".join(lines).encode("utf-8")
+        archive = BytesIO()
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as bundle:
+            bundle.writestr("export/sales.csv", raw)
+
+        summary, _ = analyze_business_data(BytesIO(archive.getvalue()), "sales.zip")
+        self.assertEqual(summary["rows_after_cleaning"], 200)
+
+        self.client.login(username="staff", password="pass1234")
+        self.client.post(
+            reverse("reporting-data-run"),
+            data={"file": SimpleUploadedFile("sales.csv.gz", gzip.compress(raw), content_type="application/gzip")},
+            HTTP_X_TENANT="a.local",
+            HTTP_HOST="localhost",
+        )
+        run = DataAnalysisRun.objects.first()
+        self.assertEqual(run.status, DataAnalysisRun.Status.COMPLETED)
+        self.assertEqual(run.summary["rows_after_cleaning"], 200)
+
+        with patch.dict(os.environ, {"OFFICE_MAX_DECOMPRESSED_BYTES": "1024"}):
+            with self.assertRaisesMessage(ValueError, "exceeds the 1024 byte limit"):
+                analyze_business_data(BytesIO(gzip.compress(raw)), "sales.csv.gz")
+            with self.assertRaisesMessage(ValueError, "exceeds the 1024 byte limit"):
+                analyze_business_data(BytesIO(archive.getvalue()), "sales.zip")
+
+
+class WorkbookAnalysisTests(ReportingTestCase):
+    def test_multi_sheet_mode_profiles_every_sheet_in_parallel(self):
+        workbook = Workbook()
+        workbook.active.title = "North"
+        for name in ("North", "South", "Empty"):
+            ws = workbook[name] if name in workbook.sheetnames else workbook.create_sheet(name)
+            if name == "Empty":
+                continue
+            ws.append(["department", "revenue"])
+            for i in range(12):
+                ws.append([f"Dept{i % 3}", (i + 1) * (10 if name == "North" else 7)])
+        payload = BytesIO()
+        workbook.save(payload)
+        upload = SimpleUploadedFile(
+            "finance.xlsx",
+            payload.getvalue(),
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
+        self.client.login(username="staff", password="pass1234")
+        with patch.dict(os.environ, {"OFFICE_SHEET_WORKERS": "2"}):
+            response = self.client.post(
+                reverse("reporting-data-run"),
+                data={"file": upload, "sheets": "all"},
+                HTTP_X_TENANT="a.local",
+                HTTP_HOST="localhost",
+            )
+        self.assertEqual(response.status_code, 302)
+        run = DataAnalysisRun.objects.first()
+        self.assertEqual(run.status, DataAnalysisRun.Status.COMPLETED, run.summary)
+        self.assertEqual([entry["sheet"] for entry in run.sheet_summaries], ["North", "South", "Empty"])
+        self.assertEqual([entry["status"] for entry in run.sheet_summaries], ["completed", "completed", "skipped"])
+        self.assertEqual(run.summary["sheets_analyzed"], 2)
+        self.assertEqual(run.summary["rows_uploaded"], 24)
+
+        run.workbook_file.open("rb")
+        output = load_workbook(BytesIO(run.workbook_file.read()))
+        run.workbook_file.close()
+        self.assertIn("Sheets_Overview", output.sheetnames)
+        self.assertIn("North_Data", output.sheetnames)
+        self.assertIn("South_Profile", output.sheetnames)
+
+    def test_in_memory_workbooks_are_spooled_to_disk_for_the_process_pool(self):
+        workbook = Workbook()
+        workbook.active.title = "Jan"
+        for name in ("Jan", "Feb"):
+            ws = workbook[name] if name in workbook.sheetnames else workbook.create_sheet(name)
+            ws.append(["date", "region", "revenue"])
+            for i in range(10):
+                ws.append([f"2024-01-{i + 1:02d}", f"R{i % 2}", i * 10])
+        payload = BytesIO()
+        workbook.save(payload)
+        payload.seek(0)
+
+        pool_paths = []
+        original_pool = services.process_pool
+
+        def recording_pool(workers):
+            executor = original_pool(workers)
+            original_map = executor.map
+
+            def recording_map(fn, *iterables):
+                calls = list(zip(*iterables))
+                pool_paths.extend(call[0] for call in calls)
+                return original_map(fn, *zip(*calls))
+
+            executor.map = recording_map
+            return executor
+
+        with patch.dict(os.environ, {"OFFICE_SHEET_WORKERS": "2"}), patch.object(services, "process_pool", recording_pool):
+            summary, sheet_summaries, _ = analyze_workbook_sheets(payload, "months.xlsx")
+        self.assertEqual(summary["sheets_analyzed"], 2)
+        self.assertEqual(len(pool_paths), 2)
+        self.assertTrue(pool_paths[0].endswith(".xlsx"))
+        self.assertFalse(os.path.exists(pool_paths[0]))
+        for entry in sheet_summaries:
+            self.assertNotIn("column_sketches", entry)
+            self.assertNotIn("time_trend_buckets", entry)
+
+    def test_outlier_engine_flags_rows_and_exports_outlier_rows_sheet(self):
+        lines = ["region,revenue,cost"]
+        for i in range(40):
+            lines.append(f"R{i % 4},{100 + (i % 7)},{50 + (i % 5)}")
+        lines.append("R1,5000,52")
+        lines.append("R2,103,900")
+        summary, workbook_artifact = analyze_business_data(BytesIO("\n".join(lines).encode("utf-8")), "scan.csv")
+
+        self.assertEqual(summary["outlier_count"], 2)
+        self.assertEqual(summary["outlier_rows_flagged"], 2)
+        self.assertEqual(set(summary["outlier_counts_by_method"]), {"iqr", "mad", "zscore"})
+        output = load_workbook(workbook_artifact)
+        self.assertIn("Outlier_Rows", output.sheetnames)
+        rows = list(output["Outlier_Rows"].iter_rows(values_only=True))
+        self.assertEqual(rows[0][:3], ("Source_Row", "Outlier_Methods", "Outlier_Columns"))
+        flagged = {row[0]: row for row in rows[1:]}
+        self.assertEqual(flagged[42][2], "revenue")
+        self.assertIn("iqr", flagged[42][1])
+        self.assertEqual(flagged[43][2], "cost")
+
+    def test_workbook_artifact_is_spooled_to_storage_and_streamed_on_download(self):
+        self.client.login(username="staff", password="pass1234")
+        with patch.dict(os.environ, {"OFFICE_ARTIFACT_SPOOL_MAX_BYTES": "1024"}):
+            self.client.post(
+                reverse("reporting-data-run"),
+                data={"file": self._dataset_upload()},
+                HTTP_X_TENANT="a.local",
+                HTTP_HOST="localhost",
+            )
+        run = DataAnalysisRun.objects.first()
+        self.assertEqual(run.status, DataAnalysisRun.Status.COMPLETED)
+        self.assertGreater(run.workbook_file.size, 1024)
+
+        response = self.client.get(
+            reverse("reporting-data-download", args=[run.id]), HTTP_X_TENANT="a.local", HTTP_HOST="localhost"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn("attachment;", response["Content-Disposition"])
+        workbook = load_workbook(BytesIO(b"".join(response.streaming_content)))
+        self.assertIn("Dashboard", workbook.sheetnames)
+
+    def test_lttb_downsampling_keeps_endpoints_and_peaks(self):
+        size = 20_000
+        x = np.arange(size, dtype=np.float64)
+        y = np.sin(x / 500.0)
+        y[12_345] = 40.0
+        indices = lttb_indices(x, y, 500)
+        self.assertEqual(len(indices), 500)
+        self.assertEqual((indices[0], indices[-1]), (0, size - 1))
+        self.assertIn(12_345, indices)
+
+    def test_html_report_is_generated_and_downloadable(self):
+        lines = ["date,revenue,cost"] + [
+            f"{(np.datetime64('2024-01-01') + i).astype(str)},{100 + i % 13},{50 + i % 7}" for i in range(400)
+        ]
+        self.client.login(username="staff", password="pass1234")
+        with patch.dict(os.environ, {"OFFICE_HTML_REPORT_POINTS": "50"}):
+            self.client.post(
+                reverse("reporting-data-run"),
+                data={
+                    "file": SimpleUploadedFile("daily.csv", "\n".join(lines).encode("utf-8"), content_type="text/csv"),
+                    "html_report": "1",
+                },
+                HTTP_X_TENANT="a.local",
+                HTTP_HOST="localhost",
+            )
+        run = DataAnalysisRun.objects.first()
+        self.assertEqual(run.status, DataAnalysisRun.Status.COMPLETED)
+        self.assertTrue(run.summary["html_report_generated"])
+
+        response = self.client.get(
+            reverse("reporting-data-html-download", args=[run.id]), HTTP_X_TENANT="a.local", HTTP_HOST="localhost"
+        )
+        self.assertEqual(response.status_code, 200)
+        content = b"".join(response.streaming_content).decode("utf-8")
+        self.assertNotIn("<script src=", content)
+        self.assertIn("plotly.js v", content)
+        self.assertIn("Trends over date", content)
+        self.assertIn("Distribution of revenue", content)
+
+    def test_time_trends_sheet_buckets_by_span(self):
+        rows = ["date,revenue,region"] + [
+            f"{(np.datetime64('2024-01-01') + i).astype(str)},{100 + i},R{i % 3}" for i in range(60)
+        ]
+        summary, workbook_artifact = analyze_business_data(BytesIO("\n".join(rows).encode("utf-8")), "daily.csv")
+        self.assertEqual(summary["time_trend_column"], "date")
+        self.assertEqual(summary["time_trend_bucket"], "day")
+        self.assertEqual(summary["time_trend_buckets"], 60)
+
+        monthly = ["date,revenue"] + [f"{(np.datetime64('2020-01-01') + 7 * i).astype(str)},{i}" for i in range(200)]
+        summary, workbook_artifact = analyze_business_data(BytesIO("\n".join(monthly).encode("utf-8")), "weekly.csv")
+        self.assertEqual(summary["time_trend_bucket"], "month")
+        worksheet = load_workbook(workbook_artifact)["Time_Trends"]
+        header = [cell.value for cell in worksheet[1]]
+        self.assertEqual(header, ["Bucket Start", "Rows", "revenue count", "revenue sum", "revenue mean"])
+        first = [cell.value for cell in worksheet[2]]
+        self.assertEqual(first[1:4], [5, 5, 10])
+        self.assertEqual(len(worksheet._charts), 1)
+
+
+class DataRunDatasetTests(ReportingTestCase):
+    def test_large_dataset_mode_stores_the_full_cleaned_dataset(self):
+        rows = ["region,revenue"] + [f"R{i % 4},{i + 1}" for i in range(60_000)] + ["R0,", "R0,5"]
+        dataset_dir = self.storage_root / "large_run"
+        with patch.dict(os.environ, {"OFFICE_MAX_PROCESS_ROWS": "50000"}):
+            summary, _ = analyze_business_data(
+                BytesIO("\n".join(rows).encode("utf-8")), "large.csv", dataset_dir=dataset_dir
+            )
+        self.assertTrue(summary["large_dataset_mode"])
+        self.assertEqual(summary["rows_profiled"], 50_000)
+        self.assertEqual(summary["query_dataset_rows"], 60_001)
+        spec = normalize_query_spec(
+            {"aggregates": [{"column": "revenue", "func": "sum"}, {"column": "revenue", "func": "count"}]},
+            ["region", "revenue"],
+        )
+        result = execute_query(dataset_dir, spec)
+        total, count = result["rows"][0]
+        self.assertEqual(count, 60_001)
+        self.assertGreater(total, 60_000 * 60_001 // 2)
+
+    def test_query_api_aggregates_stored_run_dataset_and_caches_by_spec(self):
+        rows = ["date,region,revenue"] + [
+            f"{(np.datetime64('2024-01-01') + 3 * i).astype(str)},R{i % 3},{10 * (i + 1)}" for i in range(120)
+        ]
+        self.client.login(username="staff", password="pass1234")
+        self.client.post(
+            reverse("reporting-data-run"),
+            data={"file": SimpleUploadedFile("sales.csv", "\n".join(rows).encode("utf-8"), content_type="text/csv")},
+            HTTP_X_TENANT="a.local",
+            HTTP_HOST="localhost",
+        )
+        run = DataAnalysisRun.objects.first()
+        self.assertEqual(run.summary["query_dataset_rows"], 120)
+        spec = {
+            "filters": [{"column": "date", "op": "between", "value": ["2024-07-01", "2024-09-30"]}],
+            "group_by": ["region"],
+            "aggregates": [{"column": "revenue", "func": "sum"}, {"column": "revenue", "func": "count"}],
+            "order_by": "revenue_sum",
+            "descending": True,
+        }
+        url = reverse("reporting-data-query", args=[run.id])
+        first = self.client.post(
+            url, data=json.dumps(spec), content_type="application/json", HTTP_X_TENANT="a.local", HTTP_HOST="localhost"
+        )
+        self.assertEqual(first.status_code, 200)
+        payload = first.json()
+        self.assertEqual(payload["columns"], ["region", "revenue_sum", "revenue_count"])
+        self.assertFalse(payload["cached"])
+        self.assertEqual(sum(row[2] for row in payload["rows"]), payload["rows_matched"])
+        self.assertEqual(payload["rows_matched"], 31)
+        self.assertGreaterEqual(payload["rows"][0][1], payload["rows"][-1][1])
+
+        second = self.client.post(
+            url, data=json.dumps(spec), content_type="application/json", HTTP_X_TENANT="a.local", HTTP_HOST="localhost"
+        )
+        self.assertTrue(second.json()["cached"])
+        self.assertEqual(second.json()["rows"], payload["rows"])
+
+        bad = self.client.post(
+            url,
+            data=json.dumps({"aggregates": [{"column": "revenue", "func": "__class__"}]}),
+            content_type="application/json",
+            HTTP_X_TENANT="a.local",
+            HTTP_HOST="localhost",
+        )
+        self.assertEqual(bad.status_code, 400)
+
+    def test_run_datasets_are_removed_on_failure_delete_and_prune(self):
+        rows = "region,revenue\n" + "\n".join(f"R{i % 3},{i}" for i in range(30))
+        self.client.login(username="staff", password="pass1234")
+
+        def post():
+            self.client.post(
+                reverse("reporting-data-run"),
+                data={"file": SimpleUploadedFile("sales.csv", rows.encode("utf-8"), content_type="text/csv")},
+                HTTP_X_TENANT="a.local",
+                HTTP_HOST="localhost",
+            )
+            return DataAnalysisRun.objects.order_by("-id").first()
+
+        with patch("apps.reporting.views.save_artifact", side_effect=OSError("disk full")):
+            failed = post()
+        self.assertEqual(failed.status, DataAnalysisRun.Status.FAILED)
+        self.assertFalse(run_dataset_dir(failed).exists())
+
+        deleted, expired, kept = post(), post(), post()
+        self.assertTrue(run_dataset_dir(deleted).exists())
+        deleted.delete()
+        self.assertFalse(run_dataset_dir(deleted).exists())
+
+        orphan = write_columnar(pd.DataFrame({"revenue": [1.0]}), run_dataset_root() / "999999")
+        os.utime(run_dataset_dir(expired) / "manifest.json", (1, 1))
+        output = StringIO()
+        call_command("prune_run_datasets", max_age_days=30, stdout=output)
+        self.assertFalse(orphan.exists())
+        self.assertFalse(run_dataset_dir(expired).exists())
+        self.assertTrue(run_dataset_dir(kept).exists())
+        self.assertIn("removed 1 orphaned and 1 expired datasets", output.getvalue())
+
+    def test_compare_runs_flags_drift_from_stored_sketches(self):
+        base_rows = ["region,revenue,cost"] + [f"R{i % 3},{100 + i % 50},{40 + i % 9}" for i in range(300)]
+        current_rows = ["region,revenue,cost"] + [
+            f"{'R9' if i % 4 == 0 else f'R{i % 3}'},{400 + i % 50},{'' if i % 5 == 0 else 40 + i % 9}" for i in range(300)
+        ]
+        self.client.login(username="staff", password="pass1234")
+        run_ids = []
+        for name, rows in (("base.csv", base_rows), ("current.csv", current_rows)):
+            self.client.post(
+                reverse("reporting-data-run"),
+                data={"file": SimpleUploadedFile(name, "\n".join(rows).encode("utf-8"), content_type="text/csv")},
+                HTTP_X_TENANT="a.local",
+                HTTP_HOST="localhost",
+            )
+            run = DataAnalysisRun.objects.order_by("-id").first()
+            self.assertIn("revenue", run.column_sketches["columns"])
+            self.assertNotIn("column_sketches", run.summary)
+            run_ids.append(run.id)
+
+        response = self.client.get(
+            reverse("reporting-data-compare"),
+            {"base": run_ids[0], "current": run_ids[1]},
+            HTTP_X_TENANT="a.local",
+            HTTP_HOST="localhost",
+        )
+        self.assertEqual(response.status_code, 200)
+        columns = response.json()["columns"]
+        self.assertEqual(columns["revenue"]["status"], "drift")
+        self.assertIn("distribution shifted", columns["revenue"]["reasons"])
+        self.assertEqual(columns["region"]["new_categories"], ["R9"])
+        self.assertAlmostEqual(columns["cost"]["null_rate_delta"], 0.2, places=3)
+        self.assertEqual(response.json()["columns_with_drift"], ["cost", "region", "revenue"])
+
+
+class DocumentExtractionTests(ReportingTestCase):
+    def test_pdf_pages_stream_in_order_from_process_pool(self):
+        texts = [f"Page {index} covers ward staffing levels and supply deliveries." for index in range(40)]
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = Path(tmp) / "long.pdf"
+            pdf_path.write_bytes(self._pdf_bytes(texts))
+            with patch.dict(os.environ, {"OFFICE_PDF_WORKERS": "2", "OFFICE_PDF_PAGES_PER_TASK": "8"}):
+                pages = iter_pdf_pages(str(pdf_path))
+                self.assertEqual(next(pages).strip(), texts[0])
+                remaining = [page.strip() for page in pages]
+            self.assertEqual(remaining, texts[1:])
+            self.assertEqual(ai_runtime.process_start_method(), "forkserver")
+            with patch.dict(os.environ, {"OFFICE_PROCESS_START_METHOD": "fork"}):
+                self.assertEqual(ai_runtime.process_start_method(), "forkserver")
+
+            with patch.dict(os.environ, {"OFFICE_PDF_WORKERS": "2", "OFFICE_PDF_PAGES_PER_TASK": "8"}):
+                summary, _ = build_powerpoint_report("long.pdf", iter_document_pages(str(pdf_path), "long.pdf"))
+        self.assertEqual(summary["paragraphs_analyzed"], 40)
+        self.assertIn("staffing", summary["top_keywords"])
+        self.assertEqual(len(summary["semantic_points"]), 8)
+
+    def test_document_text_cache_reuses_extraction_and_prunes_lru(self):
+        content = self._doc_upload().read()
+        cache_root = self.storage_root / "text_cache"
+        first, _ = build_powerpoint_report("brief.docx", iter_document_pages(BytesIO(content), "brief.docx"))
+        with patch("apps.reporting.documents.iter_docx_paragraphs", side_effect=AssertionError("re-parsed")):
+            second, _ = build_powerpoint_report("brief.docx", iter_document_pages(BytesIO(content), "brief.docx"))
+        self.assertEqual(first["semantic_points"], second["semantic_points"])
+
+        pdf = self._pdf_bytes(["Quarterly staffing review for the surgical ward."])
+        self.assertIn("staffing", extract_document_text(BytesIO(pdf), "review.pdf"))
+        entries = sorted(cache_root.glob("*/*.jsonl.gz"))
+        self.assertEqual(len(entries), 2)
+        docx_entry = next(path for path in entries if "reporting.docx" in path.name)
+        os.utime(docx_entry, (1, 1))
+
+        output = StringIO()
+        call_command("prune_text_cache", max_bytes=docx_entry.stat().st_size + 1, stdout=output)
+        remaining = list(cache_root.glob("*/*.jsonl.gz"))
+        self.assertEqual([path.name for path in remaining], [path.name for path in entries if path != docx_entry])
+        self.assertIn("removed 1 entries", output.getvalue())
+
+    def test_text_cache_writes_and_reads_entries_as_streams(self):
+        cache_root = self.storage_root / "text_cache"
+
+        def extract():
+            yield from ["first page", ["heading", "second"], "third page"]
+
+        partial = cached_extraction(BytesIO(b"pages"), "stream.v1", extract)
+        self.assertEqual(next(partial), "first page")
+        partial.close()
+        self.assertEqual(list(cache_root.glob("*/*")), [])
+
+        self.assertEqual(list(cached_extraction(BytesIO(b"pages"), "stream.v1", extract)), list(extract()))
+        entry = next(cache_root.glob("*/*stream.v1.jsonl.gz"))
+        with gzip.open(entry, "rt", encoding="utf-8") as handle:
+            self.assertEqual(len(handle.readlines()), 4)
+        cached = load_cached_text(content_digest(BytesIO(b"pages")), "stream.v1")
+        self.assertEqual(next(cached), "first page")
+        cached.close()
+
+        def fail():
+            raise AssertionError("re-extracted")
+            yield
+
+        self.assertEqual(list(cached_extraction(BytesIO(b"pages"), "stream.v1", fail)), list(extract()))
+        entry.write_bytes(entry.read_bytes()[:-6])
+        self.assertEqual(list(cached_extraction(BytesIO(b"pages"), "stream.v1", extract)), list(extract()))
+
+    def test_bounded_counter_keeps_heavy_hitters(self):
+        counter = BoundedCounter(capacity=50)
+        for index in range(40):
+            counter.update({f"term{index}{suffix}": 1 for suffix in range(10)} | {"warehouse": 5})
+        self.assertLessEqual(len(counter.counts), 100)
+        self.assertEqual(counter.most_common(1), [("warehouse", 200)])
+
+    def test_text_uploads_decode_in_pages(self):
+        lines = [f"Línea {index}: warehouse shipment délai for région {index % 3}." for index in range(400)]
+        payload = "\n".join(lines).encode("utf-8")
+        pages = list(iter_text_pages(BytesIO(payload), page_bytes=1000))
+        self.assertGreater(len(pages), 10)
+        self.assertEqual("".join(pages), payload.decode("utf-8"))
+        self.assertTrue(all(page.rstrip().endswith(".") for page in pages[:-1]))
+        unbroken = list(iter_text_pages(BytesIO(b"x" * 5000), page_bytes=1000))
+        self.assertEqual([len(page) for page in unbroken], [4000, 1000])
+
+        with patch("apps.reporting.documents.TEXT_PAGE_BYTES", 2048):
+            summary, _ = build_powerpoint_report("export.txt", iter_document_pages(BytesIO(payload), "export.txt"))
+        self.assertEqual(summary["paragraphs_analyzed"], 400)
+        self.assertEqual(summary["top_keywords"][:2], ["warehouse", "shipment"])
+
+
+class EmbeddingRuntimeTests(ReportingTestCase):
+    def test_embedding_cache_serves_repeats_from_memory_then_disk(self):
+        class CountingModel:
+            def __init__(self):
+                self.encoded = []
+
+            def encode(self, sentences, normalize_embeddings=True, **kwargs):
+                self.encoded.extend(sentences)
+                return np.array([[len(sentence), 1.0, 0.5] for sentence in sentences], dtype=np.float32)
+
+        model = CountingModel()
+        sentences = ["Confidential - internal use only.", "Revenue grew 9 percent.", "confidential -  internal use only."]
+        first = encode_sentences(model, "test-model", sentences)
+        self.assertEqual(model.encoded, sentences[:2])
+        np.testing.assert_array_equal(first[0], first[2])
+
+        encode_sentences(model, "test-model", sentences)
+        self.assertEqual(len(model.encoded), 2)
+        self.assertEqual(get_embedding_cache("test-model").stats()["memory_hits"], 3)
+
+        reset_embedding_caches()
+        from_disk = encode_sentences(model, "test-model", sentences[:2])
+        self.assertEqual(len(model.encoded), 2)
+        np.testing.assert_allclose(from_disk, first[:2], rtol=1e-3)
+        stats = embedding_cache_stats()
+        self.assertEqual(stats["disk_hit_rate"], 1.0)
+
+    def test_model_registry_loads_once_under_concurrency_and_backs_off_on_failure(self):
+        calls = []
+
+        def slow_loader(name):
+            calls.append(name)
+            time.sleep(0.05)
+            return object()
+
+        registry = ModelRegistry(slow_loader)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            models = list(executor.map(registry.get, ["encoder"] * 8))
+        self.assertEqual(calls, ["encoder"])
+        self.assertEqual(len({id(model) for model in models}), 1)
+        self.assertTrue(registry.status()["encoder"]["loaded"])
+
+        attempts = []
+
+        def flaky_loader(name):
+            attempts.append(name)
+            raise OSError("weights unavailable")
+
+        failing = ModelRegistry(flaky_loader)
+        env = {"OFFICE_EMBED_LOAD_ATTEMPTS": "3", "OFFICE_EMBED_LOAD_BACKOFF_SECONDS": "0", "OFFICE_EMBED_RETRY_COOLDOWN_SECONDS": "30"}
+        with patch.dict(os.environ, env):
+            self.assertIsNone(failing.get("encoder"))
+            self.assertIsNone(failing.get("encoder"))
+        self.assertEqual(len(attempts), 3)
+        status = failing.status()["encoder"]
+        self.assertEqual(status["failures"], 1)
+        self.assertGreater(status["retry_in_seconds"], 0)
+        self.assertIn("weights unavailable", status["last_error"])
+
+    def test_embedding_batcher_coalesces_concurrent_requests(self):
+        class BatchModel:
+            def __init__(self):
+                self.calls = []
+
+            def encode(self, sentences, normalize_embeddings=True, batch_size=32):
+                self.calls.append(list(sentences))
+                return np.array([[float(sentence.split()[-1]), 1.0] for sentence in sentences], dtype=np.float32)
+
+        model = BatchModel()
+        batcher = EmbeddingBatcher(model, batch_size=64, max_wait_seconds=0.2)
+        requests = [[f"request {index} sentence {index * 10 + offset}" for offset in range(3)] for index in range(6)]
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            futures = list(executor.map(batcher.submit, requests))
+        results = [future.result(timeout=5) for future in futures]
+
+        for index, vectors in enumerate(results):
+            self.assertEqual(vectors[:, 0].tolist(), [index * 10 + offset for offset in range(3)])
+        self.assertLess(len(model.calls), len(requests))
+        self.assertEqual(sum(len(call) for call in model.calls), 18)
+        self.assertGreater(batcher.stats()["requests_per_batch"], 1)
+
+        failing = EmbeddingBatcher(type("Broken", (), {"encode": lambda self, *args, **kwargs: 1 / 0})(), max_wait_seconds=0)
+        with self.assertRaises(ZeroDivisionError):
+            failing.encode(["boom"])
+
+    def test_hashing_embedder_encodes_normalized_vectors(self):
+        embedder = HashingEmbedder.from_name("hashing-512-2")
+        vectors = embedder.encode(["Revenue growth accelerated.", "Revenue growth accelerated!", "Parking was full."])
+        self.assertEqual(vectors.shape, (3, 512))
+        self.assertEqual(vectors.dtype, np.float32)
+        np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+        np.testing.assert_array_equal(vectors[2], HashingEmbedder(512, 2).encode("Parking was full."))
+        self.assertGreater(float(vectors[0] @ vectors[1]), float(vectors[0] @ vectors[2]))
+        with self.assertRaises(ValueError):
+            HashingEmbedder.from_name("hashing-wide")
+        self.assertEqual(HashingEmbedder(64, 2)._terms("Région Nord"), ["région", "nord", "région nord"])
+        accented = HashingEmbedder(512, 1).encode(["Coûts région", "Couts region", "Coûts région."])
+        self.assertLess(float(accented[0] @ accented[1]), 0.5)
+        np.testing.assert_allclose(accented[0], accented[2])
+
+    def test_hashing_embedder_is_selectable_offline_backend(self):
+        sentences = [f"Revenue growth note {index}." for index in range(6)] + ["Parking.", "Lunch menus."] * 3
+        ai_runtime.get_runtime_profile.cache_clear()
+        ai_runtime.MODEL_REGISTRY.clear()
+        try:
+            with patch.dict(os.environ, {"OFFICE_EMBED_MODEL": "hashing"}):
+                self.assertIsInstance(ai_runtime.get_embedder(), HashingEmbedder)
+                points = ai_runtime.rank_key_sentences(sentences, max_points=3)
+        finally:
+            ai_runtime.get_runtime_profile.cache_clear()
+            ai_runtime.MODEL_REGISTRY.clear()
+        self.assertEqual(points, sentences[:3])
+
+    def test_benchmark_embedders_command_reports_each_backend(self):
+        output = StringIO()
+        call_command(
+            "benchmark_embedders", "--models", "nltk-frequency", "hashing", "--sentences", "200", "--repeat", "1", stdout=output
+        )
+        self.assertIn("hashing: load", output.getvalue())
+
+
+class KeyPointRankingTests(ReportingTestCase):
+    def test_tfidf_ranking_builds_csr_matrix_and_keeps_document_order(self):
+        sentences = [
+            "Revenue growth drove quarterly revenue results.",
+            "Weather was mild.",
+            "Revenue growth and margin growth improved.",
+            "Lunch menus changed.",
+            "Margin growth tracked revenue.",
+            "Parking remained available.",
+        ]
+        indptr, indices, counts, vocab_size = _term_sentence_matrix(sentences)
+        self.assertEqual(len(indptr), len(sentences) + 1)
+        self.assertEqual(int(indptr[-1]), len(indices))
+        self.assertTrue((indices < vocab_size).all())
+        self.assertEqual(counts.max(), 2)
+
+        scores = _tfidf_scores(sentences)
+        self.assertEqual(set(np.argsort(-scores)[:3].tolist()), {0, 2, 4})
+        self.assertEqual(_frequency_rank_sentences(sentences, 2), [sentences[0], sentences[1]])
+        _, accented, _, _ = _term_sentence_matrix(["Région Nord: hausse des coûts_2024."])
+        self.assertEqual(len(accented), 5)
+        accented_scores = _tfidf_scores(["La région nord progresse.", "La région sud recule.", "Le budget ferme."])
+        self.assertGreater(accented_scores[0], accented_scores[2])
+        many = [f"Topic {index % 7} update number {index}." for index in range(5000)]
+        ranked = _frequency_rank_sentences(many, 8)
+        self.assertEqual(ranked, sorted(ranked, key=many.index))
+        self.assertEqual(len(ranked), 8)
+
+    def test_long_documents_rank_windows_then_candidates(self):
+        topics = ["revenue growth", "supplier risk", "hiring plan", "cloud costs"]
+        sentences = (
+            f"Section {section} covers {topics[section]} detail {index} for {topics[section]}."
+            for section in range(4)
+            for index in range(300)
+        )
+        window_sizes = []
+        original = ai_runtime.rank_key_sentences
+
+        def recording_rank(window, max_points=8):
+            window_sizes.append(len(window))
+            return original(window, max_points)
+
+        with patch.dict(
+            os.environ, {"OFFICE_LONG_DOCUMENT_SENTENCES": "200", "OFFICE_KEY_POINT_WINDOW_SENTENCES": "100"}
+        ), patch.object(ai_runtime, "rank_key_sentences", side_effect=recording_rank):
+            points = long_document_key_points(sentences, max_points=8)
+
+        self.assertEqual(len(points), 8)
+        self.assertLessEqual(max(window_sizes), 200)
+        self.assertEqual(window_sizes[:12], [100] * 12)
+        indices = [int(point.split("detail ")[1].split()[0]) + 300 * int(point.split()[1]) for point in points]
+        self.assertEqual(indices, sorted(indices))
+        self.assertEqual(long_document_key_points(iter(["One.", "Two."]), max_points=8), ["One.", "Two."])
+
+
+class DocumentCorpusTests(ReportingTestCase):
+    def test_near_duplicate_document_reuses_prior_run_key_points(self):
+        self.client.login(username="staff", password="pass1234")
+        body = " ".join(
+            f"Paragraph {index} reviews supplier contracts, freight delays and warehouse staffing in region {index % 5}."
+            for index in range(120)
+        )
+        uploads = [
+            SimpleUploadedFile("brief-v1.txt", body.encode("utf-8"), content_type="text/plain"),
+            SimpleUploadedFile(
+                "brief-v2-final.txt", f"{body} Approved by finance.".encode("utf-8"), content_type="text/plain"
+            ),
+            SimpleUploadedFile("menu.txt", b"Cafeteria menu: soup, salad and bread rolls on Friday.", content_type="text/plain"),
+        ]
+        for upload in uploads:
+            self.client.post(
+                reverse("reporting-doc-run"), data={"file": upload}, HTTP_X_TENANT="a.local", HTTP_HOST="localhost"
+            )
+
+        original, revision, unrelated = DocumentReportRun.objects.order_by("id")
+        self.assertEqual(revision.status, DocumentReportRun.Status.COMPLETED)
+        self.assertEqual(revision.duplicate_of, original)
+        self.assertGreaterEqual(revision.similarity, 0.9)
+        self.assertEqual(revision.summary["reused_from_run"], original.id)
+        self.assertEqual(revision.summary["semantic_points"], original.summary["semantic_points"])
+        self.assertEqual(revision.summary["top_keywords"], original.summary["top_keywords"])
+        self.assertIsNone(unrelated.duplicate_of)
+        self.assertLess(unrelated.similarity, 0.5)
+        self.assertEqual(DocumentSignatureBand.objects.filter(signature__run=original).count(), 16)
+        tenant = self.staff.tenant
+        self.assertEqual(TermCorpus.objects.get(tenant=tenant).document_count, 3)
+        self.assertEqual(TermStatistic.objects.get(tenant=tenant, term="supplier").document_frequency, 2)
+        self.assertEqual(TermStatistic.objects.get(tenant=tenant, term="finance").document_frequency, 1)
+
+    def test_document_runs_extract_each_upload_once(self):
+        self.client.login(username="staff", password="pass1234")
+        content = self._doc_upload().read()
+
+        def upload(name):
+            self.client.post(
+                reverse("reporting-doc-run"),
+                data={"file": SimpleUploadedFile(name, content)},
+                HTTP_X_TENANT="a.local",
+                HTTP_HOST="localhost",
+            )
+            return DocumentReportRun.objects.latest("id")
+
+        with patch("apps.reporting.documents._iter_docx_pages", wraps=documents._iter_docx_pages) as extract:
+            with patch.dict(os.environ, {"OFFICE_TEXT_CACHE": "False"}):
+                first = upload("brief.docx")
+                uncached = upload("brief-copy.docx")
+            self.assertEqual(extract.call_count, 2)
+            cached = upload("brief-final.docx")
+            self.assertEqual(extract.call_count, 3)
+            reused = upload("brief-final-2.docx")
+            self.assertEqual(extract.call_count, 3)
+
+        self.assertEqual(uncached.duplicate_of, first)
+        self.assertNotIn("reused_from_run", uncached.summary)
+        self.assertEqual(cached.duplicate_of, uncached)
+        self.assertEqual(reused.summary["reused_from_run"], cached.id)
+        self.assertEqual(reused.summary["semantic_points"], first.summary["semantic_points"])
+
+    def test_document_runs_update_tenant_term_statistics_for_idf_keywords(self):
+        self.client.login(username="staff", password="pass1234")
+        documents = {
+            "budget.txt": "Budget review for freight carriers. Budget owners approved freight savings.",
+            "hiring.txt": "Budget notes on hiring. Recruiters expanded hiring for warehouse roles.",
+            "audit.txt": "Budget audit found invoice gaps. Invoice controls need an audit owner.",
+        }
+        for name, text in documents.items():
+            self.client.post(
+                reverse("reporting-doc-run"),
+                data={"file": SimpleUploadedFile(name, text.encode("utf-8"), content_type="text/plain")},
+                HTTP_X_TENANT="a.local",
+                HTTP_HOST="localhost",
+            )
+
+        tenant = self.staff.tenant
+        self.assertEqual(TermCorpus.objects.get(tenant=tenant).document_count, 3)
+        budget = TermStatistic.objects.get(tenant=tenant, term="budget")
+        self.assertEqual((budget.document_frequency, budget.total_frequency), (3, 4))
+        self.assertEqual(TermStatistic.objects.get(tenant=tenant, term="invoice").document_frequency, 1)
+        self.assertNotIn("term_counts", DocumentReportRun.objects.first().summary)
+
+        self.assertEqual(tenant_keywords(None, {"budget": 3, "invoice": 2}, 1), ["budget"])
+        self.assertEqual(tenant_keywords(tenant, {"budget": 3, "invoice": 2}, 1), ["invoice"])
+
+        insights = get_dashboard_insights(tenant)
+        self.assertEqual(insights["top_keywords"]["labels"][0], "budget")
+        self.assertEqual(insights["top_keywords"]["counts"][0], 3)
+
+    def test_document_frequency_covers_terms_beyond_the_keyword_candidates(self):
+        self.client.login(username="staff", password="pass1234")
+        filler = " ".join(f"term{chr(97 + index // 26)}{chr(97 + index % 26)}" for index in range(300))
+        text = f"{filler} {filler}. A single zeppelin note."
+        self.client.post(
+            reverse("reporting-doc-run"),
+            data={"file": SimpleUploadedFile("long.txt", text.encode("utf-8"), content_type="text/plain")},
+            HTTP_X_TENANT="a.local",
+            HTTP_HOST="localhost",
+        )
+        tenant = self.staff.tenant
+        zeppelin = TermStatistic.objects.get(tenant=tenant, term="zeppelin")
+        self.assertEqual((zeppelin.document_frequency, zeppelin.total_frequency), (1, 1))
+        self.assertEqual(TermStatistic.objects.filter(tenant=tenant, term__startswith="term").count(), 300)
+
+    def test_term_lookups_and_updates_are_batched(self):
+        tenant = self.staff.tenant
+        counts = {"alpha": 2, "beta": 2, "gamma": 2, "delta": 1, "epsilon": 1}
+        with patch.object(term_stats, "TERM_BATCH", 2):
+            record_document_terms(tenant, counts)
+            with self.assertNumQueries(4):
+                keywords = tenant_keywords(tenant, counts, 2)
+        self.assertEqual(keywords, ["alpha", "beta"])
+        self.assertEqual(
+            dict(TermStatistic.objects.filter(tenant=tenant).values_list("term", "total_frequency")), counts
+        )
+        self.assertEqual(set(TermStatistic.objects.values_list("document_frequency", flat=True)), {1})
+
+
+class SemanticSearchTests(ReportingTestCase):
+    def test_document_passages_are_embedded_for_semantic_search(self):
+        self.client.login(username="staff", password="pass1234")
+        documents = {
+            "audit.txt": "The audit found duplicate invoice payments to two suppliers. Finance will recover the payments.",
+            "hiring.txt": "Recruiters opened new warehouse roles. Hiring managers interview candidates every Tuesday.",
+            "cloud.txt": "Cloud hosting costs rose after the migration. Engineers will resize idle database servers.",
+        }
+        with patch("apps.reporting.views.iter_document_pages", side_effect=iter_document_pages) as extract:
+            for name, text in documents.items():
+                self.client.post(
+                    reverse("reporting-doc-run"),
+                    data={"file": SimpleUploadedFile(name, text.encode("utf-8"), content_type="text/plain")},
+                    HTTP_X_TENANT="a.local",
+                    HTTP_HOST="localhost",
+                )
+        self.assertEqual(extract.call_count, len(documents))
+        response = self.client.get(
+            reverse("reporting-semantic-search"),
+            {"q": "duplicate invoice payments", "k": 2},
+            HTTP_X_TENANT="a.local",
+            HTTP_HOST="localhost",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(len(results), 2)
+        self.assertTrue(results[0]["source_name"].startswith("audit"))
+        self.assertIn("duplicate invoice payments", results[0]["passage"])
+        self.assertEqual(DocumentReportRun.objects.order_by("id").first().summary["passages_indexed"], 1)
+
+    def test_deleted_runs_leave_no_orphan_passages_in_search(self):
+        self.client.login(username="staff", password="pass1234")
+        documents = {
+            "audit.txt": "The audit found duplicate invoice payments to two suppliers.",
+            "refunds.txt": "Suppliers refunded the duplicate invoice payments in March.",
+            "ledger.txt": "The ledger now flags invoice payments above the approval limit.",
+            "hiring.txt": "Recruiters opened new warehouse roles for the spring season.",
+        }
+        for name, text in documents.items():
+            self.client.post(
+                reverse("reporting-doc-run"),
+                data={"file": SimpleUploadedFile(name, text.encode("utf-8"), content_type="text/plain")},
+                HTTP_X_TENANT="a.local",
+                HTTP_HOST="localhost",
+            )
+        tenant = self.staff.tenant
+        DocumentReportRun.objects.get(summary__source_name="audit.txt").delete()
+        self.assertEqual(tenant_vector_indexes(tenant.id)[0].stats()["rows"], 3)
+
+        DocumentPassage.objects.filter(run__summary__source_name="refunds.txt").delete()
+        with patch.object(VectorIndex, "search", autospec=True, side_effect=VectorIndex.search) as search:
+            results = semantic_search(tenant, "duplicate invoice payments", k=2)
+        self.assertEqual([result["source_name"] for result in results], ["ledger.txt", "hiring.txt"])
+        self.assertEqual([call.kwargs["k"] for call in search.call_args_list], [2, 4])
+
+    def test_vector_index_recovers_partial_appends_and_compacts_tombstones(self):
+        generator = np.random.default_rng(5)
+        vectors = generator.normal(size=(8, 16))
+        with tempfile.TemporaryDirectory() as index_dir:
+            index = VectorIndex(Path(index_dir))
+            index.add(range(8), vectors)
+            with open(Path(index_dir) / "vectors.bin", "ab") as handle:
+                handle.write(b"\0" * 16 * 2 * 3)
+            self.assertEqual(len(VectorIndex(Path(index_dir))), 8)
+            index.add([8], vectors[:1])
+            self.assertEqual({passage_id for passage_id, _ in index.search(vectors[0], k=2)}, {0, 8})
+            self.assertEqual((Path(index_dir) / "ids.i8").stat().st_size, 9 * 8)
+            self.assertEqual((Path(index_dir) / "vectors.bin").stat().st_size, 9 * 16 * 2)
+
+            self.assertEqual(index.remove([3, 3, 42]), 1)
+            self.assertEqual(index.stats()["deleted"], 1)
+            hits = index.search(vectors[3], k=8)
+            self.assertEqual(len(hits), 8)
+            self.assertNotIn(3, [passage_id for passage_id, _ in hits])
+
+            index.remove([0, 1])
+            stats = index.stats()
+            self.assertEqual((stats["rows"], stats["deleted"]), (6, 0))
+            self.assertFalse((Path(index_dir) / "vectors.bin").exists())
+            self.assertEqual(
+                sorted(passage_id for passage_id, _ in VectorIndex(Path(index_dir)).search(vectors[2], k=10)),
+                [2, 4, 5, 6, 7, 8],
+            )
+
+    def test_vector_index_ivf_matches_brute_force_and_supports_int8(self):
+        generator = np.random.default_rng(3)
+        centers = generator.normal(size=(64, 32))
+        vectors = np.repeat(centers, 32, axis=0) + generator.normal(scale=0.05, size=(2048, 32))
+        queries = centers + generator.normal(scale=0.05, size=centers.shape)
+
+        with tempfile.TemporaryDirectory() as index_dir:
+            with patch.dict(os.environ, {"OFFICE_VECTOR_IVF_MIN_ROWS": "100000"}):
+                exact = VectorIndex(Path(index_dir) / "exact")
+                exact.add(range(2048), vectors)
+            with patch.dict(os.environ, {"OFFICE_VECTOR_IVF_MIN_ROWS": "1000", "OFFICE_VECTOR_BLOCK_ROWS": "300"}):
+                ivf = VectorIndex(Path(index_dir) / "ivf")
+                ivf.add(range(1024), vectors[:1024])
+                ivf.add(range(1024, 2048), vectors[1024:])
+                ivf.add([5000], queries[:1])
+                self.assertEqual(ivf.stats()["ivf_rows"], 2048)
+                approximate = [ivf.search(query, k=3) for query in queries]
+            with patch.dict(os.environ, {"OFFICE_VECTOR_INDEX_DTYPE": "int8"}):
+                quantized = VectorIndex(Path(index_dir) / "int8")
+                quantized.add(range(2048), vectors)
+
+            self.assertEqual(exact.stats()["ivf_rows"], 0)
+            self.assertEqual(quantized.stats()["dtype"], "int8")
+            self.assertEqual((Path(index_dir) / "int8" / "vectors.bin").stat().st_size, 2048 * 32)
+            self.assertEqual(approximate[0][0][0], 5000)
+            for cluster, query in enumerate(queries):
+                expected = exact.search(query, k=3)
+                self.assertEqual([hit for hit in approximate[cluster] if hit[0] != 5000], expected[: 3 - (cluster == 0)])
+                quantized_id, quantized_score = quantized.search(query, k=1)[0]
+                self.assertEqual(quantized_id // 32, cluster)
+                self.assertAlmostEqual(quantized_score, expected[0][1], delta=0.02)
@@ -1,7 +1,10 @@
 from django.urls import path
 
-from .views import report_list_create
+from .views import data_run_compare, data_run_query, document_semantic_search, report_list_create
 
 urlpatterns = [
     path("", report_list_create, name="report-list-create"),
+    path("data-runs/compare/", data_run_compare, name="reporting-data-compare"),
+    path("data-runs/<int:run_id>/query/", data_run_query, name="reporting-data-query"),
+    path("documents/semantic-search/", document_semantic_search, name="reporting-semantic-search"),
 ]
@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+VECTOR_INDEX_DTYPES = {"float16": np.float16, "int8": np.int8}
+INT8_SCALE = 127.0
+DEFAULT_VECTOR_BLOCK_ROWS = 65_536
+DEFAULT_IVF_MIN_ROWS = 50_000
+DEFAULT_IVF_PROBES = 8
+IVF_TRAIN_SAMPLE = 20_000
+IVF_ITERATIONS = 10
+COMPACT_DELETED_FRACTION = 0.25
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+    except ValueError:
+        value = default
+    return max(1, value)
+
+
+def vector_index_root() -> Path:
+    configured = os.getenv("OFFICE_VECTOR_INDEX_DIR", "").strip()
+    return Path(configured) if configured else Path(settings.BASE_DIR) / "var" / "vector_index"
+
+
+def vector_index_dtype() -> str:
+    value = os.getenv("OFFICE_VECTOR_INDEX_DTYPE", "float16")
+    return value if value in VECTOR_INDEX_DTYPES else "float16"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _top_k(ids: np.ndarray, scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    if len(scores) > k:
+        keep = np.argpartition(-scores, k - 1)[:k]
+        ids, scores = ids[keep], scores[keep]
+    order = np.argsort(-scores, kind="stable")
+    return ids[order], scores[order]
+
+
+class VectorIndex:
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._meta = self._read_meta()
+
+    def _path(self, name: str, suffix: str, generation: int | None = None) -> Path:
+        generation = self._meta.get("generation", 0) if generation is None else generation
+        return self.directory / (f"{name}.{generation}.{suffix}" if generation else f"{name}.{suffix}")
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self._path("vectors", "bin")
+
+    @property
+    def _ids_path(self) -> Path:
+        return self._path("ids", "i8")
+
+    @property
+    def _deleted_path(self) -> Path:
+        return self._path("deleted", "i8")
+
+    @property
+    def dim(self) -> int | None:
+        return self._meta.get("dim")
+
+    @property
+    def dtype(self) -> str:
+        return self._meta.get("dtype", vector_index_dtype())
+
+    @property
+    def _row_bytes(self) -> int:
+        return (self.dim or 0) * np.dtype(VECTOR_INDEX_DTYPES[self.dtype]).itemsize
+
+    def _read_meta(self) -> dict:
+        try:
+            return json.loads((self.directory / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self) -> None:
+        staging = self.directory / "meta.json.tmp"
+        staging.write_text(json.dumps(self._meta), encoding="utf-8")
+        os.replace(staging, self.directory / "meta.json")
+
+    def __len__(self) -> int:
+        if "rows" in self._meta:
+            return self._meta["rows"]
+        if not self.dim or not self._ids_path.exists() or not self._vectors_path.exists():
+            return 0
+        return min(self._ids_path.stat().st_size // 8, self._vectors_path.stat().st_size // self._row_bytes)
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        if self.dtype == "int8":
+            return np.clip(np.rint(vectors * INT8_SCALE), -127, 127).astype(np.int8)
+        return vectors.astype(np.float16)
+
+    def _vectors(self, rows: int) -> np.ndarray:
+        return np.memmap(self._vectors_path, dtype=VECTOR_INDEX_DTYPES[self.dtype], mode="r", shape=(rows, self.dim))
+
+    def _ids(self, rows: int) -> np.ndarray:
+        return np.memmap(self._ids_path, dtype="<i8", mode="r", shape=(rows,))
+
+    def _deleted_ids(self) -> np.ndarray:
+        count = self._meta.get("deleted", 0)
+        if not count:
+            return np.empty(0, dtype="<i8")
+        return np.unique(np.fromfile(self._deleted_path, dtype="<i8", count=count))
+
+    @contextmanager
+    def _locked(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / ".lock", "a+b") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self._meta = self._read_meta()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _append(path: Path, committed_bytes: int, payload: bytes) -> None:
+        with open(path, "ab") as handle:
+            handle.truncate(committed_bytes)
+            handle.write(payload)
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def add(self, ids: Iterable[int], vectors: np.ndarray) -> None:
+        ids = np.asarray(list(ids), dtype="<i8")
+        if not len(ids):
+            return
+        vectors = _normalize(vectors)
+        with self._locked():
+            if not self._meta:
+                self._meta = {"dim": int(vectors.shape[1]), "dtype": vector_index_dtype(), "rows": 0}
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Vector index expects {self.dim}-dimensional vectors, got {vectors.shape[1]}.")
+            rows = len(self)
+            self._append(self._vectors_path, rows * self._row_bytes, self._encode(vectors).tobytes())
+            self._append(self._ids_path, rows * 8, ids.tobytes())
+            rows += len(ids)
+            self._meta["rows"] = rows
+            self._write_meta()
+            built = self._meta.get("ivf_rows", 0)
+            if rows >= _env_int("OFFICE_VECTOR_IVF_MIN_ROWS", DEFAULT_IVF_MIN_ROWS) and rows >= built * 2:
+                self._build_ivf(rows)
+
+    def remove(self, ids: Iterable[int]) -> int:
+        ids = np.unique(np.asarray(list(ids), dtype="<i8"))
+        if not len(ids):
+            return 0
+        with self._locked():
+            rows = len(self)
+            if not rows:
+                return 0
+            ids = ids[np.isin(ids, self._ids(rows)) & ~np.isin(ids, self._deleted_ids())]
+            if not len(ids):
+                return 0
+            deleted = self._meta.get("deleted", 0)
+            self._append(self._deleted_path, deleted * 8, ids.tobytes())
+            self._meta["deleted"] = deleted + len(ids)
+            self._write_meta()
+            if self._meta["deleted"] >= rows * COMPACT_DELETED_FRACTION:
+                self._compact(rows)
+        return len(ids)
+
+    def _compact(self, rows: int) -> None:
+        deleted = self._deleted_ids()
+        generation = self._meta.get("generation", 0) + 1
+        stale = [
+            self._path(name, suffix)
+            for name, suffix in [
+                ("vectors", "bin"),
+                ("ids", "i8"),
+                ("deleted", "i8"),
+                ("ivf_centroids", "npy"),
+                ("ivf_rows", "npy"),
+                ("ivf_offsets", "npy"),
+            ]
+        ]
+        all_ids = self._ids(rows)
+        live = 0
+        with open(self._path("vectors", "bin", generation), "wb") as vectors, open(
+            self._path("ids", "i8", generation), "wb"
+        ) as ids:
+            for row_ids, block in self._blocks(None, rows):
+                block_ids = np.asarray(all_ids[row_ids])
+                keep = ~np.isin(block_ids, deleted)
+                vectors.write(np.ascontiguousarray(block[keep]).tobytes())
+                ids.write(block_ids[keep].tobytes())
+                live += int(keep.sum())
+            for handle in (vectors, ids):
+                handle.flush()
+                os.fsync(handle.fileno())
+        self._meta.update({"generation": generation, "rows": live, "deleted": 0, "ivf_rows": 0})
+        self._write_meta()
+        for path in stale:
+            path.unlink(missing_ok=True)
+        if live >= _env_int("OFFICE_VECTOR_IVF_MIN_ROWS", DEFAULT_IVF_MIN_ROWS):
+            self._build_ivf(live)
+
+    def _blocks(self, rows: np.ndarray | None, total: int) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        block = _env_int("OFFICE_VECTOR_BLOCK_ROWS", DEFAULT_VECTOR_BLOCK_ROWS)
+        vectors = self._vectors(total)
+        if rows is None:
+            for start in range(0, total, block):
+                yield np.arange(start, min(start + block, total)), vectors[start : start + block]
+            return
+        for start in range(0, len(rows), block):
+            selected = rows[start : start + block]
+            yield selected, vectors[selected]
+
+    def _decoded(self, block: np.ndarray) -> np.ndarray:
+        values = block.astype(np.float32)
+        return values / INT8_SCALE if self.dtype == "int8" else values
+
+    def _build_ivf(self, rows: int) -> None:
+        lists = max(1, int(np.sqrt(rows)))
+        vectors = self._vectors(rows)
+        generator = np.random.default_rng(rows)
+        sample = np.sort(generator.choice(rows, size=min(rows, IVF_TRAIN_SAMPLE), replace=False))
+        training = self._decoded(vectors[sample])
+        centroids = training[generator.choice(len(training), size=min(lists, len(training)), replace=False)]
+        for _ in range(IVF_ITERATIONS):
+            assigned = np.argmax(training @ centroids.T, axis=1)
+            for index in range(len(centroids)):
+                members = training[assigned == index]
+                if len(members):
+                    centroids[index] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+
+        assignments = np.empty(rows, dtype=np.int32)
+        for row_ids, block in self._blocks(None, rows):
+            assignments[row_ids] = np.argmax(self._decoded(block) @ centroids.T, axis=1)
+        order = np.argsort(assignments, kind="stable").astype("<i8")
+        offsets = np.searchsorted(assignments[order], np.arange(len(centroids) + 1)).astype("<i8")
+        np.save(self._path("ivf_centroids", "npy"), centroids.astype(np.float32))
+        np.save(self._path("ivf_rows", "npy"), order)
+        np.save(self._path("ivf_offsets", "npy"), offsets)
+        self._meta["ivf_rows"] = rows
+        self._write_meta()
+
+    def _candidate_rows(self, query: np.ndarray, total: int, probes: int) -> np.ndarray | None:
+        built = self._meta.get("ivf_rows", 0)
+        if not built or built > total:
+            return None
+        centroids = np.load(self._path("ivf_centroids", "npy"))
+        order = np.load(self._path("ivf_rows", "npy"), mmap_mode="r")
+        offsets = np.load(self._path("ivf_offsets", "npy"))
+        nearest = np.argsort(-(centroids @ query))[:probes]
+        rows = [np.asarray(order[offsets[index] : offsets[index + 1]]) for index in nearest]
+        rows.append(np.arange(built, total, dtype="<i8"))
+        return np.sort(np.concatenate(rows))
+
+    def search(self, query: np.ndarray, k: int = 10, probes: int | None = None) -> list[tuple[int, float]]:
+        self._meta = self._read_meta()
+        try:
+            return self._search(query, k, probes)
+        except FileNotFoundError:
+            self._meta = self._read_meta()
+            return self._search(query, k, probes)
+
+    def _search(self, query: np.ndarray, k: int, probes: int | None) -> list[tuple[int, float]]:
+        total = len(self)
+        if not total or self.dim is None:
+            return []
+        query = _normalize(np.asarray(query, dtype=np.float32).reshape(-1))
+        if query.shape[0] != self.dim:
+            raise ValueError(f"Vector index expects {self.dim}-dimensional queries, got {query.shape[0]}.")
+        probes = probes or _env_int("OFFICE_VECTOR_IVF_PROBES", DEFAULT_IVF_PROBES)
+        rows = self._candidate_rows(query, total, probes)
+        ids = self._ids(total)
+        deleted = self._deleted_ids()
+
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for row_ids, block in self._blocks(rows, total):
+            scores = self._decoded(block) @ query
+            if len(deleted):
+                live = ~np.isin(ids[row_ids], deleted)
+                row_ids, scores = row_ids[live], scores[live]
+            best_rows, best_scores = _top_k(
+                np.concatenate([best_rows, row_ids]), np.concatenate([best_scores, scores]), k
+            )
+        return [(int(passage_id), float(score)) for passage_id, score in zip(ids[best_rows], best_scores)]
+
+    def stats(self) -> dict:
+        return {
+            "rows": len(self),
+            "deleted": self._meta.get("deleted", 0),
+            "dim": self.dim,
+            "dtype": self.dtype,
+            "ivf_rows": self._meta.get("ivf_rows", 0),
+        }
+
+
+def tenant_vector_index(tenant_id: int, model_name: str) -> VectorIndex:
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+    return VectorIndex(vector_index_root() / str(tenant_id) / slug)
+
+
+def tenant_vector_indexes(tenant_id: int) -> list[VectorIndex]:
+    root = vector_index_root() / str(tenant_id)
+    if not root.is_dir():
+        return []
+    return [VectorIndex(path) for path in sorted(root.iterdir()) if path.is_dir()]
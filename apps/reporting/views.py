@@ -2,14 +2,33 @@ import json
 from datetime import datetime
 
 from django.contrib.auth.decorators import login_required
-from django.core.files.base import ContentFile
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_http_methods
 
+from office_copilot.artifacts import save_artifact
 from office_copilot.authz import enforce_role, enforce_tenant_access
+from apps.search.services import capture_document_text, index_instance
+from .documents import cached_document_pages, iter_document_pages
 from .models import DataAnalysisRun, DocumentReportRun, Report
-from .services import analyze_business_data, build_powerpoint_report, extract_document_text
+from .near_duplicates import (
+    MinHasher,
+    document_signature,
+    find_near_duplicate,
+    hash_pages,
+    index_document_signature,
+    near_duplicate_threshold,
+)
+from .queries import remove_run_dataset, run_dataset_dir, run_query
+from .semantic_search import PassageIndexer, clear_run_passages, semantic_search
+from .sketches import compare_sketches
+from .term_stats import record_document_terms
+from .services import (
+    analyze_business_data,
+    analyze_business_data_with_html,
+    analyze_workbook_sheets,
+    build_powerpoint_report,
+)
 
 
 @login_required
@@ -32,6 +51,63 @@ def report_list_create(request):
     return JsonResponse({"id": report.id, "name": report.name}, status=201)
 
 
+@login_required
+@require_http_methods(["POST"])
+def data_run_query(request, run_id):
+    enforce_tenant_access(request)
+    run = get_object_or_404(DataAnalysisRun, id=run_id, tenant=request.tenant)
+    try:
+        spec = json.loads(request.body or "{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"detail": "Query spec must be valid JSON"}, status=400)
+    try:
+        result = run_query(run, spec)
+    except FileNotFoundError as exc:
+        return JsonResponse({"detail": str(exc)}, status=404)
+    except ValueError as exc:
+        return JsonResponse({"detail": str(exc)}, status=400)
+    return JsonResponse({"run_id": run.id, **result})
+
+
+@login_required
+@require_http_methods(["GET"])
+def data_run_compare(request):
+    enforce_tenant_access(request)
+    try:
+        base_id = int(request.GET.get("base", ""))
+        current_id = int(request.GET.get("current", ""))
+    except ValueError:
+        return JsonResponse({"detail": "base and current run ids are required"}, status=400)
+    runs = {
+        run.id: run
+        for run in DataAnalysisRun.objects.filter(tenant=request.tenant, id__in=[base_id, current_id]).only(
+            "id", "column_sketches", "created_at"
+        )
+    }
+    if base_id not in runs or current_id not in runs:
+        return JsonResponse({"detail": "Run not found"}, status=404)
+    base, current = runs[base_id], runs[current_id]
+    if not base.column_sketches or not current.column_sketches:
+        return JsonResponse({"detail": "Column sketches are not available for both runs"}, status=409)
+    return JsonResponse(
+        {"base_run_id": base.id, "current_run_id": current.id, **compare_sketches(base.column_sketches, current.column_sketches)}
+    )
+
+
+@login_required
+@require_http_methods(["GET"])
+def document_semantic_search(request):
+    enforce_tenant_access(request)
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return JsonResponse({"detail": "Missing search query"}, status=400)
+    try:
+        k = int(request.GET.get("k", "10"))
+    except ValueError:
+        return JsonResponse({"detail": "k must be an integer"}, status=400)
+    return JsonResponse({"query": query, "results": semantic_search(request.tenant, query, k=k)})
+
+
 @login_required
 @require_http_methods(["GET"])
 def reporting_workspace(request):
@@ -65,15 +141,39 @@ def data_analysis_run(request):
         source_file=upload,
         status=DataAnalysisRun.Status.PROCESSING,
     )
+    sheets_param = (request.POST.get("sheets") or "").strip()
+    html_artifact = None
     try:
         run.source_file.open("rb")
-        summary, workbook_bytes = analyze_business_data(run.source_file, run.source_file.name)
+        if sheets_param:
+            selected_sheets = None
+            if sheets_param.lower() != "all":
+                selected_sheets = [name.strip() for name in sheets_param.split(",") if name.strip()]
+            summary, sheet_summaries, workbook_artifact = analyze_workbook_sheets(
+                run.source_file, run.source_file.name, selected_sheets
+            )
+        elif request.POST.get("html_report"):
+            summary, workbook_artifact, html_artifact = analyze_business_data_with_html(
+                run.source_file, run.source_file.name, dataset_dir=run_dataset_dir(run)
+            )
+            sheet_summaries = []
+        else:
+            summary, workbook_artifact = analyze_business_data(
+                run.source_file, run.source_file.name, dataset_dir=run_dataset_dir(run)
+            )
+            sheet_summaries = []
         run.source_file.close()
-        filename = f"business_analysis_{run.id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        run.workbook_file.save(filename, ContentFile(workbook_bytes), save=False)
+        stamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        save_artifact(run.workbook_file, f"business_analysis_{run.id}_{stamp}.xlsx", workbook_artifact)
+        if html_artifact is not None:
+            save_artifact(run.html_report_file, f"business_analysis_{run.id}_{stamp}.html", html_artifact)
+        run.column_sketches = summary.pop("column_sketches", {})
         run.summary = summary
+        run.sheet_summaries = sheet_summaries
         run.status = DataAnalysisRun.Status.COMPLETED
-        run.save(update_fields=["workbook_file", "summary", "status"])
+        run.save(
+            update_fields=["workbook_file", "html_report_file", "summary", "sheet_summaries", "column_sketches", "status"]
+        )
         Report.objects.create(
             tenant=request.tenant,
             name=f"Business Data Analysis {run.id}",
@@ -83,6 +183,7 @@ def data_analysis_run(request):
         )
         request.session["data_result"] = {"run_id": run.id, **summary}
     except Exception as exc:
+        remove_run_dataset(run)
         run.status = DataAnalysisRun.Status.FAILED
         run.summary = {"error": str(exc)}
         run.save(update_fields=["status", "summary"])
@@ -90,6 +191,13 @@ def data_analysis_run(request):
     return redirect("reporting-workspace")
 
 
+def _match_near_duplicate(run: DocumentReportRun, signature) -> float:
+    duplicate, similarity = find_near_duplicate(run.tenant, signature, exclude_run_id=run.id)
+    if duplicate is not None and similarity >= near_duplicate_threshold():
+        run.duplicate_of = duplicate
+    return similarity
+
+
 @login_required
 @require_http_methods(["POST"])
 def document_report_run(request):
@@ -107,14 +215,48 @@ def document_report_run(request):
     )
     try:
         run.source_file.open("rb")
-        text = extract_document_text(run.source_file, run.source_file.name)
-        run.source_file.close()
-        summary, pptx_bytes = build_powerpoint_report(run.source_file.name.split("/")[-1], text)
+        try:
+            reuse = None
+            hasher = None
+            cached_pages = cached_document_pages(run.source_file, run.source_file.name)
+            if cached_pages is not None:
+                signature, shingle_count = document_signature(cached_pages)
+                similarity = _match_near_duplicate(run, signature)
+                if run.duplicate_of is not None:
+                    reuse = run.duplicate_of.summary
+                run.source_file.seek(0)
+            else:
+                hasher = MinHasher()
+            search_parts = []
+            passages = PassageIndexer(run)
+            pages = iter_document_pages(run.source_file, run.source_file.name)
+            if hasher is not None:
+                pages = hash_pages(pages, hasher)
+            summary, pptx_artifact = build_powerpoint_report(
+                run.source_file.name.split("/")[-1],
+                passages.pages(capture_document_text(pages, search_parts)),
+                reuse=reuse,
+                tenant=request.tenant,
+            )
+            if hasher is not None:
+                signature, shingle_count = hasher.finish(), hasher.shingles
+                similarity = _match_near_duplicate(run, signature)
+        finally:
+            run.source_file.close()
+        term_counts = summary.pop("term_counts", {})
+        summary["passages_indexed"] = passages.finish()
+        summary["similarity"] = round(similarity, 4)
+        if reuse is not None:
+            summary["reused_from_run"] = run.duplicate_of_id
         filename = f"document_report_{run.id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pptx"
-        run.powerpoint_file.save(filename, ContentFile(pptx_bytes), save=False)
+        save_artifact(run.powerpoint_file, filename, pptx_artifact)
         run.summary = summary
+        run.similarity = similarity
         run.status = DocumentReportRun.Status.COMPLETED
-        run.save(update_fields=["powerpoint_file", "summary", "status"])
+        run.save(update_fields=["powerpoint_file", "summary", "similarity", "duplicate_of", "status"])
+        index_instance(run, body="\n".join(search_parts))
+        index_document_signature(run, signature, shingle_count)
+        record_document_terms(request.tenant, term_counts)
         Report.objects.create(
             tenant=request.tenant,
             name=f"Document Report Deck {run.id}",
@@ -124,6 +266,7 @@ def document_report_run(request):
         )
         request.session["doc_result"] = {"run_id": run.id, **summary}
     except Exception as exc:
+        clear_run_passages(run)
         run.status = DocumentReportRun.Status.FAILED
         run.summary = {"error": str(exc)}
         run.save(update_fields=["status", "summary"])
@@ -138,16 +281,27 @@ def data_run_download(request, run_id):
     run = get_object_or_404(DataAnalysisRun, id=run_id, tenant=request.tenant)
     if not run.workbook_file:
         return JsonResponse({"detail": "No workbook generated for this run"}, status=404)
-    run.workbook_file.open("rb")
-    payload = run.workbook_file.read()
-    run.workbook_file.close()
-    response = HttpResponse(
-        payload,
+    return FileResponse(
+        run.workbook_file.open("rb"),
+        as_attachment=True,
+        filename=run.workbook_file.name.split("/")[-1],
         content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
-    name = run.workbook_file.name.split("/")[-1]
-    response["Content-Disposition"] = f'attachment; filename="{name}"'
-    return response
+
+
+@login_required
+@require_http_methods(["GET"])
+def data_run_html_download(request, run_id):
+    enforce_tenant_access(request)
+    run = get_object_or_404(DataAnalysisRun, id=run_id, tenant=request.tenant)
+    if not run.html_report_file:
+        return JsonResponse({"detail": "No HTML report generated for this run"}, status=404)
+    return FileResponse(
+        run.html_report_file.open("rb"),
+        as_attachment=True,
+        filename=run.html_report_file.name.split("/")[-1],
+        content_type="text/html; charset=utf-8",
+    )
 
 
 @login_required
@@ -157,13 +311,9 @@ def doc_run_download(request, run_id):
     run = get_object_or_404(DocumentReportRun, id=run_id, tenant=request.tenant)
     if not run.powerpoint_file:
         return JsonResponse({"detail": "No PowerPoint generated for this run"}, status=404)
-    run.powerpoint_file.open("rb")
-    payload = run.powerpoint_file.read()
-    run.powerpoint_file.close()
-    response = HttpResponse(
-        payload,
+    return FileResponse(
+        run.powerpoint_file.open("rb"),
+        as_attachment=True,
+        filename=run.powerpoint_file.name.split("/")[-1],
         content_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
     )
-    name = run.powerpoint_file.name.split("/")[-1]
-    response["Content-Disposition"] = f'attachment; filename="{name}"'
-    return response
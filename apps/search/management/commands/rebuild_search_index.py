@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.search.services import rebuild_search_index, search_backend
+from apps.tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = "Re-index tasks, reports, presentations and completed document runs for full-text search."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenant", default=None, help="Tenant domain to rebuild (default: all tenants).")
+
+    def handle(self, *args, **options):
+        tenant = None
+        if options["tenant"]:
+            tenant = Tenant.objects.filter(domain=options["tenant"]).first()
+            if tenant is None:
+                raise CommandError(f"Unknown tenant domain {options['tenant']!r}.")
+        indexed = rebuild_search_index(tenant)
+        self.stdout.write(f"Indexed {indexed} entries using the {search_backend()} search backend.")
@@ -0,0 +1,65 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_searchentry_fts USING fts5(
+        title, body, content='search_searchentry', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_searchentry_ai AFTER INSERT ON search_searchentry BEGIN
+        INSERT INTO search_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_searchentry_ad AFTER DELETE ON search_searchentry BEGIN
+        INSERT INTO search_searchentry_fts(search_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_searchentry_au AFTER UPDATE OF title, body ON search_searchentry BEGIN
+        INSERT INTO search_searchentry_fts(search_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO search_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    "INSERT INTO search_searchentry_fts(search_searchentry_fts) VALUES ('rebuild')",
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS search_searchentry_au",
+    "DROP TRIGGER IF EXISTS search_searchentry_ad",
+    "DROP TRIGGER IF EXISTS search_searchentry_ai",
+    "DROP TABLE IF EXISTS search_searchentry_fts",
+]
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX IF NOT EXISTS search_searchentry_fts_gin ON search_searchentry USING GIN ((
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(body, '')), 'B')
+    ))
+    """,
+]
+POSTGRES_REVERSE = ["DROP INDEX IF EXISTS search_searchentry_fts_gin"]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            _run({"sqlite": SQLITE_REVERSE, "postgresql": POSTGRES_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations
+
+
+def _sqlite_statements(columns):
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    return [
+        "DROP TRIGGER IF EXISTS search_searchentry_au",
+        "DROP TRIGGER IF EXISTS search_searchentry_ad",
+        "DROP TRIGGER IF EXISTS search_searchentry_ai",
+        "DROP TABLE IF EXISTS search_searchentry_fts",
+        f"""
+        CREATE VIRTUAL TABLE search_searchentry_fts USING fts5(
+            {column_list}, content='search_searchentry', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+        f"""
+        CREATE TRIGGER search_searchentry_ai AFTER INSERT ON search_searchentry BEGIN
+            INSERT INTO search_searchentry_fts(rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER search_searchentry_ad AFTER DELETE ON search_searchentry BEGIN
+            INSERT INTO search_searchentry_fts(search_searchentry_fts, rowid, {column_list})
+            VALUES ('delete', old.id, {old_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER search_searchentry_au AFTER UPDATE OF {column_list} ON search_searchentry BEGIN
+            INSERT INTO search_searchentry_fts(search_searchentry_fts, rowid, {column_list})
+            VALUES ('delete', old.id, {old_values});
+            INSERT INTO search_searchentry_fts(rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+        """,
+        "INSERT INTO search_searchentry_fts(search_searchentry_fts) VALUES ('rebuild')",
+    ]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "sqlite":
+            for statement in statements:
+                schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0002_fulltext_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run(_sqlite_statements(["title", "body", "tenant_id"])),
+            _run(_sqlite_statements(["title", "body"])),
+        ),
+    ]
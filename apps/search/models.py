@@ -0,0 +1,25 @@
+from django.db import models
+
+from apps.tenants.models import Tenant
+
+
+class SearchEntry(models.Model):
+    class Kind(models.TextChoices):
+        TASK = "task", "Task"
+        REPORT = "report", "Report"
+        PRESENTATION = "presentation", "Presentation"
+        DOCUMENT = "document", "Document"
+
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name="search_entries")
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["kind", "object_id"], name="search_unique_kind_object")]
+        indexes = [models.Index(fields=["tenant", "kind"])]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} {self.title}"
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import os
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from django.db import connection
+from django.db.models import Q
+
+from apps.presentations.models import Presentation
+from apps.reporting.models import DocumentReportRun, Report
+from apps.tasks.models import Task
+from .models import SearchEntry
+
+FTS_TABLE = "search_searchentry_fts"
+SQLITE_RANK = f"bm25({FTS_TABLE}, 4.0, 1.0, 0.0)"
+POSTGRES_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(body, '')), 'B')"
+)
+DEFAULT_SEARCH_DOCUMENT_MAX_CHARS = 100_000
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+SEARCH_MAX_TERMS = 12
+SEARCH_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+REBUILD_BATCH = 500
+
+
+def search_document_max_chars() -> int:
+    try:
+        value = int(os.getenv("OFFICE_SEARCH_DOCUMENT_MAX_CHARS", str(DEFAULT_SEARCH_DOCUMENT_MAX_CHARS)))
+    except ValueError:
+        value = DEFAULT_SEARCH_DOCUMENT_MAX_CHARS
+    return max(0, value)
+
+
+def capture_document_text(pages: Iterable[str], parts: list[str]) -> Iterator[str]:
+    limit = search_document_max_chars()
+    size = 0
+    for page in pages:
+        if size < limit:
+            parts.append(page[: limit - size])
+            size += len(parts[-1])
+        yield page
+
+
+def _task_fields(task: Task) -> tuple[str, str]:
+    return task.title, task.description
+
+
+def _report_fields(report: Report) -> tuple[str, str]:
+    return report.name, ""
+
+
+def _presentation_fields(presentation: Presentation) -> tuple[str, str]:
+    return presentation.title, presentation.source_text
+
+
+def _document_fields(run: DocumentReportRun) -> tuple[str, str] | None:
+    if run.status != DocumentReportRun.Status.COMPLETED:
+        return None
+    summary = run.summary or {}
+    title = summary.get("source_name") or run.source_file.name.split("/")[-1]
+    body = (
+        SearchEntry.objects.filter(kind=SearchEntry.Kind.DOCUMENT, object_id=run.pk).values_list("body", flat=True).first()
+    )
+    if body is None:
+        body = "\n".join(str(item) for item in [*summary.get("top_keywords", []), *summary.get("semantic_points", [])])
+    return title, body
+
+
+SEARCH_SOURCES = {
+    Task: (SearchEntry.Kind.TASK, _task_fields),
+    Report: (SearchEntry.Kind.REPORT, _report_fields),
+    Presentation: (SearchEntry.Kind.PRESENTATION, _presentation_fields),
+    DocumentReportRun: (SearchEntry.Kind.DOCUMENT, _document_fields),
+}
+
+
+def index_instance(instance, body: str | None = None) -> SearchEntry | None:
+    kind, fields = SEARCH_SOURCES[type(instance)]
+    values = fields(instance)
+    if values is None:
+        remove_instance(instance)
+        return None
+    title, field_body = values
+    body = field_body if body is None else body
+    entry, _ = SearchEntry.objects.update_or_create(
+        kind=kind,
+        object_id=instance.pk,
+        defaults={"tenant_id": instance.tenant_id, "title": (title or "")[:255], "body": body or ""},
+    )
+    return entry
+
+
+def remove_instance(instance) -> None:
+    kind, _ = SEARCH_SOURCES[type(instance)]
+    SearchEntry.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+def rebuild_search_index(tenant=None) -> int:
+    indexed = 0
+    for model in SEARCH_SOURCES:
+        queryset = model.objects.all() if tenant is None else model.objects.filter(tenant=tenant)
+        for instance in queryset.order_by("pk").iterator(chunk_size=REBUILD_BATCH):
+            if index_instance(instance) is not None:
+                indexed += 1
+    return indexed
+
+
+_FTS_TABLES: dict[str, bool] = {}
+
+
+def search_backend() -> str:
+    if connection.vendor == "postgresql":
+        return "postgresql"
+    if connection.vendor != "sqlite":
+        return "like"
+    name = str(connection.settings_dict["NAME"])
+    if not _FTS_TABLES.get(name):
+        _FTS_TABLES[name] = FTS_TABLE in connection.introspection.table_names()
+    return "sqlite" if _FTS_TABLES[name] else "like"
+
+
+def _query_terms(query: str) -> list[str]:
+    return SEARCH_TERM_PATTERN.findall(query.lower())[:SEARCH_MAX_TERMS]
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    kind: str
+    object_id: int
+    title: str
+    snippet: str
+    score: float
+
+    def as_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "id": self.object_id,
+            "title": self.title,
+            "snippet": self.snippet,
+            "score": round(self.score, 4),
+        }
+
+
+def _kind_clause(kinds: list[str], column: str) -> tuple[str, list]:
+    if not kinds:
+        return "", []
+    return f" AND {column} IN ({', '.join(['%s'] * len(kinds))})", list(kinds)
+
+
+def _sqlite_search(tenant_id: int, terms: list[str], kinds: list[str], limit: int, offset: int) -> list[SearchHit]:
+    phrase = " ".join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+    match = f'tenant_id:"{int(tenant_id)}" AND {{title body}}: ({phrase.strip()})'
+    kind_sql, kind_params = _kind_clause(kinds, "e.kind")
+    sql = (
+        f"SELECT e.kind, e.object_id, e.title, snippet({FTS_TABLE}, 1, '', '', '…', 16), {SQLITE_RANK} "
+        f"FROM {FTS_TABLE} JOIN search_searchentry e ON e.id = {FTS_TABLE}.rowid "
+        f"WHERE {FTS_TABLE} MATCH %s AND e.tenant_id = %s{kind_sql} "
+        f"ORDER BY {SQLITE_RANK} LIMIT %s OFFSET %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match, tenant_id, *kind_params, limit, offset])
+        rows = cursor.fetchall()
+    return [SearchHit(kind, object_id, title, snippet or "", -rank) for kind, object_id, title, snippet, rank in rows]
+
+
+def _postgres_search(tenant_id: int, terms: list[str], kinds: list[str], limit: int, offset: int) -> list[SearchHit]:
+    tsquery = " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+    kind_sql, kind_params = _kind_clause(kinds, "kind")
+    sql = (
+        "SELECT kind, object_id, title, "
+        "ts_headline('simple', left(body, 20000), query, 'MaxWords=24, MinWords=8, StartSel=\"\", StopSel=\"\"'), "
+        f"ts_rank_cd({POSTGRES_VECTOR}, query) AS score "
+        "FROM search_searchentry, to_tsquery('simple', %s) query "
+        f"WHERE tenant_id = %s AND ({POSTGRES_VECTOR}) @@ query{kind_sql} "
+        "ORDER BY score DESC LIMIT %s OFFSET %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [tsquery, tenant_id, *kind_params, limit, offset])
+        rows = cursor.fetchall()
+    return [SearchHit(kind, object_id, title, snippet or "", float(score)) for kind, object_id, title, snippet, score in rows]
+
+
+def _like_search(tenant_id: int, terms: list[str], kinds: list[str], limit: int, offset: int) -> list[SearchHit]:
+    entries = SearchEntry.objects.filter(tenant_id=tenant_id)
+    if kinds:
+        entries = entries.filter(kind__in=kinds)
+    for term in terms:
+        entries = entries.filter(Q(title__icontains=term) | Q(body__icontains=term))
+    rows = entries.order_by("-updated_at").values_list("kind", "object_id", "title", "body")[offset : offset + limit]
+    return [SearchHit(kind, object_id, title, body[:160], 0.0) for kind, object_id, title, body in rows]
+
+
+SEARCH_BACKENDS = {"sqlite": _sqlite_search, "postgresql": _postgres_search, "like": _like_search}
+
+
+def search_entries(tenant, query: str, kinds=None, page: int = 1, page_size: int = SEARCH_PAGE_SIZE) -> dict:
+    terms = _query_terms(query)
+    page = max(1, page)
+    page_size = min(max(1, page_size), SEARCH_MAX_PAGE_SIZE)
+    kinds = [kind for kind in (kinds or []) if kind in SearchEntry.Kind.values]
+    backend = search_backend()
+    hits = []
+    if terms:
+        hits = SEARCH_BACKENDS[backend](tenant.id, terms, kinds, page_size + 1, (page - 1) * page_size)
+    return {
+        "query": query,
+        "backend": backend,
+        "page": page,
+        "page_size": page_size,
+        "has_next": len(hits) > page_size,
+        "results": [hit.as_dict() for hit in hits[:page_size]],
+    }
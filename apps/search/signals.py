@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .services import SEARCH_SOURCES, index_instance, remove_instance
+
+
+@receiver(post_save)
+def update_search_entry(sender, instance, raw=False, **kwargs):
+    if raw or sender not in SEARCH_SOURCES:
+        return
+    index_instance(instance)
+
+
+@receiver(post_delete)
+def delete_search_entry(sender, instance, **kwargs):
+    if sender in SEARCH_SOURCES:
+        remove_instance(instance)
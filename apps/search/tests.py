@@ -0,0 +1,109 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from apps.presentations.models import Presentation
+from apps.reporting.models import DocumentReportRun, Report
+from apps.tasks.models import Task
+from apps.tenants.models import Tenant
+from office_copilot.testing import IsolatedStorageTestCase
+from .models import SearchEntry
+from .services import FTS_TABLE, search_backend
+
+
+class SearchApiTests(IsolatedStorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tenant = Tenant.objects.create(name="Tenant A", domain="a.local")
+        self.other_tenant = Tenant.objects.create(name="Tenant B", domain="b.local")
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(
+            username="searcher", password="pass1234", tenant=self.tenant, role=user_model.Role.STAFF
+        )
+        self.other_user = user_model.objects.create_user(
+            username="outsider", password="pass1234", tenant=self.other_tenant, role=user_model.Role.STAFF
+        )
+        self.client = Client()
+        self.client.login(username="searcher", password="pass1234")
+
+    def _search(self, **params):
+        response = self.client.get(reverse("search-api"), params, HTTP_X_TENANT="a.local", HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_search_ranks_tenant_entries_and_tracks_changes(self):
+        self.assertEqual(search_backend(), "sqlite")
+        task = Task.objects.create(
+            tenant=self.tenant, title="Renew freight contract", description="Compare carrier quotes.", created_by=self.user
+        )
+        Task.objects.create(
+            tenant=self.tenant, title="Team lunch", description="Ask about freight invoices later.", created_by=self.user
+        )
+        Report.objects.create(tenant=self.tenant, name="Freight Contract Review")
+        Presentation.objects.create(
+            tenant=self.tenant, title="Carrier deck", source_text="Freight volumes rose in March.", created_by=self.user
+        )
+        Task.objects.create(tenant=self.other_tenant, title="Freight contract", created_by=self.other_user)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                [f'tenant_id:"{self.other_tenant.id}" AND {{title body}}: ("freight")'],
+            )
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+        payload = self._search(q="freight contract")
+        self.assertEqual(payload["backend"], "sqlite")
+        self.assertEqual(
+            {(hit["kind"], hit["title"]) for hit in payload["results"]},
+            {("task", "Renew freight contract"), ("report", "Freight Contract Review")},
+        )
+        scores = [hit["score"] for hit in payload["results"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+        self.assertEqual(len(self._search(q="freig")["results"]), 4)
+        presentations = self._search(q="freight", kind="presentation")["results"]
+        self.assertEqual([hit["kind"] for hit in presentations], ["presentation"])
+        first_page = self._search(q="freight", page_size=3)
+        self.assertTrue(first_page["has_next"])
+        self.assertEqual(len(self._search(q="freight", page_size=3, page=2)["results"]), 1)
+
+        task.title = "Renew warehouse lease"
+        task.description = ""
+        task.save()
+        self.assertEqual(self._search(q="warehouse")["results"][0]["id"], task.id)
+        task.delete()
+        self.assertEqual(self._search(q="warehouse")["results"], [])
+        self.assertEqual(
+            self.client.get(reverse("search-api"), HTTP_X_TENANT="a.local", HTTP_HOST="localhost").status_code, 400
+        )
+
+    def test_completed_document_runs_are_indexed_and_rebuild_reindexes(self):
+        text = "Quarterly audit of supplier invoices found duplicate payments.\n\nRefunds are due by April."
+        self.client.post(
+            reverse("reporting-doc-run"),
+            data={"file": SimpleUploadedFile("audit.txt", text.encode("utf-8"), content_type="text/plain")},
+            HTTP_X_TENANT="a.local",
+            HTTP_HOST="localhost",
+        )
+        run = DocumentReportRun.objects.get()
+        self.assertEqual(run.status, DocumentReportRun.Status.COMPLETED)
+        self.assertEqual(SearchEntry.objects.get(kind="document").body.split(), text.split())
+        run.source_file.delete(save=False)
+        run.save()
+        self.assertEqual(SearchEntry.objects.get(kind="document").body.split(), text.split())
+        hits = self._search(q="duplicate payments", kind="document")["results"]
+        self.assertEqual(len(hits), 1)
+        self.assertTrue(hits[0]["title"].startswith("audit"))
+        self.assertIn("supplier invoices", hits[0]["snippet"])
+
+        SearchEntry.objects.all().delete()
+        output = StringIO()
+        call_command("rebuild_search_index", "--tenant", "a.local", stdout=output)
+        self.assertIn("Indexed", output.getvalue())
+        self.assertEqual(len(self._search(q="supplier")["results"]), 1)
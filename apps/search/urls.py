@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views import search_api
+
+urlpatterns = [
+    path("", search_api, name="search-api"),
+]
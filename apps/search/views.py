@@ -0,0 +1,23 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+
+from office_copilot.authz import enforce_tenant_access
+
+from .services import SEARCH_PAGE_SIZE, search_entries
+
+
+@login_required
+@require_http_methods(["GET"])
+def search_api(request):
+    enforce_tenant_access(request)
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return JsonResponse({"detail": "Missing search query"}, status=400)
+    try:
+        page = int(request.GET.get("page", "1"))
+        page_size = int(request.GET.get("page_size", str(SEARCH_PAGE_SIZE)))
+    except ValueError:
+        return JsonResponse({"detail": "page and page_size must be integers"}, status=400)
+    kinds = [kind for kind in request.GET.get("kind", "").split(",") if kind]
+    return JsonResponse(search_entries(request.tenant, query, kinds=kinds, page=page, page_size=page_size))
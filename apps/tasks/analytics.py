@@ -2,12 +2,18 @@ from __future__ import annotations
 
 from datetime import datetime
 from io import BytesIO
+from tempfile import SpooledTemporaryFile
 
 import pandas as pd
 from openpyxl import Workbook
 from openpyxl.chart import BarChart, Reference
 from openpyxl.styles import Font, PatternFill
 
+from office_copilot.artifacts import artifact_buffer, finish_artifact
+from office_copilot.uploads import compression_codec, open_decompressed
+
+
+TASK_WORKBOOK_SUFFIXES = (".xlsx", ".xls")
 
 EXPECTED_COLUMNS = {
     "title": {"title", "task", "task_name", "name"},
@@ -44,8 +50,15 @@ def _write_table(worksheet, headers, rows):
         worksheet.column_dimensions[column_cells[0].column_letter].width = min(max(max_len + 2, 12), 50)
 
 
-def analyze_task_dataframe(uploaded_file) -> tuple[dict, bytes]:
-    dataframe = pd.read_excel(uploaded_file)
+def _read_task_workbook(uploaded_file, filename: str) -> pd.DataFrame:
+    if compression_codec(filename):
+        with open_decompressed(uploaded_file, filename, TASK_WORKBOOK_SUFFIXES) as (stream, _):
+            return pd.read_excel(BytesIO(stream.read()))
+    return pd.read_excel(uploaded_file)
+
+
+def analyze_task_dataframe(uploaded_file, filename: str = "") -> tuple[dict, SpooledTemporaryFile]:
+    dataframe = _read_task_workbook(uploaded_file, filename or getattr(uploaded_file, "name", "") or "")
     if dataframe.empty:
         raise ValueError("Uploaded Excel file has no rows.")
 
@@ -214,7 +227,6 @@ def analyze_task_dataframe(uploaded_file) -> tuple[dict, bytes]:
         chart2.width = 12
         ws_dash.add_chart(chart2, "N8")
 
-    output = BytesIO()
+    output = artifact_buffer()
     workbook.save(output)
-    output.seek(0)
-    return summary, output.getvalue()
+    return summary, finish_artifact(output)
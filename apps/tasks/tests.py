@@ -1,19 +1,23 @@
+import gzip
+import zipfile
 from datetime import date
 from io import BytesIO
 
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, RequestFactory, TestCase
+from django.test import Client, RequestFactory
 from django.urls import reverse
 from openpyxl import Workbook, load_workbook
 
 from apps.tenants.models import Tenant
+from office_copilot.testing import IsolatedStorageTestCase
 from .models import Task, TaskAnalysisRun
 from .views import task_list_page
 
 
-class TaskExcelTests(TestCase):
+class TaskExcelTests(IsolatedStorageTestCase):
     def setUp(self):
+        super().setUp()
         self.tenant_a = Tenant.objects.create(name="Tenant A", domain="a.local")
         self.tenant_b = Tenant.objects.create(name="Tenant B", domain="b.local")
 
@@ -143,3 +147,29 @@ class TaskExcelTests(TestCase):
         self.assertEqual(len(payload["errors"]), 3)
         self.assertTrue(Task.objects.filter(tenant=self.tenant_a, title="Imported valid").exists())
         self.assertFalse(Task.objects.filter(tenant=self.tenant_a, title="Bad status row").exists())
+
+    def test_compressed_workbooks_are_accepted_for_import_and_analysis(self):
+        workbook = self._build_import_file([["Zipped task", "desc", "todo", "high", "2026-02-25", "assignee_a"]])
+        archive = BytesIO()
+        with zipfile.ZipFile(archive, "w") as bundle:
+            bundle.writestr("tasks.xlsx", workbook.read())
+        workbook.seek(0)
+        self.client.login(username="alice", password="pass1234")
+        response = self.client.post(
+            reverse("task-import-excel"),
+            data={"file": SimpleUploadedFile("tasks.zip", archive.getvalue(), content_type="application/zip")},
+            HTTP_X_TENANT="a.local",
+            HTTP_HOST="localhost",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["rows_inserted"], 1)
+
+        self.client.post(
+            reverse("task-analyst-run"),
+            data={"file": SimpleUploadedFile("tasks.xlsx.gz", gzip.compress(workbook.read()), content_type="application/gzip")},
+            HTTP_X_TENANT="a.local",
+            HTTP_HOST="localhost",
+        )
+        run = TaskAnalysisRun.objects.filter(tenant=self.tenant_a).first()
+        self.assertEqual(run.status, TaskAnalysisRun.Status.COMPLETED)
+        self.assertEqual(run.summary["rows_uploaded"], 1)
@@ -3,15 +3,16 @@ from datetime import date, datetime
 from io import BytesIO
 
 from django.contrib.auth.decorators import login_required
-from django.core.files.base import ContentFile
 from django.core.exceptions import ValidationError
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_http_methods
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font
 
+from office_copilot.artifacts import save_artifact
 from office_copilot.authz import enforce_tenant_access
+from office_copilot.uploads import compression_codec, open_decompressed
 from apps.accounts.models import User
 from apps.reporting.models import Report
 from .analytics import analyze_task_dataframe
@@ -82,9 +83,17 @@ def _normalize_header(value: str) -> str:
     return "".join(ch if ch.isalnum() else "_" for ch in str(value).strip().lower()).strip("_")
 
 
+def _load_task_workbook(upload):
+    filename = getattr(upload, "name", "") or ""
+    if compression_codec(filename):
+        with open_decompressed(upload, filename, (".xlsx",)) as (stream, _):
+            return load_workbook(BytesIO(stream.read()), data_only=True)
+    return load_workbook(upload, data_only=True)
+
+
 def _import_tasks_from_upload(request, upload, mapping_payload=None):
     try:
-        workbook = load_workbook(upload, data_only=True)
+        workbook = _load_task_workbook(upload)
     except Exception:
         return 400, {"detail": "Invalid Excel file"}
 
@@ -258,10 +267,10 @@ def task_analyst_run(request):
     )
     try:
         run.source_file.open("rb")
-        summary, workbook_bytes = analyze_task_dataframe(run.source_file)
+        summary, workbook_artifact = analyze_task_dataframe(run.source_file, upload.name)
         run.source_file.close()
         filename = f"task_analytics_{run.id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        run.workbook_file.save(filename, ContentFile(workbook_bytes), save=False)
+        save_artifact(run.workbook_file, filename, workbook_artifact)
         run.summary = summary
         run.status = TaskAnalysisRun.Status.COMPLETED
         run.save(update_fields=["workbook_file", "summary", "status"])
@@ -295,16 +304,12 @@ def task_analyst_download(request, run_id):
     run = get_object_or_404(TaskAnalysisRun, id=run_id, tenant=request.tenant)
     if not run.workbook_file:
         return JsonResponse({"detail": "Workbook not available for this run"}, status=404)
-    run.workbook_file.open("rb")
-    data = run.workbook_file.read()
-    run.workbook_file.close()
-    response = HttpResponse(
-        data,
+    return FileResponse(
+        run.workbook_file.open("rb"),
+        as_attachment=True,
+        filename=run.workbook_file.name.split("/")[-1],
         content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
-    name = run.workbook_file.name.split("/")[-1]
-    response["Content-Disposition"] = f'attachment; filename="{name}"'
-    return response
 
 
 @login_required
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import os
+from tempfile import SpooledTemporaryFile
+
+from django.core.files import File
+
+DEFAULT_ARTIFACT_SPOOL_MAX_BYTES = 4 * 1024 * 1024
+
+
+def _spool_max_bytes() -> int:
+    try:
+        value = int(os.getenv("OFFICE_ARTIFACT_SPOOL_MAX_BYTES", str(DEFAULT_ARTIFACT_SPOOL_MAX_BYTES)))
+    except ValueError:
+        value = DEFAULT_ARTIFACT_SPOOL_MAX_BYTES
+    return max(0, value)
+
+
+def artifact_buffer() -> SpooledTemporaryFile:
+    return SpooledTemporaryFile(max_size=_spool_max_bytes(), mode="w+b")
+
+
+def finish_artifact(buffer: SpooledTemporaryFile) -> SpooledTemporaryFile:
+    buffer.flush()
+    buffer.seek(0)
+    return buffer
+
+
+def save_artifact(field_file, filename: str, artifact, save: bool = False) -> None:
+    try:
+        artifact.seek(0)
+        field_file.save(filename, File(artifact, name=filename), save=save)
+    finally:
+        artifact.close()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import zipfile
+from collections.abc import Iterator
+from xml.etree.ElementTree import iterparse
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+DOCUMENT_PART = "word/document.xml"
+STYLES_PART = "word/styles.xml"
+
+_PARAGRAPH = f"{WORD_NAMESPACE}p"
+_BODY = f"{WORD_NAMESPACE}body"
+_TEXT = f"{WORD_NAMESPACE}t"
+_TAB = f"{WORD_NAMESPACE}tab"
+_BREAKS = {f"{WORD_NAMESPACE}br", f"{WORD_NAMESPACE}cr"}
+_PARAGRAPH_STYLE = f"{WORD_NAMESPACE}pStyle"
+_STYLE = f"{WORD_NAMESPACE}style"
+_STYLE_NAME = f"{WORD_NAMESPACE}name"
+_VALUE = f"{WORD_NAMESPACE}val"
+_TOP_LEVEL = {_PARAGRAPH, f"{WORD_NAMESPACE}tbl", f"{WORD_NAMESPACE}sdt"}
+
+
+def _paragraph_styles(archive: zipfile.ZipFile) -> tuple[dict[str, str], str]:
+    names = {}
+    default = "Normal"
+    if STYLES_PART not in archive.namelist():
+        return names, default
+    with archive.open(STYLES_PART) as handle:
+        for _, element in iterparse(handle):
+            if element.tag != _STYLE:
+                continue
+            if element.get(f"{WORD_NAMESPACE}type") == "paragraph":
+                name_element = element.find(_STYLE_NAME)
+                style_id = element.get(f"{WORD_NAMESPACE}styleId", "")
+                name = name_element.get(_VALUE, style_id) if name_element is not None else style_id
+                names[style_id] = name
+                if element.get(f"{WORD_NAMESPACE}default") in {"1", "true"}:
+                    default = name
+            element.clear()
+    return names, default
+
+
+def iter_docx_paragraphs(uploaded_file) -> Iterator[tuple[str, str]]:
+    with zipfile.ZipFile(uploaded_file) as archive:
+        styles, default_style = _paragraph_styles(archive)
+        with archive.open(DOCUMENT_PART) as handle:
+            body = None
+            stack: list[tuple[list[str], list[str]]] = []
+            for event, element in iterparse(handle, events=("start", "end")):
+                tag = element.tag
+                if event == "start":
+                    if tag == _PARAGRAPH:
+                        stack.append(([], [default_style]))
+                    elif tag == _BODY:
+                        body = element
+                    continue
+                if tag == _PARAGRAPH and stack:
+                    parts, style = stack.pop()
+                    element.clear()
+                    yield style[0], "".join(parts)
+                elif not stack:
+                    pass
+                elif tag == _TEXT:
+                    stack[-1][0].append(element.text or "")
+                elif tag == _TAB:
+                    stack[-1][0].append("\t")
+                elif tag in _BREAKS:
+                    stack[-1][0].append("\n")
+                elif tag == _PARAGRAPH_STYLE:
+                    style_id = element.get(_VALUE, "")
+                    stack[-1][1][0] = styles.get(style_id, style_id)
+                if tag in _TOP_LEVEL and body is not None and not stack:
+                    body.clear()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from collections.abc import Mapping
+
+KEYWORD_PATTERN = re.compile(r"[a-z]{4,}")
+WORD_PATTERN = re.compile(r"[^\W\d_]+", re.UNICODE)
+KEYWORD_COUNTER_CAPACITY = 20_000
+KEYWORD_STOP_WORDS = frozenset(
+    {
+        "about",
+        "after",
+        "also",
+        "been",
+        "before",
+        "being",
+        "between",
+        "both",
+        "could",
+        "does",
+        "each",
+        "from",
+        "have",
+        "here",
+        "into",
+        "just",
+        "many",
+        "more",
+        "most",
+        "much",
+        "must",
+        "only",
+        "other",
+        "over",
+        "same",
+        "should",
+        "some",
+        "such",
+        "than",
+        "that",
+        "their",
+        "them",
+        "then",
+        "there",
+        "these",
+        "they",
+        "this",
+        "those",
+        "through",
+        "under",
+        "upon",
+        "very",
+        "were",
+        "what",
+        "when",
+        "where",
+        "which",
+        "while",
+        "will",
+        "with",
+        "within",
+        "would",
+        "your",
+    }
+)
+
+
+def keyword_counts(text: str) -> Counter:
+    return Counter(
+        word
+        for word in (match.group() for match in KEYWORD_PATTERN.finditer(text.lower()))
+        if word not in KEYWORD_STOP_WORDS
+    )
+
+
+class BoundedCounter:
+    def __init__(self, capacity: int = KEYWORD_COUNTER_CAPACITY):
+        self.capacity = max(1, capacity)
+        self.counts = Counter()
+
+    def update(self, counts: Mapping[str, int]) -> None:
+        self.counts.update(counts)
+        if len(self.counts) > self.capacity * 2:
+            self.counts = Counter(dict(self.counts.most_common(self.capacity)))
+
+    def most_common(self, limit: int) -> list[tuple[str, int]]:
+        return self.counts.most_common(limit)
+
+
+def idf_weight(document_count: int, document_frequency: int) -> float:
+    return math.log((1 + document_count) / (1 + document_frequency)) + 1.0
+
+
+def weighted_keywords(
+    counts: Mapping[str, int], document_frequencies: Mapping[str, int], document_count: int, limit: int
+) -> list[str]:
+    scored = sorted(
+        counts.items(), key=lambda item: -item[1] * idf_weight(document_count, document_frequencies.get(item[0], 0))
+    )
+    return [term for term, _ in scored[:limit]]
@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     "apps.meetings",
     "apps.tasks",
     "apps.presentations",
+    "apps.search",
 ]
 
 MIDDLEWARE = [
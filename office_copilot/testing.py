@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+STORAGE_ENV_DIRS = {
+    "OFFICE_TEXT_CACHE_DIR": "text_cache",
+    "OFFICE_EMBED_CACHE_DIR": "embedding_cache",
+    "OFFICE_VECTOR_INDEX_DIR": "vector_index",
+    "OFFICE_COLUMNAR_CACHE_DIR": "columnar_cache",
+    "OFFICE_RUN_DATASET_DIR": "run_datasets",
+}
+
+
+class IsolatedStorageTestCase(TestCase):
+    def setUp(self):
+        super().setUp()
+        storage = tempfile.TemporaryDirectory()
+        self.addCleanup(storage.cleanup)
+        self.storage_root = Path(storage.name)
+        media = override_settings(MEDIA_ROOT=str(self.storage_root / "media"))
+        media.enable()
+        self.addCleanup(media.disable)
+        environment = patch.dict(
+            os.environ, {name: str(self.storage_root / dirname) for name, dirname in STORAGE_ENV_DIRS.items()}
+        )
+        environment.start()
+        self.addCleanup(environment.stop)
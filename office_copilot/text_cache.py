@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+
+DEFAULT_TEXT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+TEXT_CACHE_PRUNE_EVERY = 32
+TEXT_CACHE_SUFFIX = ".jsonl.gz"
+LEGACY_TEXT_CACHE_SUFFIXES = (".json.gz",)
+HASH_CHUNK_BYTES = 1024 * 1024
+
+_stores_since_prune = 0
+
+
+def text_cache_enabled() -> bool:
+    return os.getenv("OFFICE_TEXT_CACHE", "True") == "True"
+
+
+def text_cache_dir() -> Path:
+    configured = os.getenv("OFFICE_TEXT_CACHE_DIR", "").strip()
+    return Path(configured) if configured else Path(settings.BASE_DIR) / "var" / "text_cache"
+
+
+def text_cache_max_bytes() -> int:
+    try:
+        value = int(os.getenv("OFFICE_TEXT_CACHE_MAX_BYTES", str(DEFAULT_TEXT_CACHE_MAX_BYTES)))
+    except ValueError:
+        value = DEFAULT_TEXT_CACHE_MAX_BYTES
+    return max(0, value)
+
+
+def content_digest(uploaded_file) -> str:
+    digest = hashlib.sha256()
+    if isinstance(uploaded_file, (str, os.PathLike)):
+        with open(uploaded_file, "rb") as handle:
+            for chunk in iter(lambda: handle.read(HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    uploaded_file.seek(0)
+    for chunk in iter(lambda: uploaded_file.read(HASH_CHUNK_BYTES), b""):
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def _entry_path(digest: str, extractor: str) -> Path:
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", extractor)
+    return text_cache_dir() / digest[:2] / f"{digest}-{slug}{TEXT_CACHE_SUFFIX}"
+
+
+def load_cached_text(digest: str, extractor: str) -> Iterator | None:
+    path = _entry_path(digest, extractor)
+    handle = None
+    try:
+        handle = gzip.open(path, "rt", encoding="utf-8")
+        header = json.loads(handle.readline())
+        if header.get("extractor") != extractor:
+            handle.close()
+            return None
+        os.utime(path)
+    except (OSError, ValueError, EOFError):
+        if handle is not None:
+            handle.close()
+        return None
+    return _iter_cached_items(handle)
+
+
+def _iter_cached_items(handle) -> Iterator:
+    with handle:
+        for line in handle:
+            yield json.loads(line)
+
+
+def _discard_staging(handle, staging: Path) -> None:
+    if handle is not None:
+        try:
+            handle.close()
+        except OSError:
+            pass
+    staging.unlink(missing_ok=True)
+
+
+def _store_while_streaming(digest: str, extractor: str, items: Iterable) -> Iterator:
+    global _stores_since_prune
+    path = _entry_path(digest, extractor)
+    staging = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    handle = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle = gzip.open(staging, "wt", encoding="utf-8", compresslevel=1)
+        handle.write(json.dumps({"extractor": extractor}) + "\n")
+    except OSError:
+        _discard_staging(handle, staging)
+        handle = None
+
+    finished = False
+    try:
+        for item in items:
+            if handle is not None:
+                try:
+                    handle.write(json.dumps(item) + "\n")
+                except OSError:
+                    _discard_staging(handle, staging)
+                    handle = None
+            yield item
+        finished = True
+    finally:
+        if handle is not None and not finished:
+            _discard_staging(handle, staging)
+    if handle is None:
+        return
+    try:
+        handle.close()
+        os.replace(staging, path)
+    except OSError:
+        staging.unlink(missing_ok=True)
+        return
+    _stores_since_prune += 1
+    if _stores_since_prune >= TEXT_CACHE_PRUNE_EVERY:
+        _stores_since_prune = 0
+        prune_text_cache()
+
+
+def cached_extraction(uploaded_file, extractor: str, extract: Callable[[], Iterable]) -> Iterator:
+    if not text_cache_enabled():
+        yield from extract()
+        return
+    digest = content_digest(uploaded_file)
+    cached = load_cached_text(digest, extractor)
+    if cached is None:
+        yield from _store_while_streaming(digest, extractor, extract())
+        return
+    served = 0
+    try:
+        for item in cached:
+            yield item
+            served += 1
+    except (OSError, ValueError, EOFError):
+        _entry_path(digest, extractor).unlink(missing_ok=True)
+        yield from islice(extract(), served, None)
+
+
+def prune_text_cache(max_bytes: int | None = None) -> dict:
+    limit = text_cache_max_bytes() if max_bytes is None else max(0, max_bytes)
+    root = text_cache_dir()
+    entries = []
+    suffixes = (TEXT_CACHE_SUFFIX, *LEGACY_TEXT_CACHE_SUFFIXES)
+    paths = [path for suffix in suffixes for path in root.glob(f"*/*{suffix}")] if root.exists() else []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    freed = 0
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        freed += size
+        removed += 1
+    return {"entries": len(entries) - removed, "removed": removed, "freed_bytes": freed, "remaining_bytes": total}
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import gzip
+import io
+import os
+import zipfile
+from contextlib import ExitStack, contextmanager
+from pathlib import PurePosixPath
+
+DEFAULT_MAX_DECOMPRESSED_BYTES = 4 * 1024 * 1024 * 1024
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd", ".zip": "zip"}
+DECOMPRESS_BUFFER_BYTES = 1024 * 1024
+
+
+def max_decompressed_bytes() -> int:
+    try:
+        value = int(os.getenv("OFFICE_MAX_DECOMPRESSED_BYTES", str(DEFAULT_MAX_DECOMPRESSED_BYTES)))
+    except ValueError:
+        value = DEFAULT_MAX_DECOMPRESSED_BYTES
+    return max(1, value)
+
+
+def compression_codec(filename: str) -> str | None:
+    return COMPRESSION_SUFFIXES.get(PurePosixPath(filename.lower()).suffix)
+
+
+def inner_filename(filename: str) -> str:
+    lower_name = filename.lower()
+    codec = compression_codec(lower_name)
+    if codec is None or codec == "zip":
+        return lower_name
+    return lower_name[: -len(PurePosixPath(lower_name).suffix)]
+
+
+def is_supported_upload(filename: str, suffixes: tuple[str, ...]) -> bool:
+    lower_name = filename.lower()
+    if compression_codec(lower_name) == "zip":
+        return True
+    return inner_filename(lower_name).endswith(suffixes)
+
+
+class _SizeLimitedReader(io.RawIOBase):
+    def __init__(self, stream, limit: int):
+        self._stream = stream
+        self._limit = limit
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        seekable = getattr(self._stream, "seekable", None)
+        return bool(seekable and seekable())
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self._position += size
+        if self._position > self._limit:
+            raise ValueError(f"Decompressed upload exceeds the {self._limit} byte limit.")
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._position = self._stream.seek(offset, whence)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+
+def _zstd_reader(raw):
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise ValueError("Reading .zst uploads requires the zstandard package.") from exc
+    return zstandard.ZstdDecompressor().stream_reader(raw, read_size=DECOMPRESS_BUFFER_BYTES)
+
+
+def _zip_member(archive: zipfile.ZipFile, suffixes: tuple[str, ...], limit: int) -> zipfile.ZipInfo:
+    members = [
+        info
+        for info in archive.infolist()
+        if not info.is_dir()
+        and not PurePosixPath(info.filename).name.startswith((".", "__MACOSX"))
+        and info.filename.lower().endswith(suffixes)
+    ]
+    if len(members) != 1:
+        raise ValueError(f"Zip uploads must contain exactly one {', '.join(suffixes)} file.")
+    if members[0].file_size > limit:
+        raise ValueError(f"Decompressed upload exceeds the {limit} byte limit.")
+    return members[0]
+
+
+@contextmanager
+def open_decompressed(uploaded_file, filename: str, suffixes: tuple[str, ...]):
+    codec = compression_codec(filename)
+    if codec is None:
+        raise ValueError(f"{filename} is not a compressed upload.")
+    limit = max_decompressed_bytes()
+    with ExitStack() as stack:
+        if isinstance(uploaded_file, (str, os.PathLike)):
+            raw = stack.enter_context(open(uploaded_file, "rb"))
+        else:
+            raw = uploaded_file
+            if hasattr(raw, "seek"):
+                raw.seek(0)
+
+        if codec == "zip":
+            try:
+                archive = stack.enter_context(zipfile.ZipFile(raw))
+            except zipfile.BadZipFile as exc:
+                raise ValueError("Uploaded zip archive is invalid.") from exc
+            member = _zip_member(archive, suffixes, limit)
+            name = member.filename.lower()
+            stream = stack.enter_context(archive.open(member))
+        else:
+            name = inner_filename(filename)
+            if not name.endswith(suffixes):
+                raise ValueError(f"Compressed uploads must contain a {', '.join(suffixes)} file.")
+            if codec == "gzip":
+                stream = stack.enter_context(gzip.GzipFile(fileobj=raw, mode="rb"))
+            else:
+                stream = stack.enter_context(_zstd_reader(raw))
+
+        reader = io.BufferedReader(_SizeLimitedReader(stream, limit), buffer_size=DECOMPRESS_BUFFER_BYTES)
+        yield reader, name
@@ -18,4 +18,5 @@ urlpatterns = [
     path("api/meetings/", include("apps.meetings.urls")),
     path("api/reporting/", include("apps.reporting.urls")),
     path("api/presentations/", include("apps.presentations.urls")),
+    path("api/search/", include("apps.search.urls")),
 ]
@@ -7,6 +7,7 @@ For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/wsgi/
 """
 
+import gc
 import os
 
 from django.core.wsgi import get_wsgi_application
@@ -14,3 +15,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'office_copilot.settings')
 
 application = get_wsgi_application()
+
+# With a preforking server loading this module in the master (e.g. gunicorn --preload),
+# model weights loaded here are shared copy-on-write by every worker.
+if os.getenv("OFFICE_EMBED_PRELOAD", "False") == "True":
+    from apps.reporting.ai_runtime import preload_embedder
+
+    preload_embedder()
+    gc.freeze()